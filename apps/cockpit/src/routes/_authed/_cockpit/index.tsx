@@ -7,6 +7,10 @@ import { ShipPersonality } from "../../../components/ShipPersonality";
 import type { Skill, SkillTier } from "../../../data/skills";
 import type { ProjectPersonality } from "../../../data/skills";
 
+// Last /api/skills response, revalidated with its ETag (the MCP server
+// answers 304 while the registry is unchanged).
+let skillsCache: { etag: string; skills: Skill[] } | null = null;
+
 const fetchDashboardData = createServerFn({ method: "GET" })
   .inputValidator((d: { userId: string }) => d)
   .handler(async ({ data }) => {
@@ -48,10 +52,18 @@ const fetchDashboardData = createServerFn({ method: "GET" })
           process.env.VITE_MCP_SERVER_URL || "http://localhost:8000";
         const apiSecret = process.env.COSHIP_API_SECRET || "";
         try {
-          const res = await fetch(`${mcpUrl}/api/skills`, {
-            headers: { Authorization: `Bearer ${apiSecret}` },
-          });
-          if (res.ok) return (await res.json()) as Skill[];
+          const headers: Record<string, string> = {
+            Authorization: `Bearer ${apiSecret}`,
+          };
+          if (skillsCache) headers["If-None-Match"] = skillsCache.etag;
+          const res = await fetch(`${mcpUrl}/api/skills`, { headers });
+          if (res.status === 304 && skillsCache) return skillsCache.skills;
+          if (res.ok) {
+            const skills = (await res.json()) as Skill[];
+            const etag = res.headers.get("etag");
+            skillsCache = etag ? { etag, skills } : null;
+            return skills;
+          }
         } catch {
           // MCP server may not be running
         }
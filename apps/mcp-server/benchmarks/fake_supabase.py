@@ -0,0 +1,137 @@
+"""In-process stand-in for Supabase (PostgREST and JWKS) for benchmarks.
+
+Served through an ``httpx.MockTransport`` installed as the server's pooled
+Supabase client, so benchmarks measure the MCP server rather than the
+network.  Every request can be delayed by a fixed upstream latency to
+model the round trip to a real Supabase project.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+from authlib.jose import JsonWebKey, JsonWebToken
+
+JWKS_PATH = "/auth/v1/.well-known/jwks.json"
+PROJECT_COLUMNS = ("id", "name", "slug", "description", "status", "user_id", "created_at")
+
+
+class FakeSupabase:
+    """Projects, personalities and ES256 session tokens for a set of users."""
+
+    def __init__(self, supabase_url: str, latency: float = 0.0, projects_per_user: int = 3):
+        self.supabase_url = supabase_url.rstrip("/")
+        self.latency = latency
+        self.projects_per_user = projects_per_user
+        self.key = JsonWebKey.generate_key(
+            "EC", "P-256", is_private=True, options={"kid": "bench"}
+        )
+        self._jwt = JsonWebToken(["ES256"])
+        # user id -> project rows; project id -> personality row
+        self.projects: dict[str, list[dict]] = {}
+        self.personalities: dict[str, dict] = {}
+        # access token -> user id (no signature checks on the fake's side,
+        # so the fake costs as little CPU as possible)
+        self._users_by_token: dict[str, str] = {}
+        self.requests = 0
+
+    # --- sessions ---
+
+    def add_user(self, tier: str = "free") -> tuple[str, dict]:
+        """Create a user with projects; returns its id and Supabase session tokens."""
+        user_id = str(uuid.uuid4())
+        self.projects[user_id] = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": f"Project {i}",
+                "slug": f"project-{i}",
+                "description": "Benchmark project",
+                "status": "active",
+                "user_id": user_id,
+                "created_at": f"2026-01-0{i + 1}T00:00:00Z",
+            }
+            for i in range(self.projects_per_user)
+        ]
+        now = int(time.time())
+        claims = {
+            "sub": user_id,
+            "iss": f"{self.supabase_url}/auth/v1",
+            "iat": now,
+            "exp": now + 3600,
+            "role": "authenticated",
+            "app_metadata": {"subscription_tier": tier},
+        }
+        access_token = self._jwt.encode(
+            {"alg": "ES256", "kid": "bench"}, claims, self.key
+        ).decode()
+        self._users_by_token[access_token] = user_id
+        return user_id, {
+            "access_token": access_token,
+            "refresh_token": f"refresh-{user_id}",
+            "expires_in": 3600,
+        }
+
+    def _user_id(self, request: httpx.Request) -> str | None:
+        token = request.headers.get("authorization", "").removeprefix("Bearer ")
+        return self._users_by_token.get(token)
+
+    # --- transport ---
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        path = request.url.path
+        if path == JWKS_PATH:
+            return httpx.Response(200, json={"keys": [self.key.as_dict(is_private=False)]})
+        if path == "/rest/v1/projects" and request.method == "GET":
+            return self._select_projects(request)
+        if path == "/rest/v1/project_personality" and request.method == "POST":
+            return self._upsert_personality(request)
+        return httpx.Response(404, json={"message": f"No fake route for {request.method} {path}"})
+
+    def _select_projects(self, request: httpx.Request) -> httpx.Response:
+        user_id = self._user_id(request)
+        if user_id is None:
+            return httpx.Response(401, json={"message": "JWT invalid"})
+        params = request.url.params
+        rows = [p for p in self.projects.get(user_id, []) if p["status"] == "active"]
+        if params.get("id", "").startswith("eq."):
+            rows = [p for p in rows if p["id"] == params["id"][3:]]
+        rows = sorted(rows, key=lambda p: (p["created_at"], p["id"]), reverse=True)
+        if "limit" in params:
+            rows = rows[: int(params["limit"])]
+
+        select = [c.strip() for c in params.get("select", "*").split(",")]
+        embed = "project_personality(*)" in select
+        columns = [c for c in select if c in PROJECT_COLUMNS or c == "*"]
+        if "*" in columns:
+            columns = list(PROJECT_COLUMNS)
+        body = []
+        for project in rows:
+            row = {k: project[k] for k in columns}
+            if embed:
+                row["project_personality"] = self.personalities.get(project["id"])
+            body.append(row)
+        return httpx.Response(200, json=body)
+
+    def _upsert_personality(self, request: httpx.Request) -> httpx.Response:
+        user_id = self._user_id(request)
+        owned = {p["id"] for p in self.projects.get(user_id, [])}
+        payload = json.loads(request.content)
+        rows = payload if isinstance(payload, list) else [payload]
+        if any(row["project_id"] not in owned for row in rows):
+            return httpx.Response(
+                403,
+                json={"code": "42501", "message": "new row violates row-level security policy"},
+            )
+        saved = []
+        for row in rows:
+            self.personalities[row["project_id"]] = {**row, "id": row["project_id"]}
+            saved.append(self.personalities[row["project_id"]])
+        return httpx.Response(201, json=saved)
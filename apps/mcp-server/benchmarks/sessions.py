@@ -0,0 +1,447 @@
+"""Session-script load test for the MCP server.
+
+Starts the app from ``create_app()`` under uvicorn on a loopback port, with
+Supabase replaced by :class:`~benchmarks.fake_supabase.FakeSupabase`.
+Each simulated user signs in through the real OAuth proxy flow, then
+concurrent MCP sessions run the script a client runs when it starts work:
+
+    initialize -> list_user_projects -> get_project_context
+    -> load_skill -> save_project_personality
+
+Requests/sec and p50/p90/p99 latency are reported per step. ``--json``
+writes the results (with the git commit) and ``--compare`` diffs them
+against an earlier run::
+
+    cd apps/mcp-server
+    PYTHONPATH=src uv run python -m benchmarks.sessions --sessions 500 \\
+        --concurrency 32 --upstream-latency-ms 20 --json bench.json
+
+The load generator shares the process (and CPU) with the server, so
+compare results from the same machine only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import platform
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import uvicorn
+
+from benchmarks.fake_supabase import FakeSupabase
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+SUPABASE_URL = "https://bench.supabase.co"
+REDIRECT_URI = "http://127.0.0.1:9/callback"
+MCP_PATH = "/mcp"
+PROTOCOL_VERSION = "2025-06-18"
+
+STEPS = (
+    "initialize",
+    "list_user_projects",
+    "get_project_context",
+    "load_skill",
+    "save_project_personality",
+)
+
+# Values of the project_personality enums (supabase/migrations).
+PERSONALITY = {
+    "challenge_level": "raise_concerns_gently",
+    "transparency_level": "explain_reasoning",
+    "ux_design_model": "ship_proposes_refine",
+    "development_approach": "balanced_quality",
+    "documentation_level": "simple_overview",
+}
+
+
+@dataclass
+class Options:
+    sessions: int = 200
+    concurrency: int = 16
+    users: int = 16
+    warmup_sessions: int = 10
+    upstream_latency_ms: float = 0.0
+    stateless: bool = False
+    skill: str = "matching"
+
+
+@dataclass
+class Recorder:
+    samples: dict[str, list[float]] = field(default_factory=lambda: {s: [] for s in STEPS})
+    errors: dict[str, int] = field(default_factory=lambda: dict.fromkeys(STEPS, 0))
+    enabled: bool = True
+
+    async def time(self, step: str, call):
+        started = time.perf_counter()
+        try:
+            result = await call
+        except Exception:
+            if self.enabled:
+                self.errors[step] += 1
+            raise
+        if self.enabled:
+            self.samples[step].append(time.perf_counter() - started)
+        return result
+
+
+# --- statistics ---
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float], wall_seconds: float) -> dict:
+    """Count, throughput and latency percentiles (milliseconds)."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "rps": round(len(ordered) / wall_seconds, 1) if wall_seconds else 0.0,
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(1000 * _percentile(ordered, 50), 3),
+        "p90_ms": round(1000 * _percentile(ordered, 90), 3),
+        "p99_ms": round(1000 * _percentile(ordered, 99), 3),
+        "max_ms": round(1000 * ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+# --- MCP over streamable HTTP ---
+
+
+class McpSession:
+    """Minimal JSON-RPC client for one MCP session (no SDK overhead)."""
+
+    def __init__(self, http: httpx.AsyncClient, access_token: str):
+        self.http = http
+        self.headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/json, text/event-stream",
+            "MCP-Protocol-Version": PROTOCOL_VERSION,
+        }
+        self.session_id: str | None = None
+        self._next_id = 0
+
+    def _headers(self) -> dict[str, str]:
+        if self.session_id:
+            return {**self.headers, "Mcp-Session-Id": self.session_id}
+        return self.headers
+
+    async def request(self, method: str, params: dict) -> dict:
+        self._next_id += 1
+        response = await self.http.post(
+            MCP_PATH,
+            json={"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params},
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+        self.session_id = response.headers.get("mcp-session-id", self.session_id)
+        message = _parse_message(response)
+        if "error" in message:
+            raise RuntimeError(f"{method}: {message['error']}")
+        return message["result"]
+
+    async def notify(self, method: str) -> None:
+        response = await self.http.post(
+            MCP_PATH, json={"jsonrpc": "2.0", "method": method}, headers=self._headers()
+        )
+        response.raise_for_status()
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        result = await self.request("tools/call", {"name": name, "arguments": arguments})
+        if result.get("isError"):
+            raise RuntimeError(f"{name}: {result['content']}")
+        payload = result.get("structuredContent")
+        if payload is None:
+            payload = json.loads(result["content"][0]["text"])
+        if payload.get("status") not in ("ok", None):
+            raise RuntimeError(f"{name}: {payload}")
+        return payload
+
+    async def close(self) -> None:
+        if self.session_id:
+            await self.http.delete(MCP_PATH, headers=self._headers())
+
+
+def _parse_message(response: httpx.Response) -> dict:
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        data = [
+            line[5:].strip()
+            for line in response.text.splitlines()
+            if line.startswith("data:")
+        ]
+        return json.loads(data[-1])
+    return response.json()
+
+
+async def run_session(http: httpx.AsyncClient, access_token: str, rec: Recorder, skill: str):
+    session = McpSession(http, access_token)
+    try:
+        await rec.time("initialize", session.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "coship-bench", "version": "0"},
+        }))
+        await session.notify("notifications/initialized")
+        projects = await rec.time(
+            "list_user_projects", session.call_tool("list_user_projects", {})
+        )
+        project_id = projects["projects"][0]["id"]
+        await rec.time(
+            "get_project_context",
+            session.call_tool("get_project_context", {"project_id": project_id}),
+        )
+        await rec.time("load_skill", session.call_tool("load_skill", {"skill_name": skill}))
+        await rec.time(
+            "save_project_personality",
+            session.call_tool(
+                "save_project_personality", {"project_id": project_id, **PERSONALITY}
+            ),
+        )
+    finally:
+        await session.close()
+
+
+# --- sign-in through the OAuth proxy ---
+
+
+async def sign_in(http: httpx.AsyncClient, supabase_tokens: dict, api_secret: str) -> str:
+    """Run DCR, /authorize, the cockpit callback and /token; return an MCP access token."""
+    from coship_mcp.auth_code import encrypt_auth_code
+
+    client = (await http.post("/register", json={
+        "redirect_uris": [REDIRECT_URI],
+        "client_name": "coship-bench",
+        "grant_types": ["authorization_code", "refresh_token"],
+        "token_endpoint_auth_method": "client_secret_post",
+    })).json()
+
+    verifier = secrets.token_urlsafe(48)
+    challenge = base64.urlsafe_b64encode(
+        hashlib.sha256(verifier.encode()).digest()
+    ).rstrip(b"=").decode()
+    authorize = await http.get("/authorize", params={
+        "response_type": "code",
+        "client_id": client["client_id"],
+        "redirect_uri": REDIRECT_URI,
+        "state": secrets.token_urlsafe(8),
+        "code_challenge": challenge,
+        "code_challenge_method": "S256",
+    })
+    transaction = parse_qs(urlparse(authorize.headers["location"]).query)["state"][0]
+
+    # What the cockpit does after the user signs in to Supabase.
+    callback = await http.get("/auth/callback", params={
+        "code": encrypt_auth_code(supabase_tokens, api_secret),
+        "state": transaction,
+    })
+    code = parse_qs(urlparse(callback.headers["location"]).query)["code"][0]
+
+    token = await http.post("/token", data={
+        "grant_type": "authorization_code",
+        "code": code,
+        "redirect_uri": REDIRECT_URI,
+        "client_id": client["client_id"],
+        "client_secret": client.get("client_secret", ""),
+        "code_verifier": verifier,
+    })
+    token.raise_for_status()
+    return token.json()["access_token"]
+
+
+# --- driver ---
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=APP_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(options: Options) -> dict:
+    """Start the server, run the session scripts and return the results."""
+    from coship_mcp.config import get_settings
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    base_url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    api_secret = secrets.token_urlsafe(32)
+    # Through the environment rather than Settings(...): modules such as db
+    # read the process-wide settings.
+    environment = {
+        "COSHIP_SUPABASE_URL": SUPABASE_URL,
+        "COSHIP_SUPABASE_ANON_KEY": "bench-anon-key",
+        "COSHIP_SERVER_BASE_URL": base_url,
+        "COSHIP_API_SECRET": api_secret,
+        "COSHIP_DEV_MODE": "false",
+        "COSHIP_STATELESS_HTTP": str(options.stateless).lower(),
+        "COSHIP_OAUTH_STORAGE": "memory",
+        "COSHIP_SKILLS_DIR": str(APP_ROOT / "skills"),
+        "COSHIP_LOG_LEVEL": "WARNING",
+    }
+    with patch.dict(os.environ, environment):
+        get_settings.cache_clear()
+        try:
+            return await _run(options, sock, base_url, api_secret)
+        finally:
+            get_settings.cache_clear()
+
+
+async def _run(options: Options, sock: socket.socket, base_url: str, api_secret: str) -> dict:
+    from coship_mcp import db
+    from coship_mcp.server import create_app
+
+    fake = FakeSupabase(SUPABASE_URL, latency=options.upstream_latency_ms / 1000)
+    db._http_client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+
+    app = create_app()
+    server = uvicorn.Server(uvicorn.Config(
+        app, log_config=None, access_log=False, lifespan="on", timeout_graceful_shutdown=5
+    ))
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+    try:
+        while not server.started:
+            if serving.done():
+                serving.result()
+            await asyncio.sleep(0.01)
+
+        limits = httpx.Limits(max_connections=options.concurrency + 4)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+            tokens = [
+                await sign_in(http, fake.add_user()[1], api_secret)
+                for _ in range(options.users)
+            ]
+            rec = Recorder()
+
+            async def worker(queue: asyncio.Queue) -> None:
+                while True:
+                    try:
+                        queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        await run_session(http, random.choice(tokens), rec, options.skill)
+                    except Exception:
+                        pass  # counted by the recorder
+
+            async def run_batch(count: int) -> float:
+                queue: asyncio.Queue = asyncio.Queue()
+                for i in range(count):
+                    queue.put_nowait(i)
+                started = time.perf_counter()
+                await asyncio.gather(*(worker(queue) for _ in range(options.concurrency)))
+                return time.perf_counter() - started
+
+            rec.enabled = False
+            await run_batch(options.warmup_sessions)
+            rec.enabled = True
+            wall = await run_batch(options.sessions)
+    finally:
+        server.should_exit = True
+        await serving
+
+    all_samples = [s for step in STEPS for s in rec.samples[step]]
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": options.__dict__,
+        },
+        "wall_seconds": round(wall, 3),
+        "sessions_per_second": round(options.sessions / wall, 1),
+        "upstream_requests": fake.requests,
+        "overall": {**summarize(all_samples, wall), "errors": sum(rec.errors.values())},
+        "steps": {
+            step: {**summarize(rec.samples[step], wall), "errors": rec.errors[step]}
+            for step in STEPS
+        },
+    }
+
+
+def format_report(results: dict, baseline: dict | None = None) -> str:
+    header = f"{'step':<26}{'count':>7}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'errors':>8}"
+    if baseline:
+        header += f"{'Δ req/s':>10}{'Δ p99':>9}"
+    lines = [header, "-" * len(header)]
+    rows = [*results["steps"].items(), ("overall", results["overall"])]
+    for name, row in rows:
+        line = (
+            f"{name:<26}{row['count']:>7}{row['rps']:>9.1f}{row['p50_ms']:>9.2f}"
+            f"{row['p90_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['errors']:>8}"
+        )
+        if baseline:
+            base = baseline["overall"] if name == "overall" else baseline["steps"].get(name)
+            if base:
+                line += f"{_change(row['rps'], base['rps']):>10}{_change(row['p99_ms'], base['p99_ms']):>9}"
+        lines.append(line)
+    lines.append(
+        f"\n{results['sessions_per_second']} sessions/s over {results['wall_seconds']}s "
+        f"({results['upstream_requests']} upstream requests)"
+    )
+    return "\n".join(lines)
+
+
+def _change(new: float, old: float) -> str:
+    return f"{100 * (new - old) / old:+.1f}%" if old else "n/a"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=Options.sessions)
+    parser.add_argument("--concurrency", type=int, default=Options.concurrency)
+    parser.add_argument("--users", type=int, default=Options.users, help="Distinct signed-in users")
+    parser.add_argument("--warmup-sessions", type=int, default=Options.warmup_sessions)
+    parser.add_argument(
+        "--upstream-latency-ms", type=float, default=Options.upstream_latency_ms,
+        help="Delay added to every fake Supabase request",
+    )
+    parser.add_argument("--stateless", action="store_true", help="Run with COSHIP_STATELESS_HTTP")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--compare", type=Path, help="Results JSON from an earlier run")
+    args = parser.parse_args(argv)
+
+    options = Options(
+        sessions=args.sessions,
+        concurrency=args.concurrency,
+        users=args.users,
+        warmup_sessions=args.warmup_sessions,
+        upstream_latency_ms=args.upstream_latency_ms,
+        stateless=args.stateless,
+    )
+    results = asyncio.run(run(options))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print(format_report(results, baseline))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    if results["overall"]["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
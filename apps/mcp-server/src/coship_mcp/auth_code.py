@@ -6,14 +6,21 @@ SHA-256 of the shared COSHIP_API_SECRET.
 
 Wire format (base64url-encoded):
     iv[12 bytes] || ciphertext || authTag[16 bytes]
+
+Key derivation and cipher setup happen once per secret in
+:class:`AuthCodeCodec`; the server holds a single codec for its lifetime.
 """
 
 from __future__ import annotations
 
 import base64
+import functools
 import hashlib
 import json
+import os
+from collections.abc import Sequence
 
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 
@@ -22,6 +29,77 @@ def _derive_key(secret: str) -> bytes:
     return hashlib.sha256(secret.encode()).digest()
 
 
+class AuthCodeCodec:
+    """Reusable AES-256-GCM auth code codec.
+
+    Supports key rotation: the first secret encrypts, and decryption tries
+    every secret in order, so codes minted with a previous secret keep
+    working until it is retired.
+    """
+
+    def __init__(self, secrets: str | Sequence[str]):
+        if isinstance(secrets, str):
+            secrets = [secrets]
+        ciphers = tuple(AESGCM(_derive_key(s)) for s in secrets if s)
+        if not ciphers:
+            raise ValueError("At least one non-empty secret is required")
+        self._ciphers = ciphers
+
+    def decrypt(self, code: str) -> dict:
+        """Decrypt a base64url-encoded AES-256-GCM auth code.
+
+        Args:
+            code: base64url-encoded string of iv + ciphertext + authTag
+
+        Returns:
+            Decrypted JSON payload as a dict.
+
+        Raises:
+            ValueError: If decryption fails (wrong key, tampered data, etc.)
+        """
+        # base64url decode — add padding if needed
+        padded = code + "=" * (-len(code) % 4)
+        try:
+            raw = base64.urlsafe_b64decode(padded)
+        except Exception as exc:
+            raise ValueError("Invalid base64url encoding") from exc
+
+        if len(raw) < 12 + 16:
+            raise ValueError("Encrypted payload too short")
+
+        iv = raw[:12]
+        ct_and_tag = raw[12:]
+
+        for cipher in self._ciphers:
+            try:
+                plaintext = cipher.decrypt(iv, ct_and_tag, None)
+            except InvalidTag:
+                continue
+            except Exception as exc:
+                raise ValueError("Decryption failed: invalid key or tampered data") from exc
+            return json.loads(plaintext)
+
+        raise ValueError("Decryption failed: invalid key or tampered data")
+
+    def encrypt(self, data: dict) -> str:
+        """Encrypt a dict payload with the current (first) secret.
+
+        Returns:
+            base64url-encoded string (no padding)
+        """
+        iv = os.urandom(12)
+        plaintext = json.dumps(data).encode()
+
+        ct_and_tag = self._ciphers[0].encrypt(iv, plaintext, None)
+        return base64.urlsafe_b64encode(iv + ct_and_tag).decode().rstrip("=")
+
+
+@functools.lru_cache(maxsize=8)
+def get_codec(secret: str) -> AuthCodeCodec:
+    """Return the shared codec for a single secret."""
+    return AuthCodeCodec(secret)
+
+
 def decrypt_auth_code(code: str, secret: str) -> dict:
     """Decrypt a base64url-encoded AES-256-GCM auth code.
 
@@ -35,27 +113,7 @@ def decrypt_auth_code(code: str, secret: str) -> dict:
     Raises:
         ValueError: If decryption fails (wrong key, tampered data, etc.)
     """
-    key = _derive_key(secret)
-
-    # base64url decode — add padding if needed
-    padded = code + "=" * (-len(code) % 4)
-    try:
-        raw = base64.urlsafe_b64decode(padded)
-    except Exception as exc:
-        raise ValueError("Invalid base64url encoding") from exc
-
-    if len(raw) < 12 + 16:
-        raise ValueError("Encrypted payload too short")
-
-    iv = raw[:12]
-    ct_and_tag = raw[12:]
-
-    try:
-        plaintext = AESGCM(key).decrypt(iv, ct_and_tag, None)
-    except Exception as exc:
-        raise ValueError("Decryption failed: invalid key or tampered data") from exc
-
-    return json.loads(plaintext)
+    return get_codec(secret).decrypt(code)
 
 
 def encrypt_auth_code(data: dict, secret: str) -> str:
@@ -71,11 +129,4 @@ def encrypt_auth_code(data: dict, secret: str) -> str:
     Returns:
         base64url-encoded string (no padding)
     """
-    import os
-
-    key = _derive_key(secret)
-    iv = os.urandom(12)
-    plaintext = json.dumps(data).encode()
-
-    ct_and_tag = AESGCM(key).encrypt(iv, plaintext, None)
-    return base64.urlsafe_b64encode(iv + ct_and_tag).decode().rstrip("=")
+    return get_codec(secret).encrypt(data)
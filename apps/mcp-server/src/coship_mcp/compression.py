@@ -0,0 +1,120 @@
+"""Response compression for the HTTP transport.
+
+``CompressionMiddleware`` picks brotli (when the ``brotli`` package from
+the ``speedups`` extra is installed) or gzip from the request's
+``Accept-Encoding`` header.  It only compresses bodies of at least
+``minimum_size`` bytes.  Server-sent event streams are sent as-is, so MCP
+tool results are compressed only with ``COSHIP_JSON_RESPONSE=true``.  That setting makes the transport answer
+with plain JSON instead of an event stream.
+
+Every response that could be compressed carries ``Vary: Accept-Encoding``,
+whatever its size.  A compressed response's ``ETag`` is made weak: its
+bytes differ from the identity body the tag was computed for.  So is the
+``ETag`` of a 304 sent to a client that accepts compression.
+"""
+
+from __future__ import annotations
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+def _accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """The encoding to respond with: ``"br"``, ``"gzip"`` or None."""
+    accepted = _accepted_encodings(accept_encoding)
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        # Flush each chunk of a streamed body so the client is not kept waiting.
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as negotiated with the client."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder: IdentityResponder
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+
+        async def send_negotiated(message: Message) -> None:
+            # The responder has recorded what the app sent by the time it starts the response.
+            if message["type"] == "http.response.start" and not (
+                responder.content_encoding_set or responder.content_type_is_excluded
+            ):
+                headers = MutableHeaders(scope=message)
+                vary = {v.strip().lower() for v in headers.get("vary", "").split(",")}
+                if "accept-encoding" not in vary:
+                    headers.add_vary_header("Accept-Encoding")
+                # A 304 stands in for the compressed body the client has cached.
+                compressed = "content-encoding" in headers or (
+                    message["status"] == 304 and encoding is not None
+                )
+                etag = headers.get("etag")
+                if compressed and etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+            await send(message)
+
+        await responder(scope, receive, send_negotiated)
@@ -1,5 +1,8 @@
 """Configuration settings for CoShip MCP Server."""
 
+from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,13 +19,111 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_anon_key: str | None = None
 
+    # Supabase HTTP connection pool (one per worker process)
+    supabase_pool_max_connections: int = 100
+    supabase_pool_max_keepalive: int = 20
+    supabase_pool_keepalive_expiry: float = 30.0  # seconds
+    supabase_timeout: float = 10.0  # seconds
+
+    # Only used to subscribe to Realtime changes of project_personality (RLS
+    # hides other users' rows from the anon key). Unset: no change feed.
+    supabase_service_role_key: str | None = None
+    realtime_heartbeat_interval: float = 25.0  # seconds
+    realtime_max_backoff: float = 60.0  # seconds between reconnect attempts
+
+    # Per-project personality cache (kept current by the Realtime feed)
+    personality_cache_ttl: float = 30.0  # seconds, while the feed is down
+    personality_cache_max_age: float = 600.0  # seconds, while it is live
+    personality_cache_maxsize: int = 10_000
+
+    # Write-behind for save_project_personality: debounce saves per project
+    # and batch them into one upsert per user (off by default; single worker only)
+    personality_write_behind: bool = False
+    personality_write_window: float = 2.0  # seconds of quiet before writing
+    personality_write_max_wait: float = 10.0  # seconds a save may stay pending
+
+    # Most projects get_projects_context loads in one call
+    projects_context_max_batch: int = 20
+
+    # list_user_projects page size (default and largest allowed)
+    list_projects_page_size: int = 50
+    list_projects_max_limit: int = 100
+
     # Server Configuration
     server_base_url: str = "http://localhost:8000"
     server_name: str = "CoShip MCP Server"
     dev_mode: bool = True  # Disable OAuth auth for local development
+    # Don't keep MCP sessions in worker memory; needed when more than one
+    # worker (or replica) serves the same clients.
+    stateless_http: bool = False
+    # Answer MCP requests with plain JSON instead of an SSE stream, so tool
+    # results can be compressed. No streamed progress within a request.
+    json_response: bool = False
+    # gzip/brotli for response bodies at least this many bytes (0 disables)
+    compression_min_size: int = 1024
+
+    # Production launcher (coship-mcp console script)
+    host: str = "127.0.0.1"  # loopback; deployments bind 0.0.0.0 explicitly
+    port: int = 8000
+    workers: int = 1  # 0 = one per CPU core
+    keep_alive: int = 75  # seconds; keep above the proxy's idle timeout
+    backlog: int = 2048
+    graceful_timeout: int = 30  # seconds to drain in-flight requests
+    preload: bool = False  # build the app once in the supervisor before forking workers
+    # Honour X-Forwarded-For/Proto only from these proxy addresses
+    # (comma-separated, "*" = any; unset = uvicorn's default, 127.0.0.1)
+    proxy_headers: bool = True
+    forwarded_allow_ips: str | None = None
+
+    # Directory the workers share /metrics through (required with workers != 1;
+    # coship-mcp creates a temporary one when unset) and how often each worker
+    # saves its series there
+    metrics_dir: str = ""
+    metrics_flush_interval: float = 5.0  # seconds
+
+    # Verified-JWT cache (skips signature checks for repeat bearer tokens)
+    jwt_cache_maxsize: int = 10_000
+    jwt_cache_max_age: float = 300.0  # seconds; entries also expire at token exp
+
+    # Supabase JWKS (prefetched at startup, refreshed in the background)
+    jwks_refresh_interval: float = 600.0  # seconds
+    jwks_min_refetch_interval: float = 30.0  # floor between unknown-kid refetches
+
+    # Per-user cache of read-only, idempotent tool results (0 disables)
+    tool_cache_ttl: float = 30.0  # seconds
+    # Per-tool TTL overrides as JSON; load_skill is already served from memory
+    tool_cache_ttls: dict[str, float] = {
+        "get_subscription_info": 3600.0,
+        "list_skills": 3600.0,
+        "load_skill": 0.0,
+    }
+    tool_cache_maxsize: int = 10_000
+
+    # How long a refresh_token grant result is replayed to duplicate requests
+    token_refresh_result_ttl: float = 10.0  # seconds
+
+    # Logging
+    log_level: str = "INFO"
+    # Per-logger overrides as JSON, e.g. '{"fastmcp": "DEBUG"}'
+    log_levels: dict[str, str] = {}
+    log_format: Literal["text", "json"] = "text"
+    log_queue: bool = True  # format/write records off the event loop
+    # Fraction of token exchanges that log auth diagnostics (0 disables)
+    auth_debug_sample_rate: float = 0.0
 
     # API Secret (shared between cockpit and MCP server)
     api_secret: str = ""
+    # Retired secrets still accepted when decrypting auth codes (key rotation),
+    # tried in order after api_secret. JSON list, e.g. '["old-secret"]'.
+    api_secret_previous: list[str] = []
+
+    # OAuth proxy state (DCR clients, auth transactions, token mappings).
+    # "disk" is shared by all workers on the host and survives restarts;
+    # "memory" is per process (tests, throwaway single-worker runs).
+    oauth_storage: Literal["memory", "disk"] = "disk"
+    oauth_storage_dir: str = ""  # default: FastMCP's home dir /oauth-proxy
+    # Per-worker read cache for hot collections (0 disables)
+    oauth_storage_cache_ttl: float = 30.0  # seconds
 
     # Cockpit URL (for OAuth authorization UI)
     cockpit_url: str = "http://localhost:3000"
@@ -37,6 +138,22 @@ class Settings(BaseSettings):
 
     # Skills Configuration
     skills_dir: str = "skills"
+    # How long the cockpit may reuse /api/skills before revalidating (ETag)
+    skills_api_max_age: int = 60  # seconds
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment on first use.
+
+    Call ``get_settings.cache_clear()`` to pick up a changed environment.
+    """
+    return Settings()
 
 
-settings = Settings()
+def __getattr__(name: str):
+    # ``config.settings`` is resolved lazily so importing this module does
+    # not read the environment or .env.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,126 @@
+"""Pooled, async Supabase (PostgREST) access for user-scoped queries.
+
+One keep-alive HTTP connection pool is shared by every tool call in the
+worker process.  Each call gets a lightweight PostgREST client that sends
+the user's bearer token as a per-request header, so row-level security
+still applies and no TCP/TLS handshake is paid after the pool is warm.
+
+Everything here is non-blocking: queries are awaited on the event loop
+instead of tying up the worker thread pool.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import httpx
+from fastmcp.server.auth import AccessToken
+
+from coship_mcp.config import Settings, get_settings
+from coship_mcp.metrics import UPSTREAM_SECONDS, upstream_name
+
+if TYPE_CHECKING:
+    from postgrest import AsyncPostgrestClient
+
+_http_client: httpx.AsyncClient | None = None
+# Settings of the running app (see ``configure``); the environment otherwise.
+_settings: Settings | None = None
+
+# Postgres error codes raised when RLS rejects a write, or when the row it
+# references no longer exists (e.g. a project deleted mid-request).
+_NOT_OWNED_CODES = frozenset({
+    "42501",  # insufficient_privilege — row-level security violation
+    "23503",  # foreign_key_violation
+})
+
+
+def configure(settings: Settings) -> None:
+    """Use ``settings`` (rather than the environment) for the pooled client."""
+    global _settings
+    _settings = settings
+
+
+def _current_settings() -> Settings:
+    return _settings if _settings is not None else get_settings()
+
+
+def _pool_limits(settings: Settings) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.supabase_pool_max_connections,
+        max_keepalive_connections=settings.supabase_pool_max_keepalive,
+        keepalive_expiry=settings.supabase_pool_keepalive_expiry,
+    )
+
+
+async def _start_timer(request: httpx.Request) -> None:
+    request.extensions["coship_started"] = time.perf_counter()
+
+
+async def _record_upstream(response: httpx.Response) -> None:
+    started = response.request.extensions.get("coship_started")
+    if started is not None:
+        UPSTREAM_SECONDS.observe(
+            time.perf_counter() - started,
+            upstream=upstream_name(response.request.url.path),
+            status=f"{response.status_code // 100}xx",
+        )
+
+
+def get_http_client(settings: Settings | None = None) -> httpx.AsyncClient:
+    """Return the process-wide pooled HTTP client, creating it on first use.
+
+    The pool is sized from ``settings``, or from the configured settings.
+    """
+    global _http_client
+    # No lock needed: creation never awaits, so it cannot interleave on the loop.
+    if _http_client is None or _http_client.is_closed:
+        settings = settings or _current_settings()
+        _http_client = httpx.AsyncClient(
+            limits=_pool_limits(settings),
+            timeout=settings.supabase_timeout,
+            follow_redirects=True,
+            event_hooks={"request": [_start_timer], "response": [_record_upstream]},
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the pooled HTTP client (called on app shutdown)."""
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
+
+
+def preload_db(settings: Settings) -> None:
+    """Import the PostgREST client and create the pool ahead of the first query."""
+    import postgrest  # noqa: F401
+
+    get_http_client(settings)
+
+
+def _auth_headers(settings: Settings, access_token: str) -> dict[str, str]:
+    """Headers for a Supabase request made on behalf of ``access_token``."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    if settings.supabase_anon_key:
+        headers["apikey"] = settings.supabase_anon_key
+    return headers
+
+
+def user_postgrest(token: AccessToken, settings: Settings) -> AsyncPostgrestClient:
+    """Return a user-scoped async PostgREST client backed by the shared pool."""
+    from postgrest import AsyncPostgrestClient
+
+    return AsyncPostgrestClient(
+        f"{settings.supabase_url.rstrip('/')}/rest/v1",
+        headers=_auth_headers(settings, token.token),
+        http_client=get_http_client(settings),
+    )
+
+
+def is_not_owned_error(exc: Exception) -> bool:
+    """True if a PostgREST error means the target row is missing or not ours."""
+    from postgrest import APIError
+
+    return isinstance(exc, APIError) and exc.code in _NOT_OWNED_CODES
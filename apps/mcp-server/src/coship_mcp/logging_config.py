@@ -0,0 +1,115 @@
+"""Settings-driven logging for the MCP server.
+
+Handlers on the request path only enqueue records: a ``QueueHandler`` on
+the root logger hands them to a ``QueueListener`` thread that formats and
+writes them, so a slow stdout/log shipper never blocks the event loop.
+
+Verbose auth diagnostics are off by default and, when enabled, sampled
+(``auth_debug_sample_rate``) so they can be turned on in production
+without logging every token exchange.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+from coship_mcp.config import Settings
+
+# Logger for sampled token-exchange diagnostics (see ``auth_debug_enabled``).
+auth_logger = logging.getLogger("coship_mcp.auth")
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``.
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: logging.Handler | None = None
+_auth_sample_rate = 0.0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+def configure_logging(settings: Settings) -> None:
+    """Install the root handler and per-component levels from settings.
+
+    Safe to call more than once: the handler installed by a previous call
+    is replaced, and handlers added by others (e.g. pytest) are kept.
+    """
+    global _listener, _queue_handler, _auth_sample_rate
+    shutdown_logging()
+
+    root = logging.getLogger()
+    root.setLevel(settings.log_level.upper())
+    for name, level in settings.log_levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(_formatter(settings.log_format))
+    if settings.log_queue:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(
+            log_queue, output, respect_handler_level=True
+        )
+        _listener.start()
+    else:
+        _queue_handler = output
+    root.addHandler(_queue_handler)
+
+    _auth_sample_rate = settings.auth_debug_sample_rate
+    if _auth_sample_rate > 0:
+        auth_logger.setLevel(logging.DEBUG)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and remove the handler ``configure_logging`` added."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def auth_debug_enabled() -> bool:
+    """True for the sampled fraction of requests that should log auth details.
+
+    Callers check this *before* building diagnostics, so unsampled requests
+    pay one float comparison.
+    """
+    rate = _auth_sample_rate
+    return rate > 0 and (rate >= 1 or random.random() < rate)
@@ -0,0 +1,209 @@
+"""In-process latency metrics rendered in the Prometheus text format.
+
+A deliberately small implementation (counters are the ``_count`` series
+of each histogram) so the server does not need ``prometheus_client``.
+
+Each worker process records its own series.  Behind uvicorn's shared port
+a scrape reaches an arbitrary worker, so with several workers they share
+a directory (``COSHIP_METRICS_DIR``): every worker saves a snapshot of its
+series there, and ``/metrics`` renders the sum of all snapshots.  The
+snapshot of an exited worker is kept, so the summed counters never go
+backwards while workers are restarted.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+
+# Seconds; tuned for sub-millisecond cache hits up to slow upstream calls.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with a fixed label set."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[dict[str, str]]:
+        """Time a block. Labels may be filled in (or changed) inside it."""
+        labels = dict(labels)
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        return sum(series[0]) if series else 0
+
+    def snapshot(self) -> list:
+        """The series as JSON-compatible ``[label values, counts, sum]`` rows."""
+        return [[list(key), list(counts), total] for key, (counts, total) in self._series.items()]
+
+    def render(self, snapshots: Iterable[list] | None = None) -> list[str]:
+        """Render this process's series, or the sum of ``snapshots`` if given."""
+        if snapshots is None:
+            series = self._series
+        else:
+            series = {}
+            for rows in snapshots:
+                for key, counts, total in rows:
+                    if len(counts) != len(self.buckets) + 1:
+                        continue  # saved by a worker with other buckets
+                    merged = series.setdefault(tuple(key), [[0] * len(counts), 0.0])
+                    merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                    merged[1] += total
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, (counts, total) in sorted(series.items()):
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels([*pairs, ('le', le)])} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Histogram] = []
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, snapshots: Sequence[dict[str, list]] | None = None) -> str:
+        """Render this process's metrics, or the sum of ``snapshots`` if given."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            if snapshots is None:
+                lines.extend(metric.render())
+            else:
+                lines.extend(metric.render(s.get(metric.name, []) for s in snapshots))
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, list]:
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+    # --- sharing between worker processes ---
+
+    def save(self, directory: str | Path) -> None:
+        """Write this process's snapshot to ``directory`` (atomically)."""
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        path = Path(directory) / f"{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path)
+
+    def render_shared(self, directory: str | Path) -> str:
+        """Save this process's snapshot, then render the sum of all in ``directory``.
+
+        Every value comes from a snapshot file, and a worker's file only ever
+        grows, so consecutive scrapes never see a counter decrease, whichever
+        worker serves them.
+        """
+        self.save(directory)
+        snapshots = []
+        for path in Path(directory).glob("*.json"):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue  # removed or being replaced
+        return self.render(snapshots)
+
+
+REGISTRY = Registry()
+
+MCP_REQUEST_SECONDS = REGISTRY.histogram(
+    "coship_mcp_request_seconds",
+    "MCP request latency by JSON-RPC method.",
+    ["method", "status"],
+)
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "coship_tool_call_seconds",
+    "MCP tool call latency by tool.",
+    ["tool", "status"],
+)
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "coship_upstream_request_seconds",
+    "Supabase HTTP request latency (time to response headers).",
+    ["upstream", "status"],
+)
+JWT_VERIFY_SECONDS = REGISTRY.histogram(
+    "coship_jwt_verify_seconds",
+    "Bearer token verification latency.",
+    ["cache"],
+)
+SKILL_LOAD_SECONDS = REGISTRY.histogram(
+    "coship_skill_load_seconds",
+    "load_skill content lookup latency.",
+    ["status"],
+)
+
+
+def upstream_name(path: str) -> str:
+    """Classify a Supabase request path for the ``upstream`` label."""
+    if path.startswith("/rest/"):
+        return "postgrest"
+    if path.startswith("/auth/"):
+        return "auth"
+    return "other"
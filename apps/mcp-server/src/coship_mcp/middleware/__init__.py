@@ -1,5 +1,15 @@
 """Middleware components for CoShip MCP Server."""
 
-from coship_mcp.middleware.subscription import SubscriptionTierMiddleware
+from coship_mcp.middleware.metrics import MetricsMiddleware
+from coship_mcp.middleware.subscription import (
+    SubscriptionTierMiddleware,
+    get_user_tier,
+)
+from coship_mcp.middleware.tool_cache import ToolResultCacheMiddleware
 
-__all__ = ["SubscriptionTierMiddleware"]
+__all__ = [
+    "MetricsMiddleware",
+    "SubscriptionTierMiddleware",
+    "ToolResultCacheMiddleware",
+    "get_user_tier",
+]
@@ -0,0 +1,36 @@
+"""Metrics middleware recording MCP request and tool call latency."""
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from coship_mcp.metrics import MCP_REQUEST_SECONDS, TOOL_CALL_SECONDS
+
+
+class MetricsMiddleware(Middleware):
+    """Middleware that records latency histograms per MCP method and tool.
+
+    Results are exposed as Prometheus text on the /metrics route.
+    """
+
+    async def on_request(
+        self,
+        context: MiddlewareContext,
+        call_next,
+    ):
+        """Time every request by JSON-RPC method."""
+        method = context.method or "unknown"
+        with MCP_REQUEST_SECONDS.time(method=method, status="error") as labels:
+            result = await call_next(context)
+            labels["status"] = "ok"
+        return result
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext,
+        call_next,
+    ):
+        """Time tool calls by tool name."""
+        tool = getattr(context.message, "name", "unknown")
+        with TOOL_CALL_SECONDS.time(tool=tool, status="error") as labels:
+            result = await call_next(context)
+            labels["status"] = "ok"
+        return result
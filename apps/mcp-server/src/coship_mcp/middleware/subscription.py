@@ -1,13 +1,52 @@
 """Subscription tier middleware for gating skills by subscription level."""
 
+from fastmcp.server.auth import AccessToken
+from fastmcp.server.dependencies import get_access_token
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 
-from coship_mcp.skills_registry import SKILLS_REGISTRY
+from coship_mcp.skills_registry import get_skill_index
 
-# Derive pro skills from the single source of truth
-PRO_SKILLS = {
-    s["id"] for s in SKILLS_REGISTRY if s["tier"] == "pro" and s["status"] == "available"
-}
+_SKILL_SCHEME = "skill://"
+
+class TieredAccessToken(AccessToken):
+    """An ``AccessToken`` with the tier resolved when it was verified.
+
+    CachingJWTVerifier returns these, so the tier is resolved once and
+    expires with the cached token.  The tier is kept beside the signed
+    claims, never in them.
+    """
+
+    subscription_tier: str
+
+
+def resolve_tier(claims: dict) -> str:
+    """Subscription tier from JWT ``app_metadata``.
+
+    The tier is synced into ``app_metadata.subscription_tier`` by a
+    Supabase database trigger; tokens without one are ``free``.
+    """
+    app_metadata = claims.get("app_metadata") or {}
+    return app_metadata.get("subscription_tier") or "free"
+
+
+def get_user_tier(token: AccessToken | None) -> str:
+    """Subscription tier of ``token``, as resolved when it was verified."""
+    if token is None:
+        return "free"
+    if isinstance(token, TieredAccessToken):
+        return token.subscription_tier
+    return resolve_tier(token.claims)
+
+
+def _is_pro_uri(uri: str) -> bool:
+    """True if ``uri`` is a resource of a pro skill."""
+    index = get_skill_index()
+    if uri in index.pro_resource_uris:
+        return True
+    # Supporting files (skill://<id>/<path>) are served from a template.
+    if not uri.startswith(_SKILL_SCHEME):
+        return False
+    return uri[len(_SKILL_SCHEME):].partition("/")[0] in index.pro_skill_ids
 
 
 class SubscriptionTierMiddleware(Middleware):
@@ -19,65 +58,32 @@ class SubscriptionTierMiddleware(Middleware):
     - skills/pro/  - Requires pro subscription
 
     The provider exposes skills as skill://<skill-name>/SKILL.md URIs.
-    We determine tier by checking which directory the skill came from.
+    Only ``resources/read`` and the resource listings are intercepted;
+    free users are refused pro reads and do not see pro entries listed.
     """
 
-    PRO_SKILLS = PRO_SKILLS
-
-    def _get_tier_from_context(self, context: MiddlewareContext) -> str:
-        """Extract subscription tier from request context.
-
-        The tier is stored in JWT app_metadata.subscription_tier,
-        synced via Supabase database trigger.
-        """
-        try:
-            # Access the auth context from FastMCP
-            if hasattr(context, "auth_context") and context.auth_context:
-                token = context.auth_context
-                if hasattr(token, "claims"):
-                    app_metadata = token.claims.get("app_metadata", {})
-                    return app_metadata.get("subscription_tier", "free")
-        except Exception:
-            pass
-        return "free"
-
-    def _is_skill_allowed(self, uri: str, tier: str) -> bool:
-        """Check if a skill is allowed for the given tier.
-
-        Tier hierarchy:
-        - free: can access free skills only
-        - pro: can access all skills
-        """
-        # Extract skill name from URI like "skill://code-review/SKILL.md"
-        if not uri.startswith("skill://"):
-            return True  # Not a skill resource, allow
-
-        # Parse skill name from URI
-        path = uri.replace("skill://", "")
-        skill_name = path.split("/")[0] if "/" in path else path
-
-        # Pro users can access everything
-        if tier == "pro":
-            return True
-
-        # Free users can only access non-pro skills
-        return skill_name not in self.PRO_SKILLS
-
-    async def on_request(
-        self,
-        context: MiddlewareContext,
-        call_next,
-    ):
-        """Check resource access on read requests."""
-        # Check if this is a resources/read request
-        if context.method == "resources/read":
-            tier = self._get_tier_from_context(context)
-            uri = str(getattr(context.message, "uri", ""))
-
-            if not self._is_skill_allowed(uri, tier):
+    async def on_read_resource(self, context: MiddlewareContext, call_next):
+        """Refuse reads of pro skill resources for non-pro users."""
+        uri = str(context.message.uri)
+        if _is_pro_uri(uri):
+            tier = get_user_tier(get_access_token())
+            if tier != "pro":
                 raise PermissionError(
                     f"Access denied: '{uri}' requires a Pro subscription. "
                     f"Your current tier: {tier}. Upgrade at https://coship.dev/pricing"
                 )
-
         return await call_next(context)
+
+    async def on_list_resources(self, context: MiddlewareContext, call_next):
+        """Hide pro skill resources from non-pro users."""
+        resources = await call_next(context)
+        if not get_skill_index().pro_skill_ids or get_user_tier(get_access_token()) == "pro":
+            return resources
+        return [r for r in resources if not _is_pro_uri(str(r.uri))]
+
+    async def on_list_resource_templates(self, context: MiddlewareContext, call_next):
+        """Hide pro skill file templates from non-pro users."""
+        templates = await call_next(context)
+        if not get_skill_index().pro_skill_ids or get_user_tier(get_access_token()) == "pro":
+            return templates
+        return [t for t in templates if not _is_pro_uri(t.uri_template)]
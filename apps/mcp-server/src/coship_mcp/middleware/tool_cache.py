@@ -0,0 +1,160 @@
+"""Per-user cache of read-only tool results, driven by tool annotations."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+
+from fastmcp.server.dependencies import get_access_token
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools import ToolResult
+
+from coship_mcp.middleware.subscription import get_user_tier
+
+# (user sub, tier, tool name, canonical arguments)
+CacheKey = tuple[str, str, str, str]
+
+
+class ToolResultCacheMiddleware(Middleware):
+    """Memoize results of tools annotated ``readOnlyHint`` and ``idempotentHint``.
+
+    Entries are keyed by the caller's ``sub`` and tier, the tool name and its
+    arguments, expire after the tool's TTL and are evicted least recently
+    used beyond ``maxsize``.  Calls without an authenticated user and error
+    results are never cached.
+
+    A call to any other tool (such as ``save_project_personality``) drops
+    the caller's entries once it returns.  A read that was in flight at
+    that moment is not stored, so it cannot put back data the write
+    replaced.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 30.0,
+        ttls: Mapping[str, float] | None = None,
+        maxsize: int = 10_000,
+    ):
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.maxsize = maxsize
+        self._entries: OrderedDict[CacheKey, tuple[float, ToolResult]] = OrderedDict()
+        self._keys_by_user: dict[str, set[CacheKey]] = {}
+        # Invalidation sequence numbers: sub -> number of its last
+        # invalidation, bounded like the entries.  Users evicted from it (or
+        # dropped by clear()) count as invalidated at ``_invalidated_floor``.
+        self._seq = 0
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._invalidated_floor = 0
+        self._barrier = 0  # seq of the last invalidation across all users
+        # Tool name -> (read-only?, TTL), resolved from annotations once.
+        self._policies: dict[str, tuple[bool, float]] = {}
+
+    async def _policy(self, context: MiddlewareContext, name: str) -> tuple[bool, float]:
+        policy = self._policies.get(name)
+        if policy is None:
+            try:
+                tool = await context.fastmcp_context.fastmcp.get_tool(name)
+            except Exception:
+                tool = None
+            if tool is None:
+                # Unknown (or hidden) tool: the call fails downstream.
+                return (True, 0.0)
+            annotations = tool.annotations
+            read_only = bool(annotations and annotations.readOnlyHint)
+            ttl = 0.0
+            if read_only and annotations.idempotentHint:
+                ttl = self.ttls.get(name, self.default_ttl)
+            policy = self._policies[name] = (read_only, ttl)
+        return policy
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        """Serve repeated read-only calls from the cache; invalidate on writes."""
+        token = get_access_token()
+        sub = token.claims.get("sub") if token is not None and token.claims else None
+        if not sub:
+            return await call_next(context)
+
+        name = context.message.name
+        read_only, ttl = await self._policy(context, name)
+        if not read_only:
+            try:
+                return await call_next(context)
+            finally:
+                self.invalidate_user(sub)
+        if ttl <= 0:
+            return await call_next(context)
+
+        key = (sub, get_user_tier(token), name, _canonical(context.message.arguments))
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return result
+            self._discard(key)
+
+        started = self._seq
+        result = await call_next(context)
+        # Not stored if the user's entries were invalidated meanwhile.
+        last_invalidated = max(self._invalidated.get(sub, self._invalidated_floor), self._barrier)
+        if _cacheable(result) and last_invalidated <= started:
+            self._store(key, time.monotonic() + ttl, result)
+        return result
+
+    def _store(self, key: CacheKey, expires_at: float, result: ToolResult) -> None:
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def invalidate_user(self, sub: str) -> None:
+        """Drop every cached result for one user."""
+        self._seq += 1
+        self._invalidated[sub] = self._seq
+        self._invalidated.move_to_end(sub)
+        if len(self._invalidated) > self.maxsize:
+            _, seq = self._invalidated.popitem(last=False)
+            self._invalidated_floor = max(self._invalidated_floor, seq)
+        for key in self._keys_by_user.pop(sub, ()):
+            self._entries.pop(key, None)
+
+    def invalidate_results(self, predicate: Callable[[dict], bool]) -> None:
+        """Drop every user's results whose structured content matches ``predicate``."""
+        self._seq += 1
+        self._barrier = self._seq
+        for key, (_, result) in list(self._entries.items()):
+            if predicate(result.structured_content):
+                self._discard(key)
+
+    def clear(self) -> None:
+        """Drop every cached result (e.g. after a skills reload)."""
+        self._seq += 1
+        self._invalidated.clear()
+        self._invalidated_floor = self._barrier = self._seq
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _canonical(arguments: dict | None) -> str:
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _cacheable(result: ToolResult) -> bool:
+    if result.structured_content is None:
+        return False
+    return result.structured_content.get("status") != "error"
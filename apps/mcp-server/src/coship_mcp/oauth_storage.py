@@ -0,0 +1,93 @@
+"""Storage backend for OAuthProxy state.
+
+OAuthProxy keeps DCR client registrations, pending authorization
+transactions, authorization codes and issued-token mappings in a
+key-value store.  ``build_oauth_storage`` picks the backend from
+``COSHIP_OAUTH_STORAGE``:
+
+- ``disk`` (default): an encrypted SQLite-backed store (diskcache) that
+  every worker on the host shares, so an OAuth callback may land on any
+  worker and state survives restarts.
+- ``memory``: per process; only for tests and throwaway single-worker runs.
+
+Entries expire on the TTL OAuthProxy gives them.  Client registrations,
+which are read on every authorization and effectively never change, are
+fronted by a short-lived per-process read cache.  Everything else is
+mutable and read straight from the shared store: transactions and
+authorization codes are single-use, and OAuthProxy rewrites the upstream
+token set (under the same id) and its JTI mappings on every refresh, so a
+per-worker copy would serve rotated tokens to other workers.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from cryptography.fernet import Fernet
+from fastmcp import settings as fastmcp_settings
+from fastmcp.server.auth.jwt_issuer import derive_jwt_key
+from key_value.aio.protocols.key_value import AsyncKeyValue
+from key_value.aio.stores.memory import MemoryStore
+from key_value.aio.wrappers.encryption import FernetEncryptionWrapper
+from key_value.aio.wrappers.passthrough_cache import PassthroughCacheWrapper
+from key_value.aio.wrappers.routing import CollectionRoutingWrapper
+
+from coship_mcp.config import Settings
+
+# OAuthProxy collections that are read far more often than written, and
+# whose entries are never rewritten in place.
+CACHED_COLLECTIONS = ("mcp-oauth-proxy-clients",)
+
+_READ_CACHE_MAX_ENTRIES = 10_000
+
+
+def _encryption_key(settings: Settings) -> bytes:
+    # Same derivation as OAuthProxy's built-in disk store, so state written
+    # before this backend was configurable stays readable.
+    jwt_signing_key = derive_jwt_key(
+        high_entropy_material=settings.api_secret,
+        salt="fastmcp-jwt-signing-key",
+    )
+    return derive_jwt_key(
+        high_entropy_material=jwt_signing_key.decode(),
+        salt="fastmcp-storage-encryption-key",
+    )
+
+
+def _disk_store(settings: Settings) -> AsyncKeyValue:
+    # Imported lazily: pulls in sqlite3/diskcache.
+    from key_value.aio.stores.disk import DiskStore
+
+    directory = (
+        Path(settings.oauth_storage_dir)
+        if settings.oauth_storage_dir
+        else fastmcp_settings.home / "oauth-proxy"
+    )
+    return FernetEncryptionWrapper(
+        key_value=DiskStore(directory=directory),
+        fernet=Fernet(key=_encryption_key(settings)),
+    )
+
+
+def build_oauth_storage(settings: Settings) -> AsyncKeyValue:
+    """Build the ``client_storage`` passed to OAuthProxy."""
+    backend = settings.oauth_storage
+    if backend == "memory":
+        return MemoryStore()
+    if backend != "disk":
+        raise ValueError(f"Unknown OAuth storage backend: {backend!r}")
+
+    store = _disk_store(settings)
+    if settings.oauth_storage_cache_ttl <= 0:
+        return store
+
+    cached = PassthroughCacheWrapper(
+        primary_key_value=store,
+        cache_key_value=MemoryStore(max_entries_per_collection=_READ_CACHE_MAX_ENTRIES),
+        maximum_ttl=settings.oauth_storage_cache_ttl,
+        missing_ttl=settings.oauth_storage_cache_ttl,
+    )
+    return CollectionRoutingWrapper(
+        collection_map=dict.fromkeys(CACHED_COLLECTIONS, cached),
+        default_store=store,
+    )
@@ -0,0 +1,136 @@
+"""Per-project cache of ``project_personality`` rows, kept warm by Realtime.
+
+``get_project_context`` reads the personality from here and only embeds it
+in its PostgREST query on a miss; ``save_project_personality`` writes
+through.  While the Realtime feed (see ``realtime_feed``) is subscribed,
+INSERT/UPDATE/DELETE events are applied as they arrive and entries stay
+valid for ``max_age``.  While it is down, or when it is not configured,
+entries expire after ``ttl`` instead.
+
+Entries are stamped with the feed's epoch, which changes whenever the feed
+connects or drops.  Entries from an earlier epoch may have missed events,
+so they fall back to ``ttl``.
+
+The cache is shared by all users: callers must still check that the user
+owns the project (the project row query does that).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    row: dict | None  # None: the project has no personality yet
+    stored_at: float
+    epoch: int
+
+
+class PersonalityCache:
+    """LRU of personality rows by project id."""
+
+    def __init__(self, ttl: float = 30.0, max_age: float = 600.0, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # Personality row id -> project id, for DELETE events (which carry only the key)
+        self._projects_by_row: dict[str, str] = {}
+        self._epoch = 0
+        self._live = False
+        self._changes = 0  # number of change events applied
+        # Called with a project id whenever a change event arrives for it.
+        self.listeners: list[Callable[[str], None]] = []
+
+    # --- feed status ---
+
+    @property
+    def live(self) -> bool:
+        """True while the Realtime feed is subscribed."""
+        return self._live
+
+    def set_live(self, live: bool) -> None:
+        """Record a feed (re)connect or disconnect; starts a new epoch."""
+        if live != self._live:
+            self._epoch += 1
+            self._live = live
+
+    # --- lookups ---
+
+    def get(self, project_id: str) -> tuple[bool, dict | None]:
+        """Return ``(hit, row)``; ``row`` is None for a known "no personality"."""
+        entry = self._entries.get(project_id)
+        if entry is None:
+            return False, None
+        live = self._live and entry.epoch == self._epoch
+        if time.monotonic() - entry.stored_at >= (self.max_age if live else self.ttl):
+            self._discard(project_id)
+            return False, None
+        self._entries.move_to_end(project_id)
+        return True, entry.row
+
+    def generation(self) -> int:
+        """Marker to pass to :meth:`put` for a row read from the database."""
+        return self._changes
+
+    def put(self, project_id: str, row: dict | None, generation: int | None = None) -> None:
+        """Store the current personality of a project (None = none saved).
+
+        With ``generation`` (taken before the read), the row is dropped if a
+        change event arrived meanwhile, as it may be older than the event.
+        """
+        if generation is not None and generation != self._changes:
+            return
+        previous = self._entries.pop(project_id, None)
+        if previous is not None and previous.row is not None:
+            self._projects_by_row.pop(str(previous.row.get("id")), None)
+        self._entries[project_id] = _Entry(row, time.monotonic(), self._epoch)
+        if row is not None and row.get("id") is not None:
+            self._projects_by_row[str(row["id"])] = project_id
+        while len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, project_id: str) -> None:
+        entry = self._entries.pop(project_id, None)
+        if entry is not None and entry.row is not None:
+            self._projects_by_row.pop(str(entry.row.get("id")), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._projects_by_row.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --- change feed ---
+
+    def apply_change(self, change: dict) -> None:
+        """Apply a Realtime ``postgres_changes`` payload for project_personality."""
+        event = change.get("eventType") or change.get("type")
+        self._changes += 1
+        if event in ("INSERT", "UPDATE"):
+            row = change.get("new") or change.get("record") or {}
+            project_id = row.get("project_id")
+            if not project_id:
+                return
+            self.put(project_id, row)
+        elif event == "DELETE":
+            old = change.get("old") or change.get("old_record") or {}
+            project_id = old.get("project_id") or self._projects_by_row.get(str(old.get("id")))
+            if not project_id:
+                return
+            self._discard(project_id)
+        else:
+            return
+        for listener in self.listeners:
+            try:
+                listener(project_id)
+            except Exception:
+                logger.exception("Personality change listener failed")
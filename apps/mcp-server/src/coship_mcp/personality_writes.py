@@ -0,0 +1,254 @@
+"""Write-behind buffer for ``save_project_personality`` (opt-in).
+
+While the matching skill runs, the assistant often saves a project's
+personality several times within seconds.  With
+``COSHIP_PERSONALITY_WRITE_BEHIND=true`` those saves are debounced per
+project: each save restarts the project's ``window`` (bounded by
+``max_wait`` since its first pending save), and only the last value is
+written.  Projects that come due together are written in one multi-row
+upsert per user.  PostgREST applies row-level security with the caller's
+JWT, so rows of different users cannot share a request.
+
+Only saves to projects the user is known to own are deferred: the first
+save of a (user, project) pair is written immediately by the caller, so
+ownership errors are still returned by the tool.  Until a deferred save
+is written, :meth:`PersonalityWriteBuffer.pending` lets reads by the same
+user see it.  :meth:`close` writes everything still pending; the server
+calls it on shutdown.
+
+A deferred write that fails with a transient error is retried with
+exponential backoff.  One that fails for good (a permanent error, or no
+retries left) is kept: ``pending`` still returns its row, and
+:meth:`PersonalityWriteBuffer.failure` reports the error to the user's next
+save or read until a later save of the project succeeds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+
+from fastmcp.server.auth import AccessToken
+
+logger = logging.getLogger(__name__)
+
+# write(token, rows) -> the saved rows, as returned by the upsert
+WriteFn = Callable[[AccessToken, list[dict]], Awaitable[list[dict]]]
+
+
+@dataclass
+class _Pending:
+    user_id: str
+    token: AccessToken
+    row: dict
+    first_at: float
+    due_at: float
+    attempts: int = 0  # failed writes so far
+
+
+@dataclass(frozen=True)
+class _Failure:
+    user_id: str
+    row: dict
+    error: str
+
+
+class PersonalityWriteBuffer:
+    """Debounced, batched personality upserts."""
+
+    def __init__(
+        self,
+        write: WriteFn,
+        *,
+        window: float = 2.0,
+        max_wait: float = 10.0,
+        retries: int = 3,
+        retry_backoff: float = 1.0,
+        is_permanent: Callable[[Exception], bool] = lambda exc: False,
+        maxsize: int = 10_000,
+    ):
+        self.write = write
+        self.window = window
+        self.max_wait = max_wait
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.is_permanent = is_permanent
+        self.maxsize = maxsize
+        self._pending: dict[str, _Pending] = {}  # by project id
+        self._writing: dict[str, _Pending] = {}  # sent, not yet acknowledged
+        self._failures: OrderedDict[str, _Failure] = OrderedDict()  # by project id
+        # (user id, project id) pairs a write has succeeded for
+        self._owners: OrderedDict[tuple[str, str], None] = OrderedDict()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self.flushes = 0  # upsert requests sent
+        # Called with the saved rows after each successful write.
+        self.listeners: list[Callable[[list[dict]], None]] = []
+
+    # --- ownership ---
+
+    def confirm_owner(self, user_id: str, project_id: str) -> None:
+        """Record that ``user_id`` successfully wrote ``project_id``.
+
+        This also clears a failed deferred save of the project, which the
+        successful write has replaced.
+        """
+        self._clear_failure(project_id, user_id)
+        key = (user_id, project_id)
+        self._owners[key] = None
+        self._owners.move_to_end(key)
+        while len(self._owners) > self.maxsize:
+            self._owners.popitem(last=False)
+
+    def accepts(self, user_id: str, project_id: str) -> bool:
+        """True if a save can be deferred (known owner, not shut down)."""
+        return not self._closed and (user_id, project_id) in self._owners
+
+    # --- saves ---
+
+    def submit(self, token: AccessToken, user_id: str, row: dict) -> None:
+        """Queue ``row``, replacing any pending save for the same project."""
+        if self._closed:
+            raise RuntimeError("PersonalityWriteBuffer is closed")
+        project_id = row["project_id"]
+        now = time.monotonic()
+        previous = self._pending.get(project_id)
+        first_at = previous.first_at if previous is not None else now
+        due_at = min(now + self.window, first_at + self.max_wait)
+        self._pending[project_id] = _Pending(user_id, token, row, first_at, due_at)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="personality-writes")
+        elif previous is not None and due_at < previous.due_at:
+            self._wake.set()  # replaces a retry that was due later
+
+    def pending(self, project_id: str, user_id: str) -> dict | None:
+        """The unwritten row ``user_id`` saved for ``project_id``, if any.
+
+        This includes a save whose deferred write failed (see :meth:`failure`).
+        """
+        entry = (
+            self._pending.get(project_id)
+            or self._writing.get(project_id)
+            or self._failures.get(project_id)
+        )
+        if entry is None or entry.user_id != user_id:
+            return None
+        return entry.row
+
+    def failure(self, project_id: str, user_id: str) -> str | None:
+        """Error of ``user_id``'s last deferred save of ``project_id``, if it failed."""
+        failed = self._failures.get(project_id)
+        if failed is None or failed.user_id != user_id:
+            return None
+        return failed.error
+
+    def _clear_failure(self, project_id: str, user_id: str) -> None:
+        failed = self._failures.get(project_id)
+        if failed is not None and failed.user_id == user_id:
+            del self._failures[project_id]
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def close(self) -> None:
+        """Stop deferring saves and write everything still pending."""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        if self._pending:  # not written by the loop, e.g. it was cancelled
+            await self._flush(list(self._pending))
+
+    # --- background writer ---
+
+    async def _run(self) -> None:
+        # One loop at a time, so writes for a project land in save order.
+        while self._pending:
+            now = time.monotonic()
+            due = [pid for pid, entry in self._pending.items() if entry.due_at <= now]
+            if self._closed:
+                due = list(self._pending)
+            if not due:
+                # New saves come due no earlier than the current ones, except
+                # when they replace a retry; submit() wakes the loop for those.
+                delay = min(entry.due_at for entry in self._pending.values()) - now
+                self._wake.clear()
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(delay):
+                        await self._wake.wait()
+                continue
+            await self._flush(due)
+
+    async def _flush(self, project_ids: list[str]) -> None:
+        by_user: dict[str, list[_Pending]] = {}
+        for project_id in project_ids:
+            entry = self._pending.pop(project_id, None)
+            if entry is not None:
+                self._writing[project_id] = entry
+                by_user.setdefault(entry.user_id, []).append(entry)
+        try:
+            await asyncio.gather(*(self._write_user(entries) for entries in by_user.values()))
+        finally:
+            for project_id in project_ids:
+                self._writing.pop(project_id, None)
+
+    async def _write_user(self, entries: list[_Pending]) -> None:
+        token = entries[-1].token  # any of the user's tokens will do; take the latest
+        rows = [entry.row for entry in entries]
+        try:
+            self.flushes += 1
+            saved = await self.write(token, rows)
+        except Exception as exc:
+            if not self.is_permanent(exc):
+                for entry in entries:
+                    self._retry(entry, exc)
+            elif len(rows) == 1:
+                self._failed(entries[0], exc)
+            else:
+                # One bad row fails the whole upsert: retry the rows one by one.
+                for entry in entries:
+                    await self._write_user([entry])
+            return
+        for entry in entries:
+            self._clear_failure(entry.row["project_id"], entry.user_id)
+        for listener in self.listeners:
+            try:
+                listener(saved)
+            except Exception:
+                logger.exception("Personality write listener failed")
+
+    def _retry(self, entry: _Pending, exc: Exception) -> None:
+        project_id = entry.row["project_id"]
+        if project_id in self._pending:
+            return  # saved again meanwhile; the newer value will be written
+        if entry.attempts >= self.retries:
+            self._failed(entry, exc)
+            return
+        delay = self.retry_backoff * 2**entry.attempts
+        logger.warning(
+            "Deferred personality save for project %s failed, retrying in %.1fs: %s",
+            project_id, delay, exc,
+        )
+        self._pending[project_id] = replace(
+            entry, attempts=entry.attempts + 1, due_at=time.monotonic() + delay
+        )
+
+    def _failed(self, entry: _Pending, exc: Exception) -> None:
+        project_id = entry.row["project_id"]
+        # Write the next save for this project synchronously, so its error is returned.
+        self._owners.pop((entry.user_id, project_id), None)
+        self._failures[project_id] = _Failure(entry.user_id, entry.row, str(exc))
+        self._failures.move_to_end(project_id)
+        while len(self._failures) > self.maxsize:
+            self._failures.popitem(last=False)
+        logger.error(
+            "Deferred personality save for project %s (user %s) failed: %s",
+            project_id, entry.user_id, exc,
+        )
@@ -0,0 +1,166 @@
+"""Background consumer of Supabase Realtime changes to project_personality.
+
+Speaks the Realtime (Phoenix channels) websocket protocol directly:
+join a channel with a ``postgres_changes`` subscription, send heartbeats,
+and hand every change payload to ``on_change``.  When the socket drops, or
+the subscription fails, it reconnects with exponential backoff and jitter.
+``on_status`` is told when the subscription becomes live and when it is lost,
+so the cache can fall back to TTL expiry in between.
+
+Row-level security applies to Realtime, so the feed needs a key that can
+see every project's row (``COSHIP_SUPABASE_SERVICE_ROLE_KEY``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import random
+from collections.abc import Callable
+from urllib.parse import urlencode, urlparse
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_TOPIC = "realtime:coship-mcp-personality"
+_RECEIVE_TIMEOUT_FACTOR = 2.5  # heartbeats that may go unanswered
+
+
+def websocket_url(supabase_url: str, api_key: str) -> str:
+    """The Realtime websocket endpoint for a Supabase project URL."""
+    parsed = urlparse(supabase_url.rstrip("/"))
+    scheme = "wss" if parsed.scheme == "https" else "ws"
+    query = urlencode({"apikey": api_key, "vsn": "1.0.0"})
+    return f"{scheme}://{parsed.netloc}{parsed.path}/realtime/v1/websocket?{query}"
+
+
+class RealtimeFeed:
+    """Keeps one ``postgres_changes`` subscription open for a table."""
+
+    def __init__(
+        self,
+        url: str,
+        access_token: str,
+        on_change: Callable[[dict], None],
+        on_status: Callable[[bool], None],
+        *,
+        schema: str = "public",
+        table: str = "project_personality",
+        heartbeat_interval: float = 25.0,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.url = url
+        self.access_token = access_token
+        self.on_change = on_change
+        self.on_status = on_status
+        self.schema = schema
+        self.table = table
+        self.heartbeat_interval = heartbeat_interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.connects = 0
+        self._ref = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start consuming in the background (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="realtime-feed")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _run(self) -> None:
+        backoff = self.initial_backoff
+        while True:
+            subscribed = False
+            try:
+                async for _ in self._session():
+                    # Yielded once the subscription is confirmed.
+                    subscribed = True
+                    backoff = self.initial_backoff
+                    self.on_status(True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Realtime feed disconnected: %s", exc)
+            finally:
+                self.on_status(False)
+            if not subscribed:
+                backoff = min(backoff * 2, self.max_backoff)
+            # Full jitter, so workers do not reconnect in lockstep.
+            await asyncio.sleep(random.uniform(backoff / 2, backoff))
+
+    def _next_ref(self) -> str:
+        self._ref += 1
+        return str(self._ref)
+
+    async def _session(self):
+        """Connect, join and dispatch events; yields once when subscribed."""
+        import websockets
+
+        async with websockets.connect(self.url, open_timeout=10, close_timeout=1) as ws:
+            self.connects += 1
+            join_ref = self._next_ref()
+            await ws.send(json.dumps({
+                "topic": CHANNEL_TOPIC,
+                "event": "phx_join",
+                "payload": {
+                    "config": {
+                        "broadcast": {"ack": False, "self": False},
+                        "presence": {"key": ""},
+                        "postgres_changes": [
+                            {"event": "*", "schema": self.schema, "table": self.table}
+                        ],
+                        "private": False,
+                    },
+                    "access_token": self.access_token,
+                },
+                "ref": join_ref,
+                "join_ref": join_ref,
+            }))
+            heartbeat = asyncio.create_task(self._heartbeat(ws))
+            try:
+                timeout = self.heartbeat_interval * _RECEIVE_TIMEOUT_FACTOR
+                while True:
+                    async with asyncio.timeout(timeout):
+                        message = json.loads(await ws.recv())
+                    if heartbeat.done():
+                        heartbeat.result()  # surface a failed heartbeat
+                    event = message.get("event")
+                    payload = message.get("payload") or {}
+                    if message.get("topic") != CHANNEL_TOPIC:
+                        continue  # heartbeat replies
+                    if event == "phx_reply" and message.get("ref") == join_ref:
+                        if payload.get("status") != "ok":
+                            raise ConnectionError(f"Realtime join refused: {payload}")
+                    elif event == "system":
+                        if payload.get("status") != "ok":
+                            raise ConnectionError(f"Realtime subscription failed: {payload}")
+                        if payload.get("extension") == "postgres_changes":
+                            yield
+                    elif event == "postgres_changes":
+                        self._dispatch(payload.get("data") or {})
+                    elif event in ("phx_error", "phx_close"):
+                        raise ConnectionError(f"Realtime channel closed ({event})")
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, ws) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await ws.send(json.dumps(
+                {"topic": "phoenix", "event": "heartbeat", "payload": {}, "ref": self._next_ref()}
+            ))
+
+    def _dispatch(self, change: dict) -> None:
+        try:
+            self.on_change(change)
+        except Exception:
+            logger.exception("Failed to apply Realtime change")
@@ -0,0 +1,37 @@
+"""Compact JSON encoding for the HTTP API routes.
+
+Uses orjson when it is installed (the ``speedups`` extra), otherwise the
+standard library with compact separators.  Both produce the same UTF-8 JSON
+for the plain dicts and lists the routes return.
+
+Tool results are not affected: FastMCP already encodes them with
+pydantic-core.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from starlette.responses import JSONResponse as _StarletteJSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class JSONResponse(_StarletteJSONResponse):
+    """Starlette ``JSONResponse`` rendered with :func:`dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
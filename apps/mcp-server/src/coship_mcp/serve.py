@@ -0,0 +1,134 @@
+"""Production launcher: ``coship-mcp`` console script.
+
+Runs the ASGI app from ``create_app`` under uvicorn with one or more worker
+processes.  uvloop and httptools are used when installed (the
+``speedups`` extra).
+
+On SIGTERM/SIGINT uvicorn stops accepting connections, waits up to
+``graceful_timeout`` seconds for in-flight requests (and so in-flight tool
+calls) to finish, then runs the app's shutdown lifespan, which stops the
+JWKS refresher and closes the pooled Supabase HTTP client.
+
+With several workers, ``/metrics`` sums the series every worker saves to
+``COSHIP_METRICS_DIR``; the launcher empties that directory on start, or
+creates a temporary one when it is not set.
+
+Every option defaults to its ``COSHIP_*`` setting; ``PORT`` (set by
+Railway) is honoured when ``COSHIP_PORT`` is not set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+APP_FACTORY = "coship_mcp.server:create_app"
+
+logger = logging.getLogger(__name__)
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="coship-mcp", description="Run the CoShip MCP server.")
+    parser.add_argument("--host", help="Bind address (COSHIP_HOST)")
+    parser.add_argument("--port", type=int, help="Bind port (COSHIP_PORT, then PORT)")
+    parser.add_argument("--workers", type=int, help="Worker processes; 0 = one per CPU (COSHIP_WORKERS)")
+    parser.add_argument("--keep-alive", type=int, help="Keep-alive timeout in seconds (COSHIP_KEEP_ALIVE)")
+    parser.add_argument("--backlog", type=int, help="Listen backlog (COSHIP_BACKLOG)")
+    parser.add_argument(
+        "--graceful-timeout", type=int, help="Seconds to drain requests on shutdown (COSHIP_GRACEFUL_TIMEOUT)"
+    )
+    parser.add_argument(
+        "--preload",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Build the app in the supervisor before starting workers (COSHIP_PRELOAD)",
+    )
+    return parser.parse_args(argv)
+
+
+def uvicorn_options(argv: list[str] | None = None) -> dict:
+    """Resolve CLI arguments and settings into ``uvicorn.run`` keyword arguments."""
+    from coship_mcp.config import get_settings
+
+    settings = get_settings()
+    args = _parse_args(argv)
+
+    def option(name: str):
+        value = getattr(args, name)
+        return getattr(settings, name) if value is None else value
+
+    port = args.port
+    if port is None:
+        port = settings.port if "COSHIP_PORT" in os.environ else int(os.environ.get("PORT", settings.port))
+
+    return {
+        "factory": True,
+        "host": option("host"),
+        "port": port,
+        "workers": option("workers") or os.cpu_count() or 1,
+        "loop": "uvloop" if _available("uvloop") else "asyncio",
+        "http": "httptools" if _available("httptools") else "h11",
+        "timeout_keep_alive": option("keep_alive"),
+        "backlog": option("backlog"),
+        "timeout_graceful_shutdown": option("graceful_timeout"),
+        "proxy_headers": settings.proxy_headers,
+        "forwarded_allow_ips": settings.forwarded_allow_ips,
+        # Logging is configured from Settings (see create_app).
+        "log_config": None,
+        "access_log": False,
+        # Not a uvicorn option; popped by main().
+        "preload": bool(option("preload")),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    from coship_mcp.config import get_settings
+    from coship_mcp.logging_config import configure_logging
+
+    settings = get_settings()
+
+    options = uvicorn_options(argv)
+    configure_logging(settings)
+
+    if options.pop("preload"):
+        # Workers are spawned, not forked, so this does not share memory with
+        # them; it fails fast on bad configuration or skills before any worker
+        # starts and leaves the bytecode cache warm.
+        from coship_mcp.server import create_app
+
+        create_app()
+
+    if options["workers"] > 1 and not settings.stateless_http:
+        logger.warning(
+            "Running %d workers with stateful MCP sessions; set COSHIP_STATELESS_HTTP=true "
+            "so a session is not tied to the worker that created it",
+            options["workers"],
+        )
+    # Workers build their settings from the environment: give them the
+    # resolved count, which --workers or a CPU count may have changed.
+    os.environ["COSHIP_WORKERS"] = str(options["workers"])
+    if settings.metrics_dir:
+        # Snapshots of a previous run's workers would be added to this run's.
+        for stale in Path(settings.metrics_dir).glob("*.json"):
+            stale.unlink(missing_ok=True)
+    elif options["workers"] > 1:
+        os.environ["COSHIP_METRICS_DIR"] = tempfile.mkdtemp(prefix="coship-metrics-")
+    logger.info(
+        "Starting %d worker(s) on %s:%d (loop=%s, http=%s)",
+        options["workers"], options["host"], options["port"], options["loop"], options["http"],
+    )
+    uvicorn.run(APP_FACTORY, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,43 +3,71 @@
 This server provides skills for helping non-technical founders build MVPs.
 Authentication uses OAuthProxy to route the authorization UI through the
 cockpit (branded CoShip page) while handling DCR locally for Claude Desktop.
+
+Nothing is built at import time: ``create_app()`` builds the server from
+settings, and a startup hook warms caches before the worker takes traffic.
 """
 
+import asyncio
+import base64
+import contextlib
+import hmac
+import json
 import logging
+import signal
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from mcp.types import ToolAnnotations
-from fastmcp import Context, FastMCP
+from fastmcp import FastMCP
 from fastmcp.dependencies import Depends
 from fastmcp.server.auth import AccessToken
 from fastmcp.server.dependencies import get_access_token
-from fastmcp.server.auth.oauth_proxy import OAuthProxy
-from fastmcp.server.auth.providers.jwt import JWTVerifier
-from fastmcp.server.providers.skills import SkillsDirectoryProvider
+from fastmcp.server.lifespan import lifespan
+from fastmcp.tools import tool
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
+
+from coship_mcp import metrics
+from coship_mcp.auth_code import AuthCodeCodec
+from coship_mcp.compression import CompressionMiddleware
+from coship_mcp.config import Settings, get_settings
+from coship_mcp.db import (
+    close_http_client,
+    configure as configure_db,
+    is_not_owned_error,
+    preload_db,
+    user_postgrest,
+)
+from coship_mcp.logging_config import auth_debug_enabled, auth_logger, configure_logging
+from coship_mcp.middleware import (
+    MetricsMiddleware,
+    SubscriptionTierMiddleware,
+    ToolResultCacheMiddleware,
+    get_user_tier,
+)
+from coship_mcp.personality_cache import PersonalityCache
+from coship_mcp.personality_writes import PersonalityWriteBuffer
+from coship_mcp.realtime_feed import RealtimeFeed, websocket_url
+from coship_mcp.serialization import JSONResponse
+from coship_mcp.skill_cache import SkillContentCache
+from coship_mcp.skills_registry import get_skill_index, reload_skill_index
+from coship_mcp.token_refresh import RefreshCoalescer, RefreshError
 
-from coship_mcp.auth_code import decrypt_auth_code
-from coship_mcp.config import settings
-from coship_mcp.middleware import SubscriptionTierMiddleware
-from coship_mcp.skills_registry import SKILLS_REGISTRY
+if TYPE_CHECKING:
+    from fastmcp.server.providers.skills import SkillsDirectoryProvider
 
-# Enable DEBUG logging for FastMCP auth to see exactly why tokens are rejected
-logging.getLogger("fastmcp").setLevel(logging.DEBUG)
+    from coship_mcp.token_verifier import CachingJWTVerifier
 
+logger = logging.getLogger(__name__)
 
-# --- Helpers for skill discovery ---
-
-def _get_user_tier(token: AccessToken | None) -> str:
-    """Extract subscription tier from JWT app_metadata."""
-    if token and token.claims:
-        return token.claims.get("app_metadata", {}).get("subscription_tier", "free")
-    return "free"
 
+# --- Helpers for skill discovery ---
 
 def _available_skills():
     """Return only skills with status == 'available'."""
-    return [s for s in SKILLS_REGISTRY if s["status"] == "available"]
+    return get_skill_index().available
 
 
 def _build_instructions() -> str:
@@ -48,6 +76,7 @@ def _build_instructions() -> str:
         "CoShip is an AI co-founder that helps non-technical founders build MVPs.",
         "Start every session by calling list_user_projects so the user can choose "
         "a project, then call get_project_context to load its configuration.",
+        "To compare several projects, call get_projects_context once instead.",
         "",
         "## Available Skills",
         "Call list_skills after authentication to get the user's personalized skill catalog.",
@@ -64,62 +93,25 @@ def _build_instructions() -> str:
         )
     return "\n".join(lines)
 
-# --- Token verifier (validates Supabase JWTs returned via proxy) ---
-token_verifier = JWTVerifier(
-    jwks_uri=f"{settings.supabase_url}/auth/v1/.well-known/jwks.json",
-    issuer=f"{settings.supabase_url}/auth/v1",
-    algorithm="ES256",
-)
-
-# --- OAuth proxy: cockpit is the "upstream" authorization server ---
-auth = OAuthProxy(
-    upstream_authorization_endpoint=f"{settings.cockpit_url_clean}/mcp/authorize",
-    upstream_token_endpoint=f"{settings.server_base_url_clean}/api/mcp/token",
-    upstream_client_id="coship-internal",
-    upstream_client_secret=settings.api_secret,
-    token_verifier=token_verifier,
-    base_url=settings.server_base_url_clean,
-    require_authorization_consent=False,
-    forward_pkce=False,
-    token_endpoint_auth_method="client_secret_post",
-)
-
-# Create the MCP server with dynamic instructions from skill registry
-mcp = FastMCP(
-    settings.server_name,
-    instructions=_build_instructions(),
-    auth=auth, 
-)
-
-# Add subscription tier middleware
-mcp.add_middleware(SubscriptionTierMiddleware())
-
-# Get the skills directory relative to this file
-skills_root = Path(__file__).parent.parent.parent / settings.skills_dir
-
-# Add skills provider — exposes SKILL.md files as skill:// resources
-mcp.add_provider(
-    SkillsDirectoryProvider(
-        roots=[
-            skills_root / "free",
-            skills_root / "pro",
-        ],
-        reload=True,  # Enable hot reload in development
-    )
-)
+def reload_skills() -> None:
+    """Rescan the skills tree and drop compiled skill content."""
+    from fastmcp.server.providers.skills import SkillsDirectoryProvider
 
+    components = get_components()
+    # The provider is registered with FastMCP, so keep it and swap in the
+    # skills of a freshly scanned one.
+    rescanned = SkillsDirectoryProvider(roots=_skill_roots(components.settings))
+    components.skills_provider.providers[:] = rescanned.providers
+    components.skill_cache.invalidate()
+    components.tool_cache.clear()
+    reload_skill_index()
+    logger.info("Skills reloaded")
 
-# Register each available skill as an MCP prompt template
-for _skill in _available_skills():
-    _id = _skill["id"]
-    _desc = _skill["description"]
 
-    @mcp.prompt(name=_id, description=_desc)
-    def _make_prompt(skill_id=_id) -> str:
-        return f"Please call load_skill with skill_name='{skill_id}' and follow the returned instructions."
+# --- Tools (registered on the server by build_server) ---
 
 
-@mcp.tool(
+@tool(
     tags={"status"},
     annotations=ToolAnnotations(
         title="Get Subscription Info",
@@ -136,7 +128,7 @@ def get_subscription_info() -> dict:
     }
 
 
-@mcp.tool(
+@tool(
     tags={"skills"},
     annotations=ToolAnnotations(
         title="List Skills",
@@ -154,34 +146,50 @@ def list_skills(
     current user can invoke it based on their subscription tier.
     Call this after authentication to see what skills are available.
     """
-    tier = _get_user_tier(token)
-    catalog = []
-    for skill in _available_skills():
-        accessible = tier == "pro" or skill["tier"] == "free"
-        entry = {
-            "skill_name": skill["id"],
-            "name": skill["name"],
-            "tier": skill["tier"],
-            "description": skill["description"],
-            "triggers": skill.get("triggers", []),
-            "accessible": accessible,
-        }
-        if not accessible:
-            entry["upgrade_required"] = True
-        catalog.append(entry)
-    return {"status": "ok", "user_tier": tier, "skills": catalog}
+    return get_skill_index().list_skills_response(get_user_tier(token))
 
 
 def _get_user_supabase(token: AccessToken):
-    """Create a user-scoped Supabase client from an access token."""
-    from supabase import create_client as _create_client
+    """Return a user-scoped async PostgREST client on the pooled HTTP connection."""
+    return user_postgrest(token, get_components().settings)
+
+
+# Columns list_user_projects can return, and those it returns by default.
+_PROJECT_FIELDS = (
+    "id",
+    "name",
+    "slug",
+    "description",
+    "status",
+    "template_repo",
+    "github_repo_url",
+    "github_repo_full_name",
+    "created_at",
+    "updated_at",
+)
+_LIST_PROJECT_FIELDS = ("id", "name", "slug", "description", "status")
+
 
-    client = _create_client(settings.supabase_url, settings.supabase_anon_key)
-    client.postgrest.auth(token.token)
-    return client
+def _encode_cursor(created_at: str, project_id: str) -> str:
+    raw = json.dumps([created_at, project_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
 
-@mcp.tool(
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    """Inverse of :func:`_encode_cursor`; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, project_id = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(created_at, str) or not isinstance(project_id, str):
+        raise ValueError("invalid cursor")
+    if any(c in created_at + project_id for c in '"\\'):
+        raise ValueError("invalid cursor")
+    return created_at, project_id
+
+
+@tool(
     tags={"project"},
     annotations=ToolAnnotations(
         title="List User Projects",
@@ -190,14 +198,21 @@ def _get_user_supabase(token: AccessToken):
         openWorldHint=True,
     ),
 )
-def list_user_projects(
+async def list_user_projects(
+    limit: int | None = None,
+    cursor: str | None = None,
+    fields: list[str] | None = None,
     token: AccessToken | None = Depends(get_access_token),
 ) -> dict:
-    """List all active projects for the current user.
+    """List the active projects of the current user, newest first.
 
     Call this first when starting skills so the user can choose which
     project to work with. Then call get_project_context with the chosen
     project_id to load configuration and matching instructions.
+
+    Results are paginated: when next_cursor is not null, pass it as cursor
+    to get the next page. limit sets the page size; fields restricts the
+    columns returned (default: id, name, slug, description, status).
     """
     try:
         if not token:
@@ -207,26 +222,130 @@ def list_user_projects(
         if not user_id:
             return {"status": "error", "message": "No user_id in token"}
 
-        sb = _get_user_supabase(token)
+        settings = get_components().settings
+        max_limit = settings.list_projects_max_limit
+        if limit is None:
+            limit = settings.list_projects_page_size
+        if not 1 <= limit <= max_limit:
+            return {
+                "status": "error",
+                "message": f"limit must be between 1 and {max_limit}",
+            }
 
-        result = (
+        columns = list(dict.fromkeys(fields)) if fields else list(_LIST_PROJECT_FIELDS)
+        unknown = [name for name in columns if name not in _PROJECT_FIELDS]
+        if unknown:
+            return {
+                "status": "error",
+                "message": f"Unknown fields: {', '.join(unknown)}",
+                "allowed_fields": list(_PROJECT_FIELDS),
+            }
+        # The cursor needs the sort key of the last row, requested or not.
+        selected = list(dict.fromkeys([*columns, "id", "created_at"]))
+
+        sb = _get_user_supabase(token)
+        query = (
             sb.table("projects")
-            .select("id, name, slug, description, status")
+            .select(", ".join(selected))
             .eq("user_id", user_id)
             .eq("status", "active")
-            .order("created_at", desc=True)
+        )
+        if cursor:
+            try:
+                created_at, last_id = _decode_cursor(cursor)
+            except ValueError:
+                return {"status": "error", "message": "Invalid cursor"}
+            # Keyset condition: (created_at, id) < (last created_at, last id)
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt."{last_id}")'
+            )
+        # One extra row tells whether there is a next page.
+        result = await (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
             .execute()
         )
+        rows = result.data or []
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
 
         return {
             "status": "ok",
-            "projects": result.data or [],
+            "projects": [
+                {name: value for name, value in row.items() if name in columns} for row in rows
+            ],
+            "next_cursor": next_cursor,
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
-@mcp.tool(
+_PROJECT_COLUMNS = "id, name, slug, description, status"
+_PROJECT_CONTEXT_COLUMNS = f"{_PROJECT_COLUMNS}, project_personality(*)"
+
+
+_CONFIGURE_PERSONALITY_ACTION = (
+    "Personality not configured. Call load_skill with "
+    "skill_name='matching' and follow its instructions."
+)
+
+
+def _project_context(project: dict, personality: dict | None) -> dict:
+    """The per-project part of a project context response."""
+    return {
+        "has_personality": personality is not None,
+        "project_id": project["id"],
+        "project_name": project["name"],
+        "project_description": project.get("description"),
+        "personality": personality,
+    }
+
+
+def _with_pending_save(project_id: str, user_id: str, personality: dict | None):
+    """Overlay a save that is still in the write-behind buffer, if any."""
+    writes = get_components().personality_writes
+    pending = writes.pending(project_id, user_id) if writes is not None else None
+    if pending is None:
+        return personality
+    return {**(personality or {}), **pending}
+
+
+def _failed_save_warning(project_id: str, user_id: str) -> str | None:
+    """Message about a deferred save of the project that could not be written."""
+    writes = get_components().personality_writes
+    error = writes.failure(project_id, user_id) if writes is not None else None
+    if error is None:
+        return None
+    return (
+        f"An earlier personality change for this project was not saved ({error}). "
+        "Check the personality and save it again if needed."
+    )
+
+
+def _with_warning(result: dict, warning: str | None) -> dict:
+    if warning:
+        result["warning"] = warning
+    return result
+
+
+def _embedded_personality(project: dict) -> dict | None:
+    """Pop the embedded personality off a project row.
+
+    PostgREST returns a one-to-one embed as an object (or null); older
+    versions that cannot detect the relationship cardinality return a list.
+    """
+    embedded = project.pop("project_personality", None)
+    if isinstance(embedded, list):
+        return embedded[0] if embedded else None
+    return embedded or None
+
+
+@tool(
     tags={"project"},
     annotations=ToolAnnotations(
         title="Get Project Context",
@@ -235,7 +354,7 @@ def list_user_projects(
         openWorldHint=True,
     ),
 )
-def get_project_context(
+async def get_project_context(
     project_id: str | None = None,
     token: AccessToken | None = Depends(get_access_token),
 ) -> dict:
@@ -258,28 +377,25 @@ def get_project_context(
 
         sb = _get_user_supabase(token)
 
+        # The project row is always read: it is the ownership check.  The
+        # personality row is embedded in it (project_personality.project_id
+        # is unique, so it embeds as an object) unless it is cached.
+        personality_cache = get_components().personality_cache
+        cached, personality = personality_cache.get(project_id) if project_id else (False, None)
+        generation = personality_cache.generation()
+        query = (
+            sb.table("projects")
+            .select(_PROJECT_COLUMNS if cached else _PROJECT_CONTEXT_COLUMNS)
+            .eq("user_id", user_id)
+            .eq("status", "active")
+        )
         if project_id:
             # Fetch the specific project (verify ownership)
-            project_result = (
-                sb.table("projects")
-                .select("id, name, slug, description, status")
-                .eq("id", project_id)
-                .eq("user_id", user_id)
-                .eq("status", "active")
-                .limit(1)
-                .execute()
-            )
+            query = query.eq("id", project_id)
         else:
             # Fall back to most recent active project
-            project_result = (
-                sb.table("projects")
-                .select("id, name, slug, description, status")
-                .eq("user_id", user_id)
-                .eq("status", "active")
-                .order("created_at", desc=True)
-                .limit(1)
-                .execute()
-            )
+            query = query.order("created_at", desc=True)
+        project_result = await query.limit(1).execute()
 
         if not project_result.data:
             return {
@@ -290,54 +406,108 @@ def get_project_context(
 
         project = project_result.data[0]
         pid = project["id"]
-
-        personality_result = (
-            sb.table("project_personality")
-            .select("*")
-            .eq("project_id", pid)
-            .limit(1)
-            .execute()
-        )
-        personality = personality_result.data[0] if personality_result.data else None
-
-        tier = _get_user_tier(token)
-        skills_catalog = []
-        for skill in _available_skills():
-            accessible = tier == "pro" or skill["tier"] == "free"
-            entry = {
-                "skill_name": skill["id"],
-                "name": skill["name"],
-                "tier": skill["tier"],
-                "description": skill["description"],
-                "accessible": accessible,
-            }
-            if not accessible:
-                entry["upgrade_required"] = True
-            skills_catalog.append(entry)
+        if not cached:
+            personality = _embedded_personality(project)
+            personality_cache.put(pid, personality, generation)
+        personality = _with_pending_save(pid, user_id, personality)
+        skills_catalog = get_skill_index().context_catalog(get_user_tier(token))
 
         result = {
             "status": "ok",
             "has_project": True,
-            "has_personality": personality is not None,
-            "project_id": pid,
-            "project_name": project["name"],
-            "project_description": project.get("description"),
-            "personality": personality,
+            **_project_context(project, personality),
             "available_skills": skills_catalog,
         }
 
         if not personality:
-            result["action"] = (
-                "Personality not configured. Call load_skill with "
-                "skill_name='matching' and follow its instructions."
+            result["action"] = _CONFIGURE_PERSONALITY_ACTION
+
+        return _with_warning(result, _failed_save_warning(pid, user_id))
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@tool(
+    tags={"project"},
+    annotations=ToolAnnotations(
+        title="Get Projects Context",
+        readOnlyHint=True,
+        idempotentHint=True,
+        openWorldHint=True,
+    ),
+)
+async def get_projects_context(
+    project_ids: list[str] | None = None,
+    token: AccessToken | None = Depends(get_access_token),
+) -> dict:
+    """Get the context of several projects in one call, e.g. to compare them.
+
+    Pass the project_ids to load, or omit them to load the user's most
+    recent active projects. The number of projects per call is limited
+    (max_batch in the response). Each project comes with its personality
+    configuration; the skills catalog is returned once for all of them.
+    Requested ids that are not found are listed in missing_project_ids.
+    """
+    try:
+        if not token:
+            return {"status": "error", "message": "Not authenticated"}
+
+        user_id = token.claims.get("sub") if token.claims else None
+        if not user_id:
+            return {"status": "error", "message": "No user_id in token"}
+
+        components = get_components()
+        max_batch = components.settings.projects_context_max_batch
+        requested = list(dict.fromkeys(project_ids)) if project_ids is not None else None
+        if requested is not None and len(requested) > max_batch:
+            return {
+                "status": "error",
+                "message": f"At most {max_batch} projects per call (got {len(requested)})",
+                "max_batch": max_batch,
+            }
+        skills_catalog = get_skill_index().context_catalog(get_user_tier(token))
+
+        rows: list[dict] = []
+        if requested is None or requested:
+            sb = _get_user_supabase(token)
+            generation = components.personality_cache.generation()
+            # One round trip for every project and its personality.
+            query = (
+                sb.table("projects")
+                .select(_PROJECT_CONTEXT_COLUMNS)
+                .eq("user_id", user_id)
+                .eq("status", "active")
+            )
+            if requested:
+                query = query.in_("id", requested)
+            result = await query.order("created_at", desc=True).limit(max_batch).execute()
+            rows = result.data or []
+
+        projects = {}
+        for project in rows:
+            personality = _embedded_personality(project)
+            components.personality_cache.put(project["id"], personality, generation)
+            personality = _with_pending_save(project["id"], user_id, personality)
+            entry = _project_context(project, personality)
+            if not personality:
+                entry["action"] = _CONFIGURE_PERSONALITY_ACTION
+            projects[project["id"]] = _with_warning(
+                entry, _failed_save_warning(project["id"], user_id)
             )
 
-        return result
+        order = requested if requested is not None else list(projects)
+        return {
+            "status": "ok",
+            "projects": [projects[pid] for pid in order if pid in projects],
+            "missing_project_ids": [pid for pid in order if pid not in projects],
+            "max_batch": max_batch,
+            "available_skills": skills_catalog,
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
-@mcp.tool(
+@tool(
     tags={"skills"},
     annotations=ToolAnnotations(
         title="Load Skill",
@@ -346,23 +516,19 @@ def get_project_context(
         openWorldHint=False,
     ),
 )
-async def load_skill(skill_name: str, ctx: Context) -> dict:
+async def load_skill(
+    skill_name: str,
+    token: AccessToken | None = Depends(get_access_token),
+) -> dict:
     """Load a skill's instructions by name.
 
-    Reads the skill from the skill:// resource provider and returns
-    the full instructions as markdown. Call this when a tool response
-    tells you to load a skill, then follow the returned instructions
-    exactly.
+    Reads the skill's SKILL.md (compiled once and cached in memory) and
+    returns the full instructions as markdown. Call this when a tool
+    response tells you to load a skill, then follow the returned
+    instructions exactly.
     """
-    try:
-        result = await ctx.read_resource(f"skill://{skill_name}/SKILL.md")
-        content = result.contents[0].content
-        # Strip YAML frontmatter
-        if isinstance(content, str) and content.startswith("---"):
-            _, _, content = content.split("---", 2)
-            content = content.strip()
-        return {"status": "ok", "skill": skill_name, "instructions": content}
-    except PermissionError:
+    tier = get_user_tier(token)
+    if tier != "pro" and skill_name in get_skill_index().pro_skill_ids:
         return {
             "status": "upgrade_required",
             "skill": skill_name,
@@ -371,11 +537,16 @@ async def load_skill(skill_name: str, ctx: Context) -> dict:
                 "Upgrade at https://coship.dev/pricing"
             ),
         }
-    except Exception as e:
-        return {"status": "error", "message": f"Skill '{skill_name}' not found: {e}"}
+    with metrics.SKILL_LOAD_SECONDS.time(status="error") as labels:
+        try:
+            payload = get_components().skill_cache.get(skill_name).payload
+        except Exception as e:
+            return {"status": "error", "message": f"Skill '{skill_name}' not found: {e}"}
+        labels["status"] = "ok"
+    return payload
 
 
-@mcp.tool(
+@tool(
     tags={"project", "configuration"},
     annotations=ToolAnnotations(
         title="Save Project Personality",
@@ -385,7 +556,7 @@ async def load_skill(skill_name: str, ctx: Context) -> dict:
         openWorldHint=True,
     ),
 )
-def save_project_personality(
+async def save_project_personality(
     project_id: str,
     challenge_level: str,
     transparency_level: str,
@@ -399,7 +570,7 @@ def save_project_personality(
 
     Upserts challenge_level, transparency_level, ux_design_model,
     development_approach, documentation_level, and project_summary
-    into project_personality.
+    into project_personality and returns the saved row.
     """
     try:
         if not token:
@@ -411,17 +582,6 @@ def save_project_personality(
 
         sb = _get_user_supabase(token)
 
-        # Verify project ownership
-        proj = (
-            sb.table("projects")
-            .select("id")
-            .eq("id", project_id)
-            .eq("user_id", user_id)
-            .execute()
-        )
-        if not proj.data:
-            return {"status": "error", "message": "Project not found or not owned by user"}
-
         row = {
             "project_id": project_id,
             "challenge_level": challenge_level,
@@ -432,24 +592,162 @@ def save_project_personality(
             "project_summary": project_summary,
         }
 
-        sb.table("project_personality").upsert(
-            row, on_conflict="project_id"
-        ).execute()
+        components = get_components()
+        writes = components.personality_writes
+        # Reported with this save, whose outcome replaces the failed one.
+        warning = _failed_save_warning(project_id, user_id)
+        if writes is not None and writes.accepts(user_id, project_id):
+            # Deferred: a later save within the window replaces this one.  The
+            # response is the last written row (id, timestamps) with the new values.
+            _, written = components.personality_cache.get(project_id)
+            writes.submit(token, user_id, row)
+            return {"status": "ok", "saved": True, "personality": {**(written or {}), **row}}
+
+        # Single request: project ownership is enforced by the RLS insert/update
+        # policies on project_personality, so a missing or foreign project
+        # surfaces as a policy (or FK) violation instead of a separate SELECT.
+        try:
+            saved = await sb.table("project_personality").upsert(
+                row, on_conflict="project_id"
+            ).execute()
+        except Exception as e:
+            if is_not_owned_error(e):
+                return _with_warning(
+                    {"status": "error", "message": "Project not found or not owned by user"},
+                    warning,
+                )
+            raise
+        if not saved.data:
+            return _with_warning(
+                {"status": "error", "message": "Project not found or not owned by user"},
+                warning,
+            )
+        components.personality_cache.put(project_id, saved.data[0])
+        if writes is not None:
+            writes.confirm_owner(user_id, project_id)
 
-        return {"status": "ok", "saved": True}
+        return _with_warning(
+            {"status": "ok", "saved": True, "personality": saved.data[0]}, warning
+        )
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
+async def _upsert_personalities(token: AccessToken, rows: list[dict]) -> list[dict]:
+    """Write deferred saves of one user in a single multi-row upsert."""
+    saved = await _get_user_supabase(token).table("project_personality").upsert(
+        rows, on_conflict="project_id"
+    ).execute()
+    return saved.data or []
+
+
+TOOLS = (
+    get_subscription_info,
+    list_skills,
+    list_user_projects,
+    get_project_context,
+    get_projects_context,
+    load_skill,
+    save_project_personality,
+)
+
+
 # --- HTTP API routes (non-MCP) ---
 
 
-async def api_skills(request: Request) -> JSONResponse:
-    """Return the skills registry as JSON. Protected by API secret."""
+async def api_skills(request: Request) -> Response:
+    """Return the skills registry as JSON. Protected by API secret.
+
+    The body and its ETag are built once per registry (see SkillIndex), so
+    a request carrying a matching ``If-None-Match`` gets a bodyless 304.
+    """
+    if not _has_api_secret(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    index = get_skill_index()
+    max_age = request.app.state.settings.skills_api_max_age
+    headers = {
+        "ETag": index.registry_etag,
+        "Cache-Control": f"private, max-age={max_age}, must-revalidate",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), index.registry_etag):
+        return Response(status_code=304, headers=headers)
+    return Response(index.registry_json, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """``If-None-Match`` check (weak comparison, as RFC 9110 requires)."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _secret_matches(presented: str | None, api_secret: str) -> bool:
+    """Constant-time comparison against the configured API secret."""
+    return bool(api_secret) and presented is not None and hmac.compare_digest(
+        presented.encode(), api_secret.encode()
+    )
+
+
+def _has_api_secret(request: Request) -> bool:
+    """True if the request carries the configured API secret as a bearer token."""
     auth_header = request.headers.get("authorization", "")
-    if not auth_header.startswith("Bearer ") or auth_header[7:] != settings.api_secret:
+    return auth_header.startswith("Bearer ") and _secret_matches(
+        auth_header[7:], request.app.state.settings.api_secret
+    )
+
+
+async def api_skills_reload(request: Request) -> JSONResponse:
+    """Rescan the skills directories (production snapshot mode). Protected by API secret.
+
+    Only the worker that handles the request would rescan, so with several
+    workers this is refused: send SIGHUP to the uvicorn supervisor instead,
+    which restarts every worker.
+    """
+    if not _has_api_secret(request):
         return JSONResponse({"error": "Unauthorized"}, status_code=401)
-    return JSONResponse(SKILLS_REGISTRY)
+    if request.app.state.settings.workers != 1:
+        return JSONResponse(
+            {
+                "error": "Skills reload would reach one worker only; "
+                "send SIGHUP to the server's supervisor process to restart all workers"
+            },
+            status_code=409,
+        )
+    reload_skills()
+    return JSONResponse(
+        {"status": "ok", "skills": len(get_components().skills_provider.providers)}
+    )
+
+
+async def api_metrics(request: Request) -> Response:
+    """Prometheus metrics, summed over all workers. Protected by API secret."""
+    if not _has_api_secret(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    settings = request.app.state.settings
+    if settings.metrics_dir:
+        body = await asyncio.to_thread(metrics.REGISTRY.render_shared, settings.metrics_dir)
+    elif settings.workers != 1:
+        # Each scrape would see a different worker's counters.
+        return JSONResponse(
+            {"error": "Set COSHIP_METRICS_DIR to serve metrics from several workers"},
+            status_code=409,
+        )
+    else:
+        body = metrics.REGISTRY.render()
+    return Response(body, media_type=metrics.CONTENT_TYPE)
+
+
+def _log_jwt_header(access_token: str) -> None:
+    """Log a Supabase JWT's header (alg/kid) to diagnose signature rejections."""
+    try:
+        header_b64 = access_token.split(".")[0]
+        header = json.loads(base64.urlsafe_b64decode(header_b64 + "=" * (-len(header_b64) % 4)))
+    except Exception as exc:
+        auth_logger.debug("Could not decode JWT header: %s", exc)
+        return
+    auth_logger.debug(
+        "Supabase JWT header", extra={"jwt_alg": header.get("alg"), "jwt_kid": header.get("kid")}
+    )
 
 
 async def api_mcp_token(request: Request) -> JSONResponse:
@@ -458,13 +756,14 @@ async def api_mcp_token(request: Request) -> JSONResponse:
     Called by OAuthProxy's callback handler to exchange the cockpit's
     encrypted auth code for Supabase tokens, or to refresh tokens.
     """
+    settings = request.app.state.settings
     form = await request.form()
     grant_type = form.get("grant_type")
     client_id = form.get("client_id")
     client_secret = form.get("client_secret")
 
     # Validate upstream client credentials
-    if client_id != "coship-internal" or client_secret != settings.api_secret:
+    if client_id != "coship-internal" or not _secret_matches(client_secret, settings.api_secret):
         return JSONResponse(
             {"error": "invalid_client", "error_description": "Invalid credentials"},
             status_code=401,
@@ -478,22 +777,15 @@ async def api_mcp_token(request: Request) -> JSONResponse:
                 status_code=400,
             )
         try:
-            tokens = decrypt_auth_code(str(code), settings.api_secret)
+            tokens = request.app.state.auth_codec.decrypt(str(code))
         except ValueError as exc:
             return JSONResponse(
                 {"error": "invalid_grant", "error_description": str(exc)},
                 status_code=400,
             )
 
-        # Debug: log the Supabase JWT header to check signing algorithm
-        import base64 as _b64, json as _json
-        try:
-            _hdr_b64 = tokens["access_token"].split(".")[0]
-            _hdr_b64 += "=" * (4 - len(_hdr_b64) % 4)
-            _hdr = _json.loads(_b64.urlsafe_b64decode(_hdr_b64))
-            logging.getLogger(__name__).warning("Supabase JWT header: %s", _hdr)
-        except Exception as _e:
-            logging.getLogger(__name__).warning("Could not decode JWT header: %s", _e)
+        if auth_debug_enabled():
+            _log_jwt_header(tokens["access_token"])
 
         return JSONResponse({
             "access_token": tokens["access_token"],
@@ -509,29 +801,15 @@ async def api_mcp_token(request: Request) -> JSONResponse:
                 {"error": "invalid_request", "error_description": "Missing refresh_token"},
                 status_code=400,
             )
-        # Call Supabase to refresh the session
+        # Call Supabase to refresh the session (coalesced per refresh token)
         try:
-            from supabase import create_client as _create_client
-
-            sb = _create_client(settings.supabase_url, settings.supabase_anon_key)
-            result = sb.auth.refresh_session(str(refresh_token))
-            session = result.session
-            if not session:
-                return JSONResponse(
-                    {"error": "invalid_grant", "error_description": "Refresh failed"},
-                    status_code=400,
-                )
-            return JSONResponse({
-                "access_token": session.access_token,
-                "token_type": "bearer",
-                "expires_in": session.expires_in,
-                "refresh_token": session.refresh_token,
-            })
-        except Exception as exc:
+            tokens = await request.app.state.token_refresher.refresh(str(refresh_token))
+        except RefreshError as exc:
             return JSONResponse(
                 {"error": "invalid_grant", "error_description": str(exc)},
                 status_code=400,
             )
+        return JSONResponse(tokens)
 
     return JSONResponse(
         {"error": "unsupported_grant_type"},
@@ -539,21 +817,358 @@ async def api_mcp_token(request: Request) -> JSONResponse:
     )
 
 
-def create_app():
-    """Create the combined ASGI app: MCP + custom API routes."""
+# --- Server assembly ---
+
+
+@dataclass
+class ServerComponents:
+    """Everything ``build_server`` creates for one app instance."""
+
+    settings: Settings
+    mcp: FastMCP
+    token_verifier: "CachingJWTVerifier"
+    skills_provider: "SkillsDirectoryProvider"
+    skill_cache: SkillContentCache
+    tool_cache: ToolResultCacheMiddleware
+    personality_cache: PersonalityCache
+    realtime_feed: RealtimeFeed | None
+    personality_writes: PersonalityWriteBuffer | None
+    auth_codec: AuthCodeCodec | None
+    token_refresher: RefreshCoalescer
+
+
+_components: ServerComponents | None = None
+
+# Module attributes resolved lazily from the current components, so
+# ``server.mcp`` (e.g. for ``fastmcp run``) still works.
+_LAZY_ATTRS = frozenset({"mcp", "token_verifier", "skills_provider", "skill_cache"})
+
+
+def get_components() -> ServerComponents:
+    """Return the current server components, building them on first use."""
+    global _components
+    if _components is None:
+        _components = build_server()
+    return _components
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        return getattr(get_components(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _mentions_project(content: dict | None, project_id: str) -> bool:
+    """True if a cached tool result includes the context of ``project_id``."""
+    if not content:
+        return False
+    if content.get("project_id") == project_id:
+        return True
+    projects = content.get("projects")
+    return isinstance(projects, list) and any(
+        isinstance(p, dict) and p.get("project_id") == project_id for p in projects
+    )
+
+
+def _skill_roots(settings: Settings) -> list[Path]:
+    # The skills directory is relative to the app root (apps/mcp-server).
+    skills_root = Path(__file__).parent.parent.parent / settings.skills_dir
+    return [skills_root / "free", skills_root / "pro"]
+
+
+async def warm_up(components: ServerComponents) -> None:
+    """Pay first-request costs before the worker accepts traffic.
+
+    Imports the PostgREST client and opens the connection pool, runs the
+    auth-code cipher once, compiles every available skill and fetches the
+    Supabase JWKS (which also warms a pooled connection to Supabase).
+    """
+    preload_db(components.settings)
+    if components.auth_codec is not None:
+        components.auth_codec.decrypt(components.auth_codec.encrypt({}))
+    for skill in get_skill_index().available:
+        try:
+            components.skill_cache.get(skill["id"])
+        except FileNotFoundError:
+            logger.warning("Skill %r is listed but has no SKILL.md", skill["id"])
+    await components.token_verifier.start_jwks_refresh()
+
+
+def build_server(settings: Settings | None = None) -> ServerComponents:
+    """Build the FastMCP server and its collaborators from settings."""
+    # Imported here so importing this module stays cheap.
+    from fastmcp.server.auth.oauth_proxy import OAuthProxy
+    from fastmcp.server.providers.skills import SkillsDirectoryProvider
+
+    from coship_mcp.oauth_storage import build_oauth_storage
+    from coship_mcp.token_verifier import CachingJWTVerifier
+
+    settings = settings or get_settings()
+    # The pooled Supabase client (also used for JWKS) follows these settings.
+    configure_db(settings)
+
+    # Token verifier (validates Supabase JWTs returned via proxy)
+    token_verifier = CachingJWTVerifier(
+        jwks_uri=f"{settings.supabase_url}/auth/v1/.well-known/jwks.json",
+        issuer=f"{settings.supabase_url}/auth/v1",
+        algorithm="ES256",
+        cache_maxsize=settings.jwt_cache_maxsize,
+        cache_max_age=settings.jwt_cache_max_age,
+        jwks_refresh_interval=settings.jwks_refresh_interval,
+        jwks_min_refetch_interval=settings.jwks_min_refetch_interval,
+    )
+
+    # OAuth proxy: cockpit is the "upstream" authorization server
+    auth = OAuthProxy(
+        upstream_authorization_endpoint=f"{settings.cockpit_url_clean}/mcp/authorize",
+        upstream_token_endpoint=f"{settings.server_base_url_clean}/api/mcp/token",
+        upstream_client_id="coship-internal",
+        upstream_client_secret=settings.api_secret,
+        token_verifier=token_verifier,
+        base_url=settings.server_base_url_clean,
+        require_authorization_consent=False,
+        forward_pkce=False,
+        token_endpoint_auth_method="client_secret_post",
+        client_storage=build_oauth_storage(settings),
+    )
+
+    @lifespan
+    async def _db_lifespan(server):
+        """Close the pooled Supabase HTTP client when the server shuts down."""
+        try:
+            yield {}
+        finally:
+            await close_http_client()
+
+    @lifespan
+    async def _warm_up_lifespan(server):
+        """Warm caches and prefetch JWKS, then keep the keys fresh."""
+        await warm_up(components)
+        try:
+            yield {}
+        finally:
+            await token_verifier.stop_jwks_refresh()
+
+    @lifespan
+    async def _realtime_lifespan(server):
+        """Follow project_personality changes while the server runs."""
+        feed = components.realtime_feed
+        if feed is not None:
+            feed.start()
+        try:
+            yield {}
+        finally:
+            if feed is not None:
+                await feed.stop()
+
+    @lifespan
+    async def _personality_writes_lifespan(server):
+        """Write deferred personality saves before the HTTP client closes."""
+        try:
+            yield {}
+        finally:
+            if components.personality_writes is not None:
+                await components.personality_writes.close()
+
+    @lifespan
+    async def _metrics_lifespan(server):
+        """Keep this worker's snapshot in the shared metrics directory current."""
+
+        async def save_periodically():
+            while True:
+                await asyncio.sleep(settings.metrics_flush_interval)
+                await asyncio.to_thread(metrics.REGISTRY.save, settings.metrics_dir)
+
+        task = asyncio.create_task(save_periodically()) if settings.metrics_dir else None
+        try:
+            yield {}
+        finally:
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+                metrics.REGISTRY.save(settings.metrics_dir)
+
+    @lifespan
+    async def _skills_reload_lifespan(server):
+        """Reload skills on SIGHUP where the platform supports it."""
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, reload_skills)
+            installed = True
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            # No SIGHUP (Windows) or not on the main thread: admin endpoint only.
+            installed = False
+        try:
+            yield {}
+        finally:
+            if installed:
+                loop.remove_signal_handler(signal.SIGHUP)
+
+    # Create the MCP server with dynamic instructions from skill registry
+    mcp = FastMCP(
+        settings.server_name,
+        instructions=_build_instructions(),
+        auth=auth,
+        lifespan=(
+            _db_lifespan
+            | _warm_up_lifespan
+            | _realtime_lifespan
+            | _personality_writes_lifespan
+            | _metrics_lifespan
+            | _skills_reload_lifespan
+        ),
+    )
+
+    # Record per-method / per-tool latency (outermost, so it times everything)
+    mcp.add_middleware(MetricsMiddleware())
+
+    # Add subscription tier middleware
+    mcp.add_middleware(SubscriptionTierMiddleware())
+
+    # Per-user results of read-only, idempotent tools (see ToolAnnotations)
+    tool_cache = ToolResultCacheMiddleware(
+        default_ttl=settings.tool_cache_ttl,
+        ttls=settings.tool_cache_ttls,
+        maxsize=settings.tool_cache_maxsize,
+    )
+    if settings.tool_cache_ttl > 0 or any(ttl > 0 for ttl in settings.tool_cache_ttls.values()):
+        mcp.add_middleware(tool_cache)
+
+    # Personality rows by project, updated from Realtime when a service key is set
+    personality_cache = PersonalityCache(
+        ttl=settings.personality_cache_ttl,
+        max_age=settings.personality_cache_max_age,
+        maxsize=settings.personality_cache_maxsize,
+    )
+    personality_cache.listeners.append(
+        lambda project_id: tool_cache.invalidate_results(
+            lambda content: _mentions_project(content, project_id)
+        )
+    )
+    realtime_feed = None
+    if settings.supabase_service_role_key:
+        realtime_feed = RealtimeFeed(
+            websocket_url(settings.supabase_url, settings.supabase_service_role_key),
+            settings.supabase_service_role_key,
+            on_change=personality_cache.apply_change,
+            on_status=personality_cache.set_live,
+            heartbeat_interval=settings.realtime_heartbeat_interval,
+            max_backoff=settings.realtime_max_backoff,
+        )
+
+    # Debounced, batched personality saves (opt-in). A pending save is only
+    # visible to the worker that buffered it, so this needs a single worker.
+    personality_writes = None
+    if settings.personality_write_behind and settings.workers != 1:
+        logger.warning(
+            "COSHIP_PERSONALITY_WRITE_BEHIND is ignored with %d workers: another "
+            "worker could return the personality from before a pending save",
+            settings.workers,
+        )
+    elif settings.personality_write_behind:
+        personality_writes = PersonalityWriteBuffer(
+            _upsert_personalities,
+            window=settings.personality_write_window,
+            max_wait=settings.personality_write_max_wait,
+            # Ownership errors will not go away on a retry.
+            is_permanent=is_not_owned_error,
+        )
+
+        def _cache_saved(rows: list[dict]) -> None:
+            for row in rows:
+                personality_cache.put(row["project_id"], row)
+
+        personality_writes.listeners.append(_cache_saved)
+
+    # Add skills provider — exposes SKILL.md files as skill:// resources.
+    # Hot reload (rescan on every list/read) only in development; production
+    # snapshots the tree at startup and rescans on SIGHUP or POST /api/skills/reload.
+    skill_roots = _skill_roots(settings)
+    skills_provider = SkillsDirectoryProvider(
+        roots=skill_roots,
+        reload=settings.dev_mode,
+    )
+    mcp.add_provider(skills_provider)
+
+    for fn in TOOLS:
+        mcp.add_tool(fn)
+
+    # Register each available skill as an MCP prompt template
+    for skill in _available_skills():
+        mcp.prompt(name=skill["id"], description=skill["description"])(
+            _skill_prompt(skill["id"])
+        )
+
+    components = ServerComponents(
+        settings=settings,
+        mcp=mcp,
+        token_verifier=token_verifier,
+        skills_provider=skills_provider,
+        # Compiled SKILL.md content for load_skill (re-validated per load in development)
+        skill_cache=SkillContentCache(skill_roots, validate=settings.dev_mode),
+        tool_cache=tool_cache,
+        personality_cache=personality_cache,
+        realtime_feed=realtime_feed,
+        personality_writes=personality_writes,
+        # One auth-code codec per app: key derivation and cipher setup happen once.
+        # Previous secrets stay valid for decryption during a key rotation.
+        auth_codec=(
+            AuthCodeCodec([settings.api_secret, *settings.api_secret_previous])
+            if settings.api_secret
+            else None
+        ),
+        # Concurrent/duplicate refresh_token grants share one upstream call.
+        token_refresher=RefreshCoalescer(settings, result_ttl=settings.token_refresh_result_ttl),
+    )
+    return components
+
+
+def _skill_prompt(skill_id: str):
+    def prompt() -> str:
+        return f"Please call load_skill with skill_name='{skill_id}' and follow the returned instructions."
+
+    return prompt
+
+
+def create_app(settings: Settings | None = None):
+    """Create the combined ASGI app: MCP + custom API routes.
+
+    Builds a fresh server from ``settings`` (default: the environment) and
+    makes it the current one. Used as a uvicorn app factory.
+    """
+    global _components
+    from starlette.middleware import Middleware as StarletteMiddleware
     from starlette.routing import Route
 
-    mcp_app = mcp.http_app()
+    components = _components = build_server(settings)
+    settings = components.settings
+
+    configure_logging(settings)
+    middleware = []
+    if settings.compression_min_size > 0:
+        middleware.append(
+            StarletteMiddleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+        )
+    mcp_app = components.mcp.http_app(
+        stateless_http=settings.stateless_http,
+        json_response=settings.json_response,
+        middleware=middleware,
+    )
+    mcp_app.state.settings = settings
+    mcp_app.state.auth_codec = components.auth_codec
+    mcp_app.state.token_refresher = components.token_refresher
 
     # Prepend custom routes before the MCP catch-all
     mcp_app.routes.insert(0, Route("/api/skills", api_skills, methods=["GET"]))
+    mcp_app.routes.insert(0, Route("/api/skills/reload", api_skills_reload, methods=["POST"]))
+    mcp_app.routes.insert(0, Route("/metrics", api_metrics, methods=["GET"]))
     mcp_app.routes.insert(0, Route("/api/mcp/token", api_mcp_token, methods=["POST"]))
 
     return mcp_app
 
 
 if __name__ == "__main__":
-    import uvicorn
+    from coship_mcp.serve import main
 
-    app = create_app()
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    main()
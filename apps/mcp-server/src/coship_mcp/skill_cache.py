@@ -0,0 +1,121 @@
+"""In-memory cache of compiled SKILL.md files for load_skill.
+
+A skill is compiled once: the file is read, its YAML frontmatter is split
+off and the ``load_skill`` response payload is built.  Later loads are
+served from memory.  With ``validate`` enabled each load costs one
+``stat()``; the entry is recompiled only when the file's mtime or size
+changed *and* its SHA-256 differs from the cached content.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class CompiledSkill:
+    name: str
+    path: Path
+    mtime_ns: int
+    size: int
+    sha256: str
+    frontmatter: str
+    instructions: str
+    payload: dict
+
+
+def split_frontmatter(content: str) -> tuple[str, str]:
+    """Split ``---``-delimited YAML frontmatter from a markdown body."""
+    if content.startswith("---"):
+        _, frontmatter, body = content.split("---", 2)
+        return frontmatter.strip(), body.strip()
+    return "", content
+
+
+class SkillContentCache:
+    """Cache of compiled skills looked up by skill (directory) name.
+
+    Skills resolve the same way as ``SkillsDirectoryProvider``: the first
+    root containing ``<name>/<main_file_name>`` wins.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[str | Path],
+        main_file_name: str = "SKILL.md",
+        validate: bool = True,
+    ):
+        self._roots = [Path(r).resolve() for r in roots]
+        self._main_file_name = main_file_name
+        self.validate = validate
+        self._skills: dict[str, CompiledSkill] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, name: str) -> Path:
+        # Skill names are directory names; refuse anything path-like.
+        if not name or name != Path(name).name or name.startswith("."):
+            raise FileNotFoundError(f"Invalid skill name: {name!r}")
+        for root in self._roots:
+            path = root / name / self._main_file_name
+            if path.is_file():
+                return path
+        raise FileNotFoundError(f"No {self._main_file_name} for skill {name!r}")
+
+    def _compile(self, name: str, path: Path, previous: CompiledSkill | None) -> CompiledSkill:
+        st = os.stat(path)
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        if previous is not None and previous.path == path and previous.sha256 == digest:
+            # Touched but unchanged: keep the parsed content.
+            return replace(previous, mtime_ns=st.st_mtime_ns, size=st.st_size)
+
+        frontmatter, instructions = split_frontmatter(raw.decode("utf-8"))
+        return CompiledSkill(
+            name=name,
+            path=path,
+            mtime_ns=st.st_mtime_ns,
+            size=st.st_size,
+            sha256=digest,
+            frontmatter=frontmatter,
+            instructions=instructions,
+            payload={"status": "ok", "skill": name, "instructions": instructions},
+        )
+
+    def _is_current(self, skill: CompiledSkill) -> bool:
+        try:
+            st = os.stat(skill.path)
+        except OSError:
+            return False
+        return st.st_mtime_ns == skill.mtime_ns and st.st_size == skill.size
+
+    def get(self, name: str) -> CompiledSkill:
+        """Return the compiled skill, (re)compiling it only when needed.
+
+        Raises:
+            FileNotFoundError: If no skill with that name exists.
+        """
+        skill = self._skills.get(name)
+        if skill is not None and (not self.validate or self._is_current(skill)):
+            return skill
+
+        with self._lock:
+            skill = self._skills.get(name)
+            if skill is not None and (not self.validate or self._is_current(skill)):
+                return skill
+            path = skill.path if skill is not None and skill.path.is_file() else self._resolve(name)
+            compiled = self._compile(name, path, skill)
+            self._skills[name] = compiled
+            return compiled
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Drop one compiled skill, or all of them."""
+        with self._lock:
+            if name is None:
+                self._skills.clear()
+            else:
+                self._skills.pop(name, None)
@@ -1,5 +1,16 @@
 """Skills registry — single source of truth for all CoShip skill metadata."""
 
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from coship_mcp.serialization import dumps
+
+TIERS = ("free", "pro")
+
 SKILLS_REGISTRY = [
     {
         "id": "matching",
@@ -89,3 +100,132 @@ SKILLS_REGISTRY = [
         ],
     },
 ]
+
+
+# Resources SkillsDirectoryProvider lists for every skill (skill://<id>/<name>).
+SKILL_RESOURCE_NAMES = ("SKILL.md", "_manifest")
+
+
+def _frozen(value: Any) -> Any:
+    """Read-only copy of a JSON-like value (dicts become mappingproxies, lists tuples)."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _frozen(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(item) for item in value)
+    return value
+
+
+def _thawed(value: Any) -> Any:
+    """Plain, mutable copy of a value made by :func:`_frozen`."""
+    if isinstance(value, Mapping):
+        return {key: _thawed(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thawed(item) for item in value]
+    return value
+
+
+def _catalog_entry(skill: Mapping, tier: str, *, with_triggers: bool) -> dict:
+    accessible = tier == "pro" or skill["tier"] == "free"
+    entry = {
+        "skill_name": skill["id"],
+        "name": skill["name"],
+        "tier": skill["tier"],
+        "description": skill["description"],
+    }
+    if with_triggers:
+        entry["triggers"] = list(skill.get("triggers", []))
+    entry["accessible"] = accessible
+    if not accessible:
+        entry["upgrade_required"] = True
+    return entry
+
+
+@dataclass(frozen=True)
+class SkillIndex:
+    """Immutable, precomputed view of a skills registry.
+
+    Built once per registry so that tools and middleware answer catalog
+    questions with lookups instead of filtering the registry per request.
+    Registry entries are read-only mappings, so they always match
+    ``registry_json``.  Catalog responses are returned as fresh copies that
+    callers may modify.
+    """
+
+    registry: tuple[Mapping[str, Any], ...]
+    by_id: Mapping[str, Mapping[str, Any]]
+    available: tuple[Mapping[str, Any], ...]
+    pro_skill_ids: frozenset[str]
+    pro_resource_uris: frozenset[str]
+    registry_json: bytes  # the /api/skills response body
+    registry_etag: str  # strong ETag of registry_json
+    _list_skills: Mapping[str, Mapping[str, Any]] = field(repr=False)
+    _context_catalogs: Mapping[str, tuple[Mapping[str, Any], ...]] = field(repr=False)
+
+    @classmethod
+    def build(cls, registry: list[dict]) -> SkillIndex:
+        registry_json = dumps(list(registry))
+        registry = _frozen(registry)
+        available = tuple(s for s in registry if s["status"] == "available")
+        pro_skill_ids = frozenset(s["id"] for s in available if s["tier"] == "pro")
+        return cls(
+            registry=registry,
+            by_id=MappingProxyType({s["id"]: s for s in registry}),
+            available=available,
+            pro_skill_ids=pro_skill_ids,
+            pro_resource_uris=frozenset(
+                f"skill://{skill_id}/{name}"
+                for skill_id in pro_skill_ids
+                for name in SKILL_RESOURCE_NAMES
+            ),
+            registry_json=registry_json,
+            registry_etag=f'"{hashlib.sha256(registry_json).hexdigest()}"',
+            _list_skills=_frozen({
+                tier: {
+                    "status": "ok",
+                    "user_tier": tier,
+                    "skills": [
+                        _catalog_entry(s, tier, with_triggers=True) for s in available
+                    ],
+                }
+                for tier in TIERS
+            }),
+            _context_catalogs=_frozen({
+                tier: [_catalog_entry(s, tier, with_triggers=False) for s in available]
+                for tier in TIERS
+            }),
+        )
+
+    def get(self, skill_id: str) -> Mapping[str, Any] | None:
+        """Look up a registry entry by skill id."""
+        return self.by_id.get(skill_id)
+
+    def list_skills_response(self, tier: str) -> dict:
+        """The full ``list_skills`` tool response for a subscription tier."""
+        response = _thawed(self._list_skills.get(tier) or self._list_skills["free"])
+        # Unknown tiers get free access but must echo their own tier.
+        response["user_tier"] = tier
+        return response
+
+    def context_catalog(self, tier: str) -> list[dict]:
+        """The ``available_skills`` catalog embedded in project context."""
+        return _thawed(self._context_catalogs["pro" if tier == "pro" else "free"])
+
+
+_index = SkillIndex.build(SKILLS_REGISTRY)
+
+
+def get_skill_index() -> SkillIndex:
+    """Return the current skill index."""
+    return _index
+
+
+def reload_skill_index(registry: list[dict] | None = None) -> SkillIndex:
+    """Rebuild the index (from ``registry`` or SKILLS_REGISTRY) and swap it in.
+
+    The new index is fully built before it replaces the old one, so
+    concurrent readers see either the old or the new index, never a mix.
+    """
+    global _index
+    new_index = SkillIndex.build(SKILLS_REGISTRY if registry is None else registry)
+    _index = new_index
+    return new_index
@@ -0,0 +1,109 @@
+"""Coalesced Supabase refresh_token grants for the /api/mcp/token endpoint.
+
+Clients retry, and several tabs may refresh the same session at once.
+Supabase rotates refresh tokens, so only the first of those upstream
+calls would succeed anyway.  ``RefreshCoalescer`` makes one upstream call
+per refresh token: concurrent callers share the in-flight request, and
+the successful result is held for a short TTL so immediate duplicates get
+the same tokens.  Calls go through the pooled async HTTP client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+
+from coship_mcp.config import Settings
+from coship_mcp.db import get_http_client
+
+
+class RefreshError(ValueError):
+    """Supabase rejected the refresh token or could not be reached."""
+
+
+class RefreshCoalescer:
+    """Single-flight refresh_token grants with a short result cache."""
+
+    def __init__(self, settings: Settings, result_ttl: float = 10.0):
+        self.settings = settings
+        self.result_ttl = result_ttl
+        self._inflight: dict[bytes, asyncio.Future] = {}
+        # token hash -> (monotonic deadline, token response)
+        self._results: dict[bytes, tuple[float, dict]] = {}
+        self.upstream_calls = 0
+
+    @staticmethod
+    def _key(refresh_token: str) -> bytes:
+        return hashlib.sha256(refresh_token.encode()).digest()
+
+    async def _grant(self, refresh_token: str) -> dict:
+        self.upstream_calls += 1
+        settings = self.settings
+        headers = {}
+        if settings.supabase_anon_key:
+            headers["apikey"] = settings.supabase_anon_key
+        try:
+            response = await get_http_client(settings).post(
+                f"{settings.supabase_url.rstrip('/')}/auth/v1/token",
+                params={"grant_type": "refresh_token"},
+                json={"refresh_token": refresh_token},
+                headers=headers,
+            )
+        except Exception as exc:
+            raise RefreshError(f"Refresh failed: {exc}") from exc
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.is_error or not body.get("access_token"):
+            description = (
+                body.get("error_description") or body.get("msg") or "Refresh failed"
+            )
+            raise RefreshError(description)
+
+        return {
+            "access_token": body["access_token"],
+            "token_type": "bearer",
+            "expires_in": body.get("expires_in", 3600),
+            "refresh_token": body.get("refresh_token"),
+        }
+
+    def _prune(self, now: float) -> None:
+        expired = [k for k, (deadline, _) in self._results.items() if deadline <= now]
+        for key in expired:
+            del self._results[key]
+
+    def _finish(self, key: bytes, task: asyncio.Task) -> None:
+        # Runs when the grant completes, whether or not anyone still awaits it.
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._prune(time.monotonic())
+        if self.result_ttl > 0:
+            self._results[key] = (time.monotonic() + self.result_ttl, task.result())
+
+    async def refresh(self, refresh_token: str) -> dict:
+        """Exchange a refresh token for a new session, coalescing duplicates.
+
+        The upstream grant runs as its own task: a caller that gives up (for
+        example, a client disconnect) does not cancel it, and its result is
+        still cached for retries, since Supabase has already rotated the token.
+
+        Raises:
+            RefreshError: If Supabase rejects the grant.
+        """
+        key = self._key(refresh_token)
+        now = time.monotonic()
+        cached = self._results.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._grant(refresh_token))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
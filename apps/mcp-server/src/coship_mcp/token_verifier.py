@@ -0,0 +1,225 @@
+"""Supabase JWT verification with a cache of verified tokens.
+
+A chatty MCP session presents the same bearer token on every request.
+``CachingJWTVerifier`` remembers the ``AccessToken`` produced by a
+successful verification, keyed by a SHA-256 hash of the raw token, so
+repeat requests skip ECDSA signature verification and claims parsing.
+
+Entries expire at the token's ``exp`` or after ``max_age`` seconds,
+whichever comes first, and the cache is bounded with LRU eviction.
+Failed verifications are never cached.
+
+Signing keys (JWKS) are prefetched at startup, refreshed in the
+background and served stale-while-revalidate, so once a worker is warm
+the request path never waits on the JWKS endpoint.  An unknown ``kid``
+triggers one single-flighted, rate-limited refetch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+from authlib.jose import JsonWebKey
+from fastmcp.server.auth.providers.jwt import JWTVerifier
+
+from coship_mcp.db import get_http_client
+from coship_mcp.metrics import JWT_VERIFY_SECONDS
+from coship_mcp.middleware.subscription import TieredAccessToken, resolve_tier
+
+logger = logging.getLogger(__name__)
+
+
+def _log_jwks_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        logger.warning("JWKS fetch failed: %s", exc)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class CachingJWTVerifier(JWTVerifier):
+    """JWTVerifier that caches verified tokens until expiry."""
+
+    def __init__(
+        self,
+        *,
+        cache_maxsize: int = 10_000,
+        cache_max_age: float = 300.0,
+        jwks_refresh_interval: float = 600.0,
+        jwks_min_refetch_interval: float = 30.0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.cache_maxsize = cache_maxsize
+        self.cache_max_age = cache_max_age
+        # token hash -> (access token, wall-clock deadline)
+        self._verified: OrderedDict[bytes, tuple[TieredAccessToken, float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+        self.jwks_refresh_interval = jwks_refresh_interval
+        self.jwks_min_refetch_interval = jwks_min_refetch_interval
+        self._jwks_keys: dict[str, Any] = {}
+        self._jwks_fetched_at = 0.0  # monotonic; 0 means never fetched
+        self._jwks_inflight: asyncio.Task | None = None
+        self._jwks_refresher: asyncio.Task | None = None
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _lookup(self, key: bytes) -> TieredAccessToken | None:
+        entry = self._verified.get(key)
+        if entry is None:
+            return None
+        access_token, deadline = entry
+        if time.time() >= deadline:
+            del self._verified[key]
+            return None
+        self._verified.move_to_end(key)
+        return access_token
+
+    def _store(self, key: bytes, access_token: TieredAccessToken) -> None:
+        if self.cache_maxsize <= 0:
+            return
+        deadline = time.time() + self.cache_max_age
+        if access_token.expires_at is not None:
+            deadline = min(deadline, access_token.expires_at)
+        self._verified[key] = (access_token, deadline)
+        self._verified.move_to_end(key)
+        while len(self._verified) > self.cache_maxsize:
+            self._verified.popitem(last=False)
+
+    async def verify_token(self, token: str) -> TieredAccessToken | None:
+        with JWT_VERIFY_SECONDS.time(cache="hit") as labels:
+            key = self._key(token)
+            cached = self._lookup(key)
+            if cached is not None:
+                self._hits += 1
+                return cached
+
+            labels["cache"] = "miss"
+            self._misses += 1
+            verified = await self.load_access_token(token)
+            if verified is None:
+                return None
+            # Claims are fixed for the token's lifetime: resolve the tier once.
+            access_token = TieredAccessToken(
+                **dict(verified), subscription_tier=resolve_tier(verified.claims)
+            )
+            self._store(key, access_token)
+            return access_token
+
+    def cache_info(self) -> CacheInfo:
+        """Hit/miss counters and current size, like ``functools.lru_cache``."""
+        return CacheInfo(self._hits, self._misses, self.cache_maxsize, len(self._verified))
+
+    # --- JWKS ---
+
+    async def _fetch_jwks(self) -> None:
+        response = await get_http_client().get(self.jwks_uri)
+        response.raise_for_status()
+        keys: dict[str, Any] = {}
+        for key_data in response.json().get("keys", []):
+            public_key = JsonWebKey.import_key(key_data).get_public_key()
+            keys[key_data.get("kid") or "_default"] = public_key
+        if not keys:
+            raise ValueError("No keys found in JWKS")
+        # Swap in one assignment so readers never see a partial key set.
+        self._jwks_keys = keys
+        self._jwks_fetched_at = time.monotonic()
+
+    def _start_jwks_fetch(self) -> asyncio.Task:
+        """Return the in-flight JWKS fetch, starting one if none is running."""
+        task = self._jwks_inflight
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._fetch_jwks())
+            task.add_done_callback(_log_jwks_failure)
+            self._jwks_inflight = task
+        return task
+
+    async def refresh_jwks(self) -> None:
+        """Fetch the JWKS, sharing one in-flight request among all callers."""
+        # Shield so a cancelled caller does not abort the shared fetch.
+        await asyncio.shield(self._start_jwks_fetch())
+
+    def _jwks_age(self) -> float:
+        if not self._jwks_fetched_at:
+            return float("inf")
+        return time.monotonic() - self._jwks_fetched_at
+
+    def _select_key(self, kid: str | None) -> Any | None:
+        if kid:
+            return self._jwks_keys.get(kid)
+        if len(self._jwks_keys) == 1:
+            return next(iter(self._jwks_keys.values()))
+        return None
+
+    async def _get_jwks_key(self, kid: str | None) -> str:
+        if not self.jwks_uri:
+            raise ValueError("JWKS URI not configured")
+
+        key = self._select_key(kid)
+        if key is not None:
+            # Stale-while-revalidate: answer now, refresh off the request path.
+            if self._jwks_age() > self.jwks_refresh_interval:
+                self._start_jwks_fetch()
+            return key
+
+        # Cold worker or unknown kid (key rotation). Refetch, but not more
+        # often than jwks_min_refetch_interval so bogus kids cannot hammer
+        # the JWKS endpoint.
+        if self._jwks_age() > self.jwks_min_refetch_interval:
+            try:
+                await self.refresh_jwks()
+            except Exception as exc:
+                raise ValueError(f"Failed to fetch JWKS: {exc}") from exc
+            key = self._select_key(kid)
+        if key is None:
+            if kid:
+                raise ValueError(f"Key ID '{kid}' not found in JWKS")
+            raise ValueError("Multiple keys in JWKS but no key ID (kid) in token")
+        return key
+
+    async def start_jwks_refresh(self) -> None:
+        """Prefetch the JWKS and keep it fresh from a background task.
+
+        A failed prefetch is logged rather than raised, so the worker still
+        starts; the first request then falls back to fetching on demand.
+        """
+        if not self.jwks_uri or self._jwks_refresher is not None:
+            return
+        with contextlib.suppress(Exception):
+            await self.refresh_jwks()
+        self._jwks_refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.jwks_refresh_interval)
+            with contextlib.suppress(Exception):
+                await self.refresh_jwks()
+
+    async def stop_jwks_refresh(self) -> None:
+        """Cancel the background refresh task."""
+        task, self._jwks_refresher = self._jwks_refresher, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    # --- cache ---
+
+    def cache_clear(self) -> None:
+        """Drop all cached tokens and reset the counters."""
+        self._verified.clear()
+        self._hits = self._misses = 0
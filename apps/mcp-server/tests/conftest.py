@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import os
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
 import httpx
 import pytest
@@ -56,26 +56,69 @@ def _env_vars():
 
 
 @pytest.fixture
-def mcp_app(_env_vars):
-    """Create the Starlette ASGI app with mocked env vars.
+def settings(_env_vars):
+    """Fresh Settings instance built from the patched environment."""
+    from coship_mcp.config import get_settings
 
-    We must import server *after* patching env vars so pydantic-settings
-    picks them up.
+    from coship_mcp import db
+
+    get_settings.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+    db._settings = None
+
+
+class FakePostgrest:
+    """In-process stand-in for Supabase PostgREST.
+
+    Tests register responses per ``(method, table)``; every request is
+    recorded so tests can assert on round trips, filters and headers.
     """
-    # We need to reload the config and server modules so they pick up the
-    # patched environment variables.
-    import importlib
 
-    import coship_mcp.config as config_mod
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.responses: dict[tuple[str, str], object] = {}
+        self.latency = 0.0
+
+    def respond(self, method: str, table: str, response) -> None:
+        """Register a JSON body, an ``httpx.Response`` or a callable."""
+        self.responses[(method, table)] = response
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        import asyncio
 
-    importlib.reload(config_mod)
+        self.requests.append(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        table = request.url.path.removeprefix("/rest/v1/")
+        response = self.responses.get((request.method, table), [])
+        if callable(response):
+            response = response(request)
+        if isinstance(response, httpx.Response):
+            return response
+        return httpx.Response(200, json=response)
 
-    import coship_mcp.server as server_mod
 
-    importlib.reload(server_mod)
+@pytest.fixture
+def fake_postgrest(settings):
+    """Route the pooled Supabase HTTP client to a :class:`FakePostgrest`."""
+    from coship_mcp import db
+
+    fake = FakePostgrest()
+    db._http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(fake.handler),
+        event_hooks={"request": [db._start_timer], "response": [db._record_upstream]},
+    )
+    yield fake
+    db._http_client = None
+
+
+@pytest.fixture
+def mcp_app(settings):
+    """Create the Starlette ASGI app from the mocked env vars."""
+    from coship_mcp.server import create_app
 
-    app = server_mod.create_app()
-    return app
+    return create_app(settings)
 
 
 @pytest.fixture
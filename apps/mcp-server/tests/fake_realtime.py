@@ -0,0 +1,95 @@
+"""Local stand-in for the Supabase Realtime websocket, for tests."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import websockets
+
+
+class FakeRealtime:
+    """Accepts Phoenix channel joins and lets tests push postgres_changes.
+
+    Use as an async context manager; ``url`` is the websocket endpoint.
+    """
+
+    def __init__(self, *, refuse_joins: bool = False):
+        self.refuse_joins = refuse_joins
+        self.joins: list[dict] = []
+        self.heartbeats = 0
+        self.connections: set = set()
+        self.subscribed = asyncio.Event()
+        self._server = None
+        self._topics: dict = {}
+
+    async def __aenter__(self) -> FakeRealtime:
+        self._server = await websockets.serve(self._handle, "127.0.0.1", 0)
+        port = next(iter(self._server.sockets)).getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/realtime/v1/websocket?apikey=test&vsn=1.0.0"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws) -> None:
+        self.connections.add(ws)
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                if message["event"] == "heartbeat":
+                    self.heartbeats += 1
+                    await ws.send(json.dumps({
+                        "topic": "phoenix", "event": "phx_reply",
+                        "payload": {"status": "ok", "response": {}}, "ref": message["ref"],
+                    }))
+                elif message["event"] == "phx_join":
+                    await self._join(ws, message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connections.discard(ws)
+            if not self.connections:
+                self.subscribed.clear()
+
+    async def _join(self, ws, message: dict) -> None:
+        self.joins.append(message)
+        topic = message["topic"]
+        status = "error" if self.refuse_joins else "ok"
+        await ws.send(json.dumps({
+            "topic": topic, "event": "phx_reply", "ref": message["ref"],
+            "payload": {"status": status, "response": {"postgres_changes": [
+                {"id": 1, **change}
+                for change in message["payload"]["config"]["postgres_changes"]
+            ]}},
+        }))
+        if self.refuse_joins:
+            return
+        self._topics[ws] = topic
+        await ws.send(json.dumps({
+            "topic": topic, "event": "system", "ref": None,
+            "payload": {"status": "ok", "message": "Subscribed to PostgreSQL",
+                        "extension": "postgres_changes", "channel": topic},
+        }))
+        self.subscribed.set()
+
+    async def push(self, event_type: str, new: dict | None = None, old: dict | None = None):
+        """Send a change to every subscribed connection (server wire format)."""
+        data = {
+            "schema": "public", "table": "project_personality",
+            "commit_timestamp": "2026-10-18T00:00:00Z", "type": event_type,
+            "record": new or {}, "old_record": old or {}, "errors": None,
+        }
+        for ws, topic in list(self._topics.items()):
+            await ws.send(json.dumps({
+                "topic": topic, "event": "postgres_changes", "ref": None,
+                "payload": {"ids": [1], "data": data},
+            }))
+
+    async def drop_connections(self) -> None:
+        """Close every client socket, as a network failure would."""
+        for ws in list(self.connections):
+            await ws.close()
+        self._topics.clear()
+        self.subscribed.clear()
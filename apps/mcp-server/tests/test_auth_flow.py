@@ -174,3 +174,107 @@ async def test_token_endpoint_rejects_tampered_code(
         },
     )
     assert resp.status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# Refresh Token Grant
+# ---------------------------------------------------------------------------
+
+SUPABASE_TOKEN_PATH = "/auth/v1/token"
+
+
+def _refresh_form(refresh_token: str) -> dict:
+    return {
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+        "client_id": "coship-internal",
+        "client_secret": "test-secret-for-integration-tests-32ch",
+    }
+
+
+@pytest.fixture
+def supabase_refresh(fake_postgrest):
+    """Fake Supabase auth: each upstream refresh mints a numbered token."""
+
+    def grant(request: httpx.Request) -> httpx.Response:
+        import json
+
+        assert request.url.params["grant_type"] == "refresh_token"
+        if json.loads(request.content)["refresh_token"] == "revoked":
+            return httpx.Response(
+                400,
+                json={"error": "invalid_grant", "error_description": "Invalid Refresh Token"},
+            )
+        n = sum(r.url.path == SUPABASE_TOKEN_PATH for r in fake_postgrest.requests)
+        return httpx.Response(
+            200,
+            json={
+                "access_token": f"new-access-{n}",
+                "token_type": "bearer",
+                "expires_in": 3600,
+                "refresh_token": f"new-refresh-{n}",
+            },
+        )
+
+    fake_postgrest.respond("POST", SUPABASE_TOKEN_PATH, grant)
+    return fake_postgrest
+
+
+@pytest.mark.asyncio
+async def test_refresh_grant_returns_new_tokens(client: httpx.AsyncClient, supabase_refresh):
+    resp = await client.post("/api/mcp/token", data=_refresh_form("rt-1"))
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "access_token": "new-access-1",
+        "token_type": "bearer",
+        "expires_in": 3600,
+        "refresh_token": "new-refresh-1",
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_are_coalesced(client: httpx.AsyncClient, supabase_refresh):
+    import asyncio
+
+    supabase_refresh.latency = 0.05
+    responses = await asyncio.gather(
+        *(client.post("/api/mcp/token", data=_refresh_form("rt-1")) for _ in range(5))
+    )
+    # An immediate retry is served from the short-lived result cache
+    responses.append(await client.post("/api/mcp/token", data=_refresh_form("rt-1")))
+
+    assert {r.json()["access_token"] for r in responses} == {"new-access-1"}
+    assert sum(r.url.path == SUPABASE_TOKEN_PATH for r in supabase_refresh.requests) == 1
+
+    other = await client.post("/api/mcp/token", data=_refresh_form("rt-2"))
+    assert other.json()["access_token"] == "new-access-2"
+
+
+@pytest.mark.asyncio
+async def test_refresh_rejected_upstream(client: httpx.AsyncClient, supabase_refresh):
+    resp = await client.post("/api/mcp/token", data=_refresh_form("revoked"))
+    assert resp.status_code == 400
+    assert resp.json() == {
+        "error": "invalid_grant",
+        "error_description": "Invalid Refresh Token",
+    }
+
+
+@pytest.mark.asyncio
+async def test_cancelled_refresh_still_caches_the_rotated_tokens(mcp_app, supabase_refresh):
+    import asyncio
+
+    refresher = mcp_app.state.token_refresher
+    supabase_refresh.latency = 0.05
+
+    first = asyncio.create_task(refresher.refresh("rt-1"))
+    await asyncio.sleep(0.01)  # grant in flight
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    await asyncio.sleep(0.1)  # grant completes with nobody awaiting it
+    # The retry gets the tokens of the grant that already rotated rt-1.
+    retry = await refresher.refresh("rt-1")
+    assert retry["access_token"] == "new-access-1"
+    assert sum(r.url.path == SUPABASE_TOKEN_PATH for r in supabase_refresh.requests) == 1
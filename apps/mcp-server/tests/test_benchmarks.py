@@ -0,0 +1,26 @@
+"""Smoke test for the session benchmark (benchmarks/sessions.py)."""
+
+from __future__ import annotations
+
+from benchmarks.sessions import STEPS, Options, format_report, run, summarize
+
+
+def test_summarize_percentiles():
+    stats = summarize([i / 1000 for i in range(1, 101)], wall_seconds=2.0)
+
+    assert stats["count"] == 100
+    assert stats["rps"] == 50.0
+    assert stats["p50_ms"] == 50.0
+    assert stats["p99_ms"] == 99.0
+    assert stats["max_ms"] == 100.0
+
+
+async def test_session_benchmark_runs_every_step():
+    """Signs in through the OAuth proxy and runs the full session script."""
+    results = await run(Options(sessions=3, concurrency=2, users=2, warmup_sessions=0))
+
+    for step in STEPS:
+        assert results["steps"][step]["count"] == 3
+        assert results["steps"][step]["errors"] == 0
+    assert results["overall"]["count"] == 3 * len(STEPS)
+    assert "save_project_personality" in format_report(results, baseline=results)
@@ -0,0 +1,145 @@
+"""Tests for response compression and compact JSON encoding."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+
+from coship_mcp import compression
+from coship_mcp.compression import CompressionMiddleware, choose_encoding
+from coship_mcp.serialization import JSONResponse, dumps
+from tests.conftest import TEST_API_SECRET, TEST_SERVER_BASE_URL
+
+BIG = "x" * 4096
+
+
+def _app(minimum_size: int = 1024) -> Starlette:
+    app = Starlette(routes=[
+        Route("/big", lambda request: PlainTextResponse(BIG)),
+        Route("/small", lambda request: PlainTextResponse("ok")),
+        Route(
+            "/tagged",
+            lambda request: PlainTextResponse(BIG, headers={"ETag": '"v1"', "Vary": "Origin"}),
+        ),
+        Route(
+            "/events",
+            lambda request: Response(f"data: {BIG}\n\n", media_type="text/event-stream"),
+        ),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    return app
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("deflate, gzip;q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("*", "gzip"),
+    ],
+)
+def test_choose_encoding_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_prefers_brotli_when_installed(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0.1") == "gzip"
+
+
+@pytest.mark.asyncio
+async def test_large_bodies_are_gzipped(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    async with _client(_app()) as http:
+        raw = await http.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    assert int(raw.headers["content-length"]) < len(BIG)
+    assert "Accept-Encoding" in raw.headers["vary"]
+    assert raw.text == BIG  # httpx decodes gzip
+
+
+@pytest.mark.asyncio
+async def test_small_bodies_and_event_streams_are_not_compressed():
+    async with _client(_app()) as http:
+        small = await http.get("/small", headers={"Accept-Encoding": "gzip"})
+        events = await http.get("/events", headers={"Accept-Encoding": "gzip"})
+        plain = await http.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in events.headers
+    assert "content-encoding" not in plain.headers
+    assert small.headers["vary"] == plain.headers["vary"] == "Accept-Encoding"
+    assert "vary" not in events.headers
+
+
+@pytest.mark.asyncio
+async def test_compressed_responses_have_weak_etags(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    async with _client(_app()) as http:
+        gzipped = await http.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        plain = await http.get("/tagged", headers={"Accept-Encoding": "identity"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == 'W/"v1"'
+    assert plain.headers["etag"] == '"v1"'
+    assert gzipped.headers["vary"] == plain.headers["vary"] == "Origin, Accept-Encoding"
+
+
+@pytest.mark.asyncio
+async def test_brotli(monkeypatch):
+    brotli = pytest.importorskip("brotli")
+    monkeypatch.setattr(compression, "brotli", brotli)
+    async with _client(_app()) as http:
+        response = await http.get("/big", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.text == BIG
+
+
+def test_dumps_is_compact_utf8():
+    content = {"name": "Café", "tags": [1, 2], "none": None}
+    assert dumps(content) == '{"name":"Café","tags":[1,2],"none":null}'.encode()
+    assert JSONResponse(content).body == dumps(content)
+
+
+@pytest.mark.asyncio
+async def test_api_skills_has_etag_and_is_compressed(mcp_app):
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=mcp_app), base_url=TEST_SERVER_BASE_URL
+    ) as http:
+        first = await http.get(
+            "/api/skills",
+            headers={"Authorization": f"Bearer {TEST_API_SECRET}", "Accept-Encoding": "gzip"},
+        )
+        second = await http.get(
+            "/api/skills",
+            headers={"Authorization": f"Bearer {TEST_API_SECRET}", "Accept-Encoding": "identity"},
+        )
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"] == f"W/{second.headers['etag']}"
+    assert second.headers["etag"].startswith('"')
+    assert first.json() == second.json()
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=mcp_app), base_url=TEST_SERVER_BASE_URL
+    ) as http:
+        revalidated = await http.get(
+            "/api/skills",
+            headers={
+                "Authorization": f"Bearer {TEST_API_SECRET}",
+                "Accept-Encoding": "gzip",
+                "If-None-Match": first.headers["etag"],
+            },
+        )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == first.headers["etag"]
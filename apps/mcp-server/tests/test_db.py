@@ -0,0 +1,97 @@
+"""Tests for the pooled, user-scoped PostgREST client."""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastmcp.server.auth import AccessToken
+
+from tests.conftest import TEST_SUPABASE_ANON_KEY, TEST_SUPABASE_URL
+
+
+def _token(value: str) -> AccessToken:
+    return AccessToken(token=value, client_id="test", scopes=[], claims={"sub": "u1"})
+
+
+def test_clients_share_one_pool(settings, fake_postgrest):
+    from coship_mcp import db
+
+    a = db.user_postgrest(_token("token-a"), settings)
+    b = db.user_postgrest(_token("token-b"), settings)
+    assert a.session is b.session is db.get_http_client()
+
+
+@pytest.mark.asyncio
+async def test_bearer_token_is_sent_per_request(settings, fake_postgrest):
+    from coship_mcp import db
+
+    await db.user_postgrest(_token("token-a"), settings).table("projects").select("id").execute()
+    await db.user_postgrest(_token("token-b"), settings).table("projects").select("id").execute()
+
+    seen = fake_postgrest.requests
+    assert [r.headers["authorization"] for r in seen] == [
+        "Bearer token-a",
+        "Bearer token-b",
+    ]
+    assert all(r.headers["apikey"] == TEST_SUPABASE_ANON_KEY for r in seen)
+    assert str(seen[0].url).startswith(f"{TEST_SUPABASE_URL}/rest/v1/projects")
+
+
+@pytest.mark.asyncio
+async def test_closed_pool_is_recreated(settings):
+    from coship_mcp import db
+
+    await db.close_http_client()
+    first = db.get_http_client()
+    await db.close_http_client()
+    second = db.get_http_client()
+    assert first is not second
+    assert not second.is_closed
+    await db.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_app_uses_the_settings_it_was_built_with():
+    import coship_mcp.server as server_mod
+    from coship_mcp import db
+    from coship_mcp.config import Settings, get_settings
+
+    explicit = Settings(
+        _env_file=None,
+        supabase_url="https://explicit.supabase.co",
+        supabase_anon_key="explicit-anon-key",
+        supabase_timeout=3.0,
+        api_secret="explicit-secret-for-tests-32-chars",
+    )
+    clean_env = {k: v for k, v in os.environ.items() if not k.startswith("COSHIP_")}
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path == "/auth/v1/token":
+            return httpx.Response(200, json={"access_token": "a", "refresh_token": "r"})
+        return httpx.Response(200, json=[])
+
+    with patch.dict(os.environ, clean_env, clear=True):
+        get_settings.cache_clear()
+        server_mod.create_app(explicit)
+        await db.close_http_client()
+        try:
+            assert db.get_http_client().timeout.read == 3.0
+            await db.close_http_client()
+            db._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+            token = _token("user-jwt")
+            result = await server_mod.list_user_projects(token=token)
+            assert result["status"] == "ok"
+            await server_mod.get_components().token_refresher.refresh("refresh-1")
+        finally:
+            await db.close_http_client()
+            get_settings.cache_clear()
+            db._settings = None
+
+    assert [r.url.host for r in seen] == ["explicit.supabase.co"] * 2
+    assert all(r.headers["apikey"] == "explicit-anon-key" for r in seen)
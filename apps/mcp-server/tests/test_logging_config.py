@@ -0,0 +1,112 @@
+"""Tests for settings-driven logging and sampled auth diagnostics."""
+
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tests.conftest import TEST_API_SECRET, TEST_SERVER_BASE_URL
+
+
+@pytest.fixture
+def logging_config(settings):
+    from coship_mcp import logging_config as mod
+
+    yield mod
+    mod.shutdown_logging()
+    mod._auth_sample_rate = 0.0
+    logging.getLogger("coship_mcp.auth").setLevel(logging.NOTSET)
+
+
+def test_json_formatter_includes_extra_fields(logging_config):
+    record = logging.LogRecord("coship_mcp.test", logging.INFO, "", 0, "hi %s", ("there",), None)
+    record.tool = "list_skills"
+
+    entry = json.loads(logging_config.JsonFormatter().format(record))
+    assert entry["message"] == "hi there"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "coship_mcp.test"
+    assert entry["tool"] == "list_skills"
+
+
+def test_configure_logging_sets_component_levels(logging_config, settings):
+    settings = settings.model_copy(
+        update={"log_levels": {"coship_mcp.demo": "WARNING"}, "log_format": "json"}
+    )
+    logging_config.configure_logging(settings)
+    logging_config.configure_logging(settings)  # idempotent
+
+    root = logging.getLogger()
+    queue_handlers = [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]
+    assert len(queue_handlers) == 1
+    assert logging.getLogger("coship_mcp.demo").level == logging.WARNING
+    logging.getLogger("coship_mcp.demo").setLevel(logging.NOTSET)
+
+
+def test_auth_debug_sampling(logging_config, settings):
+    logging_config.configure_logging(settings)
+    assert not any(logging_config.auth_debug_enabled() for _ in range(1000))
+
+    logging_config.configure_logging(settings.model_copy(update={"auth_debug_sample_rate": 1.0}))
+    assert all(logging_config.auth_debug_enabled() for _ in range(100))
+
+    logging_config.configure_logging(settings.model_copy(update={"auth_debug_sample_rate": 0.1}))
+    sampled = sum(logging_config.auth_debug_enabled() for _ in range(10_000))
+    assert 500 < sampled < 1500
+
+
+async def _exchange(client: httpx.AsyncClient, code: str) -> httpx.Response:
+    return await client.post(
+        "/api/mcp/token",
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "client_id": "coship-internal",
+            "client_secret": TEST_API_SECRET,
+            "redirect_uri": f"{TEST_SERVER_BASE_URL}/auth/callback",
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_token_exchange_logs_nothing_by_default(
+    client: httpx.AsyncClient, encrypted_auth_code: str, logging_config, caplog
+):
+    with caplog.at_level(logging.DEBUG, logger="coship_mcp"):
+        resp = await _exchange(client, encrypted_auth_code)
+    assert resp.status_code == 200
+    assert not [r for r in caplog.records if r.name == "coship_mcp.auth"]
+
+
+@pytest.mark.asyncio
+async def test_token_exchange_logs_sampled_jwt_header(
+    mcp_app, api_secret, logging_config, caplog
+):
+    import base64
+
+    from coship_mcp.auth_code import encrypt_auth_code
+
+    header = base64.urlsafe_b64encode(b'{"alg":"ES256","kid":"k1"}').rstrip(b"=").decode()
+    code = encrypt_auth_code({"access_token": f"{header}.e30.sig"}, api_secret)
+
+    with patch.dict(os.environ, {"COSHIP_AUTH_DEBUG_SAMPLE_RATE": "1"}):
+        from coship_mcp import config
+
+        logging_config.configure_logging(config.Settings())
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=mcp_app), base_url=TEST_SERVER_BASE_URL
+    )
+    with caplog.at_level(logging.DEBUG, logger="coship_mcp.auth"):
+        resp = await _exchange(client, code)
+    assert resp.status_code == 200
+
+    [record] = [r for r in caplog.records if r.name == "coship_mcp.auth"]
+    assert record.jwt_alg == "ES256"
+    assert record.jwt_kid == "k1"
@@ -0,0 +1,126 @@
+"""Tests for latency metrics and the /metrics endpoint."""
+
+from __future__ import annotations
+
+import json
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastmcp import Client
+from fastmcp.server.auth import AccessToken
+
+from coship_mcp.metrics import Histogram, Registry
+from tests.conftest import TEST_API_SECRET
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    hist = registry.histogram("demo_seconds", "Demo.", ["op"], buckets=[0.1, 1.0])
+    hist.observe(0.05, op="a")
+    hist.observe(0.1, op="a")
+    hist.observe(3.0, op="a")
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{op="a",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{op="a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{op="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{op="a"} 3' in text
+    assert hist.count(op="a") == 3
+
+
+def test_shared_render_sums_all_workers(tmp_path):
+    registry = Registry()
+    hist = registry.histogram("demo_seconds", "Demo.", ["op"], buckets=[0.1, 1.0])
+    hist.observe(0.05, op="a")
+    # Another worker's snapshot (same buckets), and one saved with other buckets.
+    other = Registry()
+    other.histogram("demo_seconds", "Demo.", ["op"], buckets=[0.1, 1.0]).observe(3.0, op="a")
+    (tmp_path / "1.json").write_text(json.dumps(other.snapshot()))
+    (tmp_path / "2.json").write_text(json.dumps({"demo_seconds": [[["a"], [5], 1.0]]}))
+
+    text = registry.render_shared(tmp_path)
+    assert 'demo_seconds_bucket{op="a",le="0.1"} 1' in text
+    assert 'demo_seconds_count{op="a"} 2' in text
+    assert 'demo_seconds_sum{op="a"} 3.05' in text
+
+    hist.observe(0.5, op="a")
+    assert 'demo_seconds_count{op="a"} 3' in registry.render_shared(tmp_path)
+    assert hist.count(op="a") == 2  # this worker's own series are unchanged
+
+
+def test_histogram_time_labels_can_change():
+    hist = Histogram("t_seconds", "T.", ["status"])
+    with hist.time(status="error") as labels:
+        labels["status"] = "ok"
+    assert hist.count(status="ok") == 1
+    assert hist.count(status="error") == 0
+
+
+@pytest.fixture
+def metrics(mcp_app):
+    from coship_mcp import metrics as metrics_mod
+
+    metrics_mod.REGISTRY.clear()
+    yield metrics_mod
+    metrics_mod.REGISTRY.clear()
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_and_upstream_are_recorded(metrics, fake_postgrest):
+    import coship_mcp.server as server_mod
+
+    token = AccessToken(token="t", client_id="c", scopes=[], claims={"sub": "u1"})
+    await server_mod.list_user_projects(token=token)
+
+    # The in-memory client runs the server lifespan, which closes the pool.
+    async with Client(server_mod.mcp) as client:
+        await client.call_tool("list_skills")
+        await client.call_tool("load_skill", {"skill_name": "matching"})
+
+    assert metrics.TOOL_CALL_SECONDS.count(tool="list_skills", status="ok") == 1
+    assert metrics.MCP_REQUEST_SECONDS.count(method="tools/call", status="ok") == 2
+    assert metrics.SKILL_LOAD_SECONDS.count(status="ok") == 1
+    assert metrics.UPSTREAM_SECONDS.count(upstream="postgrest", status="2xx") == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: httpx.AsyncClient, metrics):
+    assert (await client.get("/metrics")).status_code == 401
+
+    metrics.JWT_VERIFY_SECONDS.observe(0.001, cache="hit")
+    resp = await client.get(
+        "/metrics", headers={"Authorization": f"Bearer {TEST_API_SECRET}"}
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'coship_jwt_verify_seconds_count{cache="hit"} 1' in resp.text
+
+
+def _metrics_app(**env):
+    from coship_mcp.config import Settings
+    from coship_mcp.server import create_app
+
+    with patch.dict(os.environ, env):
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_app(Settings())),
+            base_url="http://test",
+        )
+
+
+@pytest.mark.asyncio
+async def test_metrics_need_a_shared_dir_with_several_workers(_env_vars, metrics, tmp_path):
+    auth = {"Authorization": f"Bearer {TEST_API_SECRET}"}
+    async with _metrics_app(COSHIP_WORKERS="4") as http:
+        assert (await http.get("/metrics", headers=auth)).status_code == 409
+
+    other = Registry()
+    other.histogram("coship_jwt_verify_seconds", "J.", ["cache"]).observe(0.001, cache="hit")
+    (tmp_path / "1.json").write_text(json.dumps(other.snapshot()))
+    metrics.JWT_VERIFY_SECONDS.observe(0.001, cache="hit")
+    async with _metrics_app(COSHIP_WORKERS="4", COSHIP_METRICS_DIR=str(tmp_path)) as http:
+        resp = await http.get("/metrics", headers=auth)
+    assert resp.status_code == 200
+    assert 'coship_jwt_verify_seconds_count{cache="hit"} 2' in resp.text
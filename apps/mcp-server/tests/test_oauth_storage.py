@@ -0,0 +1,148 @@
+"""Tests for the OAuthProxy state store."""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tests.conftest import TEST_SERVER_BASE_URL
+
+REGISTRATION = {
+    "redirect_uris": ["http://localhost:12345/callback"],
+    "client_name": "Test Client",
+}
+AUTHORIZE_PARAMS = {
+    "response_type": "code",
+    "redirect_uri": "http://localhost:12345/callback",
+    "state": "test-state-123",
+    "code_challenge": "E9Melhoa2OwvFrEMTJguCHaoeK1t8URWbuGJSstw-cM",
+    "code_challenge_method": "S256",
+}
+
+
+def _settings(settings, **update):
+    return settings.model_copy(update=update)
+
+
+def test_backend_defaults_to_disk_even_in_dev_mode(_env_vars):
+    from coship_mcp.config import Settings
+
+    with patch.dict(os.environ, {"COSHIP_DEV_MODE": "true"}):
+        assert Settings(_env_file=None).oauth_storage == "disk"
+    with patch.dict(os.environ, {"COSHIP_OAUTH_STORAGE": "memory"}):
+        assert Settings(_env_file=None).oauth_storage == "memory"
+
+
+@pytest.mark.asyncio
+async def test_disk_store_is_shared_and_encrypted(settings, tmp_path):
+    from coship_mcp.oauth_storage import build_oauth_storage
+
+    config = _settings(settings, oauth_storage="disk", oauth_storage_dir=str(tmp_path))
+    worker_a = build_oauth_storage(config)
+    worker_b = build_oauth_storage(config)
+
+    await worker_a.put("c1", {"client_id": "c1"}, collection="mcp-oauth-proxy-clients")
+    assert await worker_b.get("c1", collection="mcp-oauth-proxy-clients") == {"client_id": "c1"}
+
+    raw = b"".join(p.read_bytes() for p in tmp_path.rglob("*") if p.is_file())
+    assert b'"client_id"' not in raw
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_on_ttl(settings, tmp_path):
+    from coship_mcp.oauth_storage import build_oauth_storage
+
+    store = build_oauth_storage(
+        _settings(settings, oauth_storage="disk", oauth_storage_dir=str(tmp_path))
+    )
+    with patch("time.time", return_value=1_000_000.0):
+        await store.put("t1", {"x": 1}, collection="mcp-oauth-transactions", ttl=60)
+    assert await store.get("t1", collection="mcp-oauth-transactions") is None
+
+
+@pytest.mark.asyncio
+async def test_single_use_state_is_not_read_cached(settings, tmp_path):
+    from coship_mcp.oauth_storage import build_oauth_storage
+
+    config = _settings(settings, oauth_storage="disk", oauth_storage_dir=str(tmp_path))
+    worker_a = build_oauth_storage(config)
+    worker_b = build_oauth_storage(config)
+
+    await worker_a.put("code", {"x": 1}, collection="mcp-authorization-codes", ttl=300)
+    assert await worker_b.get("code", collection="mcp-authorization-codes") == {"x": 1}
+    # Redeemed on worker A: worker B must not serve it from a cache.
+    await worker_a.delete("code", collection="mcp-authorization-codes")
+    assert await worker_b.get("code", collection="mcp-authorization-codes") is None
+
+    # Client registrations are cached per worker.
+    await worker_a.put("c1", {"client_id": "c1"}, collection="mcp-oauth-proxy-clients")
+    assert await worker_b.get("c1", collection="mcp-oauth-proxy-clients")
+    await worker_a.delete("c1", collection="mcp-oauth-proxy-clients")
+    assert await worker_b.get("c1", collection="mcp-oauth-proxy-clients")
+
+
+@pytest.mark.asyncio
+async def test_rotated_upstream_tokens_are_seen_by_other_workers(settings, tmp_path):
+    from coship_mcp.oauth_storage import build_oauth_storage
+
+    config = _settings(settings, oauth_storage="disk", oauth_storage_dir=str(tmp_path))
+    worker_a = build_oauth_storage(config)
+    worker_b = build_oauth_storage(config)
+
+    await worker_a.put("u1", {"refresh_token": "r1"}, collection="mcp-upstream-tokens")
+    assert await worker_b.get("u1", collection="mcp-upstream-tokens") == {"refresh_token": "r1"}
+
+    # A refresh on worker A rewrites the token set under the same id.
+    await worker_a.put("u1", {"refresh_token": "r2"}, collection="mcp-upstream-tokens")
+    assert await worker_b.get("u1", collection="mcp-upstream-tokens") == {"refresh_token": "r2"}
+
+    await worker_a.put("jti", {"upstream_token_id": "u1"}, collection="mcp-jti-mappings")
+    assert await worker_b.get("jti", collection="mcp-jti-mappings")
+    await worker_a.delete("jti", collection="mcp-jti-mappings")
+    assert await worker_b.get("jti", collection="mcp-jti-mappings") is None
+
+
+def _fresh_app():
+    """Build a new app from the environment, as a new worker process would."""
+    from coship_mcp.config import Settings
+    from coship_mcp.server import create_app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_app(Settings())),
+        base_url=TEST_SERVER_BASE_URL,
+    )
+
+
+@pytest.mark.asyncio
+async def test_client_registered_on_one_worker_authorizes_on_another(_env_vars, tmp_path):
+    env = {"COSHIP_OAUTH_STORAGE": "disk", "COSHIP_OAUTH_STORAGE_DIR": str(tmp_path)}
+    with patch.dict(os.environ, env):
+        worker_a = _fresh_app()
+        client_id = (await worker_a.post("/register", json=REGISTRATION)).json()["client_id"]
+
+        worker_b = _fresh_app()
+        resp = await worker_b.get(
+            "/authorize",
+            params={**AUTHORIZE_PARAMS, "client_id": client_id},
+            follow_redirects=False,
+        )
+    assert resp.status_code == 302
+    assert "/mcp/authorize" in resp.headers["location"]
+
+
+@pytest.mark.asyncio
+async def test_memory_store_is_per_worker(_env_vars):
+    with patch.dict(os.environ, {"COSHIP_OAUTH_STORAGE": "memory"}):
+        worker_a = _fresh_app()
+        client_id = (await worker_a.post("/register", json=REGISTRATION)).json()["client_id"]
+
+        worker_b = _fresh_app()
+        resp = await worker_b.get(
+            "/authorize",
+            params={**AUTHORIZE_PARAMS, "client_id": client_id},
+            follow_redirects=False,
+        )
+    assert resp.status_code != 302
@@ -0,0 +1,225 @@
+"""Tests for the Realtime-fed personality cache."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastmcp.server.auth import AccessToken
+
+from coship_mcp.personality_cache import PersonalityCache
+from coship_mcp.realtime_feed import RealtimeFeed, websocket_url
+from tests.fake_realtime import FakeRealtime
+
+ROW = {"id": "r1", "project_id": "p1", "challenge_level": "trust_judgment"}
+
+
+def _later(seconds: float):
+    import time
+
+    now = time.monotonic()
+    return patch("coship_mcp.personality_cache.time.monotonic", return_value=now + seconds)
+
+
+def test_entries_use_ttl_unless_the_feed_is_live():
+    cache = PersonalityCache(ttl=10, max_age=100)
+    cache.put("p1", ROW)
+    assert cache.get("p1") == (True, ROW)
+    with _later(20):
+        assert cache.get("p1") == (False, None)
+
+    cache.set_live(True)
+    cache.put("p1", ROW)
+    cache.put("p2", None)  # known: no personality yet
+    with _later(20):
+        assert cache.get("p1") == (True, ROW)
+        assert cache.get("p2") == (True, None)
+    with _later(200):
+        assert cache.get("p1") == (False, None)
+
+
+def test_entries_from_before_a_reconnect_fall_back_to_ttl():
+    cache = PersonalityCache(ttl=10, max_age=100)
+    cache.set_live(True)
+    cache.put("p1", ROW)
+    cache.set_live(False)
+    cache.set_live(True)  # events may have been missed in between
+    with _later(20):
+        assert cache.get("p1") == (False, None)
+
+
+def test_change_events_update_cache_and_notify():
+    cache = PersonalityCache()
+    changed = []
+    cache.listeners.append(changed.append)
+
+    cache.apply_change({"type": "INSERT", "record": ROW, "old_record": {}})
+    assert cache.get("p1") == (True, ROW)
+
+    updated = {**ROW, "challenge_level": "challenge_actively"}
+    cache.apply_change({"eventType": "UPDATE", "new": updated, "old": {"id": "r1"}})
+    assert cache.get("p1") == (True, updated)
+
+    # DELETE carries only the primary key
+    cache.apply_change({"type": "DELETE", "record": {}, "old_record": {"id": "r1"}})
+    assert cache.get("p1") == (False, None)
+    assert changed == ["p1", "p1", "p1"]
+
+
+def test_reads_started_before_a_change_are_not_stored():
+    cache = PersonalityCache()
+    generation = cache.generation()
+    cache.apply_change({"type": "UPDATE", "record": {**ROW, "project_id": "p9"}})
+    cache.put("p1", ROW, generation)
+    assert cache.get("p1") == (False, None)
+
+    cache.put("p1", ROW, cache.generation())
+    assert cache.get("p1") == (True, ROW)
+
+
+def test_bounded():
+    cache = PersonalityCache(maxsize=2)
+    for i in range(3):
+        cache.put(f"p{i}", {"id": f"r{i}", "project_id": f"p{i}"})
+    assert len(cache) == 2
+    assert cache.get("p0") == (False, None)
+
+
+def test_websocket_url():
+    assert websocket_url("https://abc.supabase.co/", "key") == (
+        "wss://abc.supabase.co/realtime/v1/websocket?apikey=key&vsn=1.0.0"
+    )
+
+
+async def _until(predicate, timeout: float = 5.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_feed_applies_changes_and_reconnects():
+    cache = PersonalityCache(ttl=10, max_age=100)
+    async with FakeRealtime() as server:
+        feed = RealtimeFeed(
+            server.url,
+            "service-key",
+            on_change=cache.apply_change,
+            on_status=cache.set_live,
+            heartbeat_interval=0.05,
+            initial_backoff=0.01,
+            max_backoff=0.05,
+        )
+        feed.start()
+        try:
+            await _until(lambda: cache.live)
+            join = server.joins[0]["payload"]
+            assert join["access_token"] == "service-key"
+            assert join["config"]["postgres_changes"][0]["table"] == "project_personality"
+
+            await server.push("INSERT", new=ROW)
+            await _until(lambda: cache.get("p1")[0])
+            await _until(lambda: server.heartbeats > 0)
+
+            await server.drop_connections()
+            await _until(lambda: not cache.live)
+            await _until(lambda: cache.live)
+            assert feed.connects == 2
+
+            await server.push("UPDATE", new={**ROW, "challenge_level": "only_serious_risks"})
+            await _until(lambda: cache.get("p1")[1]["challenge_level"] == "only_serious_risks")
+        finally:
+            await feed.stop()
+    assert not cache.live
+
+
+@pytest.mark.asyncio
+async def test_feed_retries_refused_joins_with_backoff():
+    statuses = []
+    async with FakeRealtime(refuse_joins=True) as server:
+        feed = RealtimeFeed(
+            server.url, "bad-key", on_change=lambda change: None, on_status=statuses.append,
+            initial_backoff=0.01, max_backoff=0.02,
+        )
+        feed.start()
+        try:
+            await _until(lambda: len(server.joins) >= 3)
+        finally:
+            await feed.stop()
+    assert True not in statuses
+
+
+# --- get_project_context ---
+
+
+@pytest.fixture
+def token() -> AccessToken:
+    return AccessToken(token="user-jwt", client_id="c", scopes=[], claims={"sub": "user-1"})
+
+
+@pytest.mark.asyncio
+async def test_project_context_reads_personality_from_cache(mcp_app, fake_postgrest, token):
+    import coship_mcp.server as server_mod
+
+    project = {"id": "p1", "name": "Acme", "slug": "acme", "description": None, "status": "active"}
+
+    def projects(request):
+        if "project_personality" in request.url.params["select"]:
+            return [{**project, "project_personality": ROW}]
+        return [project]
+
+    fake_postgrest.respond("GET", "projects", projects)
+    cache = server_mod.get_components().personality_cache
+
+    first = await server_mod.get_project_context("p1", token=token)
+    assert first["personality"] == ROW
+    assert "project_personality" in fake_postgrest.requests[0].url.params["select"]
+
+    cache.apply_change({"type": "UPDATE", "record": {**ROW, "challenge_level": "full_trust"}})
+    second = await server_mod.get_project_context("p1", token=token)
+    assert second["personality"]["challenge_level"] == "full_trust"
+    # Still one round trip (the ownership check), without the embed.
+    assert len(fake_postgrest.requests) == 2
+    assert "project_personality" not in fake_postgrest.requests[1].url.params["select"]
+
+
+@pytest.mark.asyncio
+async def test_changes_drop_cached_project_context_results(mcp_app):
+    from fastmcp.tools import ToolResult
+
+    import coship_mcp.server as server_mod
+
+    components = server_mod.get_components()
+    for user, project_id in (("u1", "p1"), ("u2", "p2")):
+        components.tool_cache._store(
+            (user, "free", "get_project_context", f'{{"project_id":"{project_id}"}}'),
+            float("inf"),
+            ToolResult(structured_content={"status": "ok", "project_id": project_id}),
+        )
+
+    components.personality_cache.apply_change({"type": "UPDATE", "record": ROW})
+
+    assert [key[0] for key in components.tool_cache._entries] == ["u2"]
+
+
+@pytest.mark.asyncio
+async def test_changes_drop_cached_multi_project_results(mcp_app):
+    from fastmcp.tools import ToolResult
+
+    import coship_mcp.server as server_mod
+
+    components = server_mod.get_components()
+    for user, project_id in (("u1", "p1"), ("u2", "p2")):
+        components.tool_cache._store(
+            (user, "free", "get_projects_context", "{}"),
+            float("inf"),
+            ToolResult(structured_content={
+                "status": "ok",
+                "projects": [{"project_id": "p0"}, {"project_id": project_id}],
+            }),
+        )
+
+    components.personality_cache.apply_change({"type": "UPDATE", "record": ROW})
+
+    assert [key[0] for key in components.tool_cache._entries] == ["u2"]
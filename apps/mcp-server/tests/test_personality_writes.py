@@ -0,0 +1,294 @@
+"""Tests for the write-behind buffer behind save_project_personality."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastmcp.server.auth import AccessToken
+
+from coship_mcp.personality_writes import PersonalityWriteBuffer
+
+
+def _token(sub: str) -> AccessToken:
+    return AccessToken(token=f"{sub}-jwt", client_id="c", scopes=[], claims={"sub": sub})
+
+
+def _row(project_id: str, level: str = "trust_judgment") -> dict:
+    return {"project_id": project_id, "challenge_level": level}
+
+
+class NotOwned(Exception):
+    pass
+
+
+class Upserts:
+    """Records write calls; rows for ``fail`` projects make the call raise.
+
+    The first ``outages`` calls fail with a transient error.
+    """
+
+    def __init__(self, fail: tuple[str, ...] = (), outages: int = 0):
+        self.calls: list[tuple[str, list[dict]]] = []
+        self.fail = fail
+        self.outages = outages
+
+    async def __call__(self, token: AccessToken, rows: list[dict]) -> list[dict]:
+        self.calls.append((token.claims["sub"], rows))
+        if len(self.calls) <= self.outages:
+            raise ConnectionError("upstream unavailable")
+        if any(row["project_id"] in self.fail for row in rows):
+            raise NotOwned("new row violates row-level security policy")
+        return [{"id": f"r-{row['project_id']}", **row} for row in rows]
+
+
+def _buffer(upserts: Upserts, **kwargs) -> PersonalityWriteBuffer:
+    return PersonalityWriteBuffer(
+        upserts, is_permanent=lambda exc: isinstance(exc, NotOwned), **kwargs
+    )
+
+
+async def _until(predicate, timeout: float = 5.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_saves_are_debounced_per_project_and_batched_per_user():
+    upserts = Upserts()
+    writes = _buffer(upserts, window=0.05)
+    saved = []
+    writes.listeners.append(saved.extend)
+
+    for level in ("a", "b", "c"):
+        writes.submit(_token("u1"), "u1", _row("p1", level))
+    writes.submit(_token("u1"), "u1", _row("p2"))
+    writes.submit(_token("u2"), "u2", _row("p3"))
+    assert writes.pending("p1", "u1") == _row("p1", "c")
+    assert writes.pending("p1", "u2") is None
+
+    await _until(lambda: len(writes) == 0 and len(upserts.calls) == 2)
+    await writes.close()
+
+    assert sorted(upserts.calls) == [
+        ("u1", [_row("p1", "c"), _row("p2")]),
+        ("u2", [_row("p3")]),
+    ]
+    assert {row["project_id"] for row in saved} == {"p1", "p2", "p3"}
+
+
+@pytest.mark.asyncio
+async def test_continuous_saves_are_written_after_max_wait():
+    upserts = Upserts()
+    writes = _buffer(upserts, window=0.05, max_wait=0.15)
+    for _ in range(15):
+        writes.submit(_token("u1"), "u1", _row("p1"))
+        await asyncio.sleep(0.02)
+    assert upserts.calls
+    await writes.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_rows_are_retried_alone_and_lose_ownership():
+    upserts = Upserts(fail=("p2",))
+    writes = _buffer(upserts, window=60)
+    for project_id in ("p1", "p2"):
+        writes.confirm_owner("u1", project_id)
+        writes.submit(_token("u1"), "u1", _row(project_id))
+
+    await writes.close()  # writes pending saves without waiting for the window
+
+    assert [rows for _, rows in upserts.calls] == [
+        [_row("p1"), _row("p2")],
+        [_row("p1")],
+        [_row("p2")],
+    ]
+    assert writes.accepts("u1", "p2") is False
+    assert writes.flushes == 3
+    # The lost save stays visible to its user, with the error to report.
+    assert writes.pending("p2", "u1") == _row("p2")
+    assert "row-level security" in writes.failure("p2", "u1")
+    assert writes.failure("p2", "u2") is None
+
+    writes.confirm_owner("u1", "p2")  # a later synchronous save succeeded
+    assert writes.failure("p2", "u1") is None
+    assert writes.pending("p2", "u1") is None
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_with_backoff():
+    upserts = Upserts(outages=2)
+    writes = _buffer(upserts, window=0.01, retry_backoff=0.02)
+    writes.confirm_owner("u1", "p1")
+    writes.submit(_token("u1"), "u1", _row("p1"))
+
+    await _until(lambda: len(upserts.calls) == 3 and len(writes) == 0)
+    await writes.close()
+    assert writes.failure("p1", "u1") is None
+    assert writes.accepts("u1", "p1") is False  # closed
+
+
+@pytest.mark.asyncio
+async def test_saves_that_keep_failing_are_reported(caplog):
+    upserts = Upserts(outages=100)
+    writes = _buffer(upserts, window=0.01, retries=2, retry_backoff=0.01)
+    writes.confirm_owner("u1", "p1")
+    writes.submit(_token("u1"), "u1", _row("p1"))
+
+    await _until(lambda: writes.failure("p1", "u1") is not None)
+    await writes.close()
+    assert len(upserts.calls) == 3
+    assert writes.failure("p1", "u1") == "upstream unavailable"
+    assert writes.pending("p1", "u1") == _row("p1")
+    assert not writes.accepts("u1", "p1")
+    assert any(r.levelname == "ERROR" and "u1" in r.getMessage() for r in caplog.records)
+
+
+@pytest.mark.asyncio
+async def test_closed_buffer_does_not_defer():
+    writes = _buffer(Upserts())
+    writes.confirm_owner("u1", "p1")
+    assert writes.accepts("u1", "p1")
+    assert not writes.accepts("u1", "p2")
+    await writes.close()
+    assert not writes.accepts("u1", "p1")
+
+
+# --- save_project_personality ---
+
+
+SAVE_ARGS = {
+    "project_id": "p1",
+    "challenge_level": "trust_judgment",
+    "transparency_level": "full_trust",
+    "ux_design_model": "ship_decides",
+    "development_approach": "speed_iteration",
+}
+
+
+@pytest.fixture
+def server(fake_postgrest):
+    import coship_mcp.server as server_mod
+    from coship_mcp.config import get_settings
+
+    env = {"COSHIP_PERSONALITY_WRITE_BEHIND": "true", "COSHIP_PERSONALITY_WRITE_WINDOW": "60"}
+    with patch.dict(os.environ, env):
+        get_settings.cache_clear()
+        server_mod.create_app(get_settings())
+        yield server_mod
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_saves_after_the_first_are_written_behind(server, fake_postgrest):
+    def upsert(request):
+        body = json.loads(request.content)
+        rows = body if isinstance(body, list) else [body]
+        return [{"id": "pp1", "created_at": "2026-10-18T00:00:00Z", **row} for row in rows]
+
+    fake_postgrest.respond("POST", "project_personality", upsert)
+    fake_postgrest.respond(
+        "GET", "projects", [{"id": "p1", "name": "Acme", "project_personality": None}]
+    )
+    token = _token("user-1")
+    writes = server.get_components().personality_writes
+
+    first = await server.save_project_personality(**SAVE_ARGS, token=token)
+    assert first["personality"]["id"] == "pp1"
+    assert len(fake_postgrest.requests) == 1  # ownership is confirmed synchronously
+
+    for level in ("challenge_actively", "only_serious_risks"):
+        result = await server.save_project_personality(
+            **{**SAVE_ARGS, "challenge_level": level}, token=token
+        )
+        assert result["status"] == "ok" and result["saved"] is True
+        assert result["personality"]["id"] == "pp1"
+        assert result["personality"]["challenge_level"] == level
+    assert len(fake_postgrest.requests) == 1
+
+    # The owner reads the pending value back.
+    context = await server.get_project_context("p1", token=token)
+    assert context["personality"]["challenge_level"] == "only_serious_risks"
+
+    await writes.close()
+    flushed = fake_postgrest.requests[-1]
+    assert flushed.url.params["on_conflict"] == "project_id"
+    assert [row["challenge_level"] for row in json.loads(flushed.content)] == ["only_serious_risks"]
+    _, cached = server.get_components().personality_cache.get("p1")
+    assert cached["challenge_level"] == "only_serious_risks"
+
+
+@pytest.mark.asyncio
+async def test_ownership_errors_are_still_returned(server, fake_postgrest):
+    fake_postgrest.respond(
+        "POST",
+        "project_personality",
+        httpx.Response(
+            403,
+            json={
+                "code": "42501",
+                "message": "new row violates row-level security policy",
+                "details": None,
+                "hint": None,
+            },
+        ),
+    )
+
+    result = await server.save_project_personality(**SAVE_ARGS, token=_token("user-1"))
+
+    assert result == {"status": "error", "message": "Project not found or not owned by user"}
+    assert not server.get_components().personality_writes.accepts("user-1", "p1")
+
+
+@pytest.mark.asyncio
+async def test_failed_deferred_save_is_reported_on_next_read_and_save(server, fake_postgrest):
+    outage = {"on": False}
+
+    def upsert(request):
+        if outage["on"]:
+            return httpx.Response(503, json={"message": "upstream unavailable"})
+        body = json.loads(request.content)
+        rows = body if isinstance(body, list) else [body]
+        return [{"id": "pp1", **row} for row in rows]
+
+    fake_postgrest.respond("POST", "project_personality", upsert)
+    fake_postgrest.respond("GET", "projects", [{"id": "p1", "name": "Acme"}])
+    token = _token("user-1")
+    writes = server.get_components().personality_writes
+    writes.retries = 0
+
+    await server.save_project_personality(**SAVE_ARGS, token=token)
+    outage["on"] = True
+    deferred = await server.save_project_personality(
+        **{**SAVE_ARGS, "challenge_level": "only_serious_risks"}, token=token
+    )
+    assert deferred["saved"] is True
+    await writes.close()  # the deferred write fails
+
+    context = await server.get_project_context("p1", token=token)
+    assert context["personality"]["challenge_level"] == "only_serious_risks"
+    assert "was not saved" in context["warning"]
+
+    outage["on"] = False
+    result = await server.save_project_personality(**SAVE_ARGS, token=token)
+    assert result["status"] == "ok" and "was not saved" in result["warning"]
+    assert "warning" not in await server.get_project_context("p1", token=token)
+
+
+def test_write_behind_needs_a_single_worker(fake_postgrest, caplog):
+    import coship_mcp.server as server_mod
+    from coship_mcp.config import get_settings
+
+    env = {"COSHIP_PERSONALITY_WRITE_BEHIND": "true", "COSHIP_WORKERS": "2"}
+    with patch.dict(os.environ, env):
+        get_settings.cache_clear()
+        server_mod.create_app(get_settings())
+    get_settings.cache_clear()
+
+    assert server_mod.get_components().personality_writes is None
+    assert any("WRITE_BEHIND is ignored" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,285 @@
+"""Tests for the Supabase-backed project tools against a fake PostgREST."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastmcp.server.auth import AccessToken
+
+USER_ID = "user-1"
+
+
+@pytest.fixture
+def server(mcp_app):
+    import coship_mcp.server as server_mod
+
+    return server_mod
+
+
+@pytest.fixture
+def token() -> AccessToken:
+    return AccessToken(
+        token="user-jwt",
+        client_id="test",
+        scopes=[],
+        claims={"sub": USER_ID, "app_metadata": {"subscription_tier": "free"}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_user_projects(server, fake_postgrest, token):
+    fake_postgrest.respond("GET", "projects", [{"id": "p1", "name": "Acme"}])
+
+    result = await server.list_user_projects(token=token)
+
+    assert result == {
+        "status": "ok",
+        "projects": [{"id": "p1", "name": "Acme"}],
+        "next_cursor": None,
+    }
+    (request,) = fake_postgrest.requests
+    assert request.url.params["user_id"] == f"eq.{USER_ID}"
+    assert request.url.params["status"] == "eq.active"
+    assert request.url.params["order"] == "created_at.desc,id.desc"
+    assert request.url.params["limit"] == "51"
+
+
+@pytest.mark.asyncio
+async def test_list_user_projects_pages_with_a_cursor(server, fake_postgrest, token):
+    rows = [
+        {"id": f"p{i}", "name": f"Project {i}", "created_at": f"2026-01-0{9 - i}T00:00:00+00:00"}
+        for i in range(5)
+    ]
+    fake_postgrest.respond(
+        "GET", "projects", lambda request: rows[:int(request.url.params["limit"])]
+    )
+
+    first = await server.list_user_projects(limit=2, fields=["id", "name"], token=token)
+
+    assert first["projects"] == [
+        {"id": "p0", "name": "Project 0"},
+        {"id": "p1", "name": "Project 1"},
+    ]
+    assert first["next_cursor"]
+    assert "created_at" in fake_postgrest.requests[0].url.params["select"]
+    assert "or" not in fake_postgrest.requests[0].url.params
+
+    rows = rows[2:]
+    second = await server.list_user_projects(limit=2, cursor=first["next_cursor"], token=token)
+    assert [p["id"] for p in second["projects"]] == ["p2", "p3"]
+    keyset = fake_postgrest.requests[1].url.params["or"]
+    assert keyset == (
+        '(created_at.lt."2026-01-08T00:00:00+00:00",'
+        'and(created_at.eq."2026-01-08T00:00:00+00:00",id.lt."p1"))'
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"limit": 0}, {"limit": 101}, {"fields": ["id", "user_id"]}, {"cursor": "not-a-cursor"}],
+)
+async def test_list_user_projects_rejects_bad_arguments(server, fake_postgrest, token, kwargs):
+    result = await server.list_user_projects(token=token, **kwargs)
+
+    assert result["status"] == "error"
+    assert fake_postgrest.requests == []
+
+
+@pytest.mark.asyncio
+async def test_project_tools_do_not_block_the_event_loop(server, fake_postgrest, token):
+    fake_postgrest.latency = 0.05
+    calls = 50
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(server.list_user_projects(token=token) for _ in range(calls))
+    )
+    elapsed = time.perf_counter() - started
+
+    assert all(r["status"] == "ok" for r in results)
+    # Serialised calls would take calls * latency (2.5s); concurrent ones overlap.
+    assert elapsed < calls * fake_postgrest.latency / 5
+
+
+@pytest.mark.asyncio
+async def test_tools_require_authentication(server):
+    assert (await server.list_user_projects(token=None))["status"] == "error"
+    assert (await server.get_project_context(token=None))["status"] == "error"
+    assert (await server.get_projects_context(token=None))["status"] == "error"
+
+
+PERSONALITY = {
+    "id": "pp1",
+    "project_id": "p1",
+    "challenge_level": "challenge_actively",
+    "project_summary": "Acme builds rockets",
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("embedded", [PERSONALITY, [PERSONALITY]])
+async def test_get_project_context_single_round_trip(
+    server, fake_postgrest, token, embedded
+):
+    fake_postgrest.respond(
+        "GET",
+        "projects",
+        [
+            {
+                "id": "p1",
+                "name": "Acme",
+                "slug": "acme",
+                "description": "Rockets",
+                "status": "active",
+                "project_personality": embedded,
+            }
+        ],
+    )
+
+    result = await server.get_project_context(project_id="p1", token=token)
+
+    (request,) = fake_postgrest.requests
+    assert "project_personality(*)" in request.url.params["select"]
+    assert request.url.params["id"] == "eq.p1"
+    assert result["has_personality"] is True
+    assert result["personality"] == PERSONALITY
+    assert result["project_name"] == "Acme"
+    assert result["project_description"] == "Rockets"
+    assert "action" not in result
+    assert [s["skill_name"] for s in result["available_skills"]] == ["matching"]
+
+
+@pytest.mark.asyncio
+async def test_get_project_context_without_personality(server, fake_postgrest, token):
+    fake_postgrest.respond(
+        "GET",
+        "projects",
+        [{"id": "p1", "name": "Acme", "description": None, "project_personality": None}],
+    )
+
+    result = await server.get_project_context(token=token)
+
+    (request,) = fake_postgrest.requests
+    assert request.url.params["order"] == "created_at.desc"
+    assert result["has_personality"] is False
+    assert result["personality"] is None
+    assert "load_skill" in result["action"]
+
+
+@pytest.mark.asyncio
+async def test_get_project_context_no_project(server, fake_postgrest, token):
+    result = await server.get_project_context(token=token)
+    assert result == {"status": "ok", "has_project": False, "has_personality": False}
+
+
+def _project(pid: str, personality: dict | None = None) -> dict:
+    return {"id": pid, "name": pid.upper(), "slug": pid, "description": None,
+            "status": "active", "project_personality": personality}
+
+
+@pytest.mark.asyncio
+async def test_get_projects_context_single_batched_query(server, fake_postgrest, token):
+    fake_postgrest.respond(
+        "GET", "projects", [_project("p2"), _project("p1", PERSONALITY)]
+    )
+
+    result = await server.get_projects_context(["p1", "p2", "p3", "p1"], token=token)
+
+    (request,) = fake_postgrest.requests
+    assert request.url.params["id"] == "in.(p1,p2,p3)"
+    assert "project_personality(*)" in request.url.params["select"]
+    assert request.url.params["user_id"] == f"eq.{USER_ID}"
+    assert result["status"] == "ok"
+    assert [p["project_id"] for p in result["projects"]] == ["p1", "p2"]
+    assert result["projects"][0]["personality"] == PERSONALITY
+    assert "action" not in result["projects"][0]
+    assert "load_skill" in result["projects"][1]["action"]
+    assert result["missing_project_ids"] == ["p3"]
+    assert [s["skill_name"] for s in result["available_skills"]] == ["matching"]
+
+
+@pytest.mark.asyncio
+async def test_get_projects_context_defaults_to_recent_projects(
+    server, fake_postgrest, token, settings
+):
+    fake_postgrest.respond("GET", "projects", [_project("p2"), _project("p1")])
+
+    result = await server.get_projects_context(token=token)
+
+    (request,) = fake_postgrest.requests
+    assert "id" not in request.url.params
+    assert request.url.params["order"] == "created_at.desc"
+    assert request.url.params["limit"] == str(settings.projects_context_max_batch)
+    assert [p["project_id"] for p in result["projects"]] == ["p2", "p1"]
+    assert result["missing_project_ids"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_projects_context_limits_batch_size(server, fake_postgrest, token, settings):
+    too_many = [f"p{i}" for i in range(settings.projects_context_max_batch + 1)]
+
+    result = await server.get_projects_context(too_many, token=token)
+    empty = await server.get_projects_context([], token=token)
+
+    assert result["status"] == "error"
+    assert result["max_batch"] == settings.projects_context_max_batch
+    assert empty["projects"] == []
+    assert fake_postgrest.requests == []
+
+
+SAVE_ARGS = {
+    "project_id": "p1",
+    "challenge_level": "challenge_actively",
+    "transparency_level": "just_outcome",
+    "ux_design_model": "ship_decides",
+    "development_approach": "speed_iteration",
+}
+
+
+@pytest.mark.asyncio
+async def test_save_project_personality_single_upsert(server, fake_postgrest, token):
+    def upsert(request):
+        import json
+
+        return httpx.Response(201, json=[{"id": "pp1", **json.loads(request.content)}])
+
+    fake_postgrest.respond("POST", "project_personality", upsert)
+
+    result = await server.save_project_personality(**SAVE_ARGS, token=token)
+
+    (request,) = fake_postgrest.requests
+    assert request.url.params["on_conflict"] == "project_id"
+    assert "return=representation" in request.headers["prefer"]
+    assert result["status"] == "ok"
+    assert result["saved"] is True
+    assert result["personality"]["project_id"] == "p1"
+    assert result["personality"]["documentation_level"] == "minimal"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("code", ["42501", "23503"])
+async def test_save_project_personality_not_owned(server, fake_postgrest, token, code):
+    fake_postgrest.respond(
+        "POST",
+        "project_personality",
+        httpx.Response(
+            403,
+            json={
+                "code": code,
+                "message": "new row violates row-level security policy",
+                "details": None,
+                "hint": None,
+            },
+        ),
+    )
+
+    result = await server.save_project_personality(**SAVE_ARGS, token=token)
+
+    assert result == {
+        "status": "error",
+        "message": "Project not found or not owned by user",
+    }
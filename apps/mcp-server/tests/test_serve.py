@@ -0,0 +1,102 @@
+"""Tests for the coship-mcp production launcher."""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def serve(settings):
+    from coship_mcp import serve
+
+    return serve
+
+
+def test_options_default_to_settings(serve, settings):
+    with patch.dict(os.environ, {"COSHIP_WORKERS": "3", "COSHIP_KEEP_ALIVE": "120"}):
+        from coship_mcp import config
+
+        with patch.object(config, "get_settings", return_value=config.Settings()):
+            options = serve.uvicorn_options([])
+
+    assert options["factory"] is True
+    assert options["workers"] == 3
+    assert options["timeout_keep_alive"] == 120
+    assert options["backlog"] == settings.backlog
+    assert options["timeout_graceful_shutdown"] == settings.graceful_timeout
+    assert options["preload"] is False
+    # Loopback only, and forwarded headers trusted from local proxies only.
+    assert options["host"] == "127.0.0.1"
+    assert options["proxy_headers"] is True
+    assert options["forwarded_allow_ips"] is None
+
+
+def test_cli_overrides_settings(serve):
+    options = serve.uvicorn_options(
+        ["--workers", "4", "--backlog", "4096", "--keep-alive", "30", "--preload"]
+    )
+    assert options["workers"] == 4
+    assert options["backlog"] == 4096
+    assert options["timeout_keep_alive"] == 30
+    assert options["preload"] is True
+
+
+def test_forwarded_ips_come_from_settings(serve):
+    with patch.dict(os.environ, {"COSHIP_FORWARDED_ALLOW_IPS": "10.0.0.1"}):
+        from coship_mcp import config
+
+        with patch.object(config, "get_settings", return_value=config.Settings()):
+            assert serve.uvicorn_options([])["forwarded_allow_ips"] == "10.0.0.1"
+
+
+def test_zero_workers_means_one_per_cpu(serve):
+    with patch("os.cpu_count", return_value=8):
+        assert serve.uvicorn_options(["--workers", "0"])["workers"] == 8
+
+
+def test_platform_port_is_used(serve):
+    with patch.dict(os.environ, {"PORT": "9123"}):
+        assert serve.uvicorn_options([])["port"] == 9123
+    assert serve.uvicorn_options(["--port", "9000"])["port"] == 9000
+
+
+def test_fast_loop_and_parser_when_installed(serve):
+    with patch.object(serve, "_available", return_value=True):
+        options = serve.uvicorn_options([])
+    assert (options["loop"], options["http"]) == ("uvloop", "httptools")
+
+    with patch.object(serve, "_available", return_value=False):
+        options = serve.uvicorn_options([])
+    assert (options["loop"], options["http"]) == ("asyncio", "h11")
+
+
+def test_main_runs_app_factory(serve):
+    with patch.dict(os.environ), patch.object(serve.uvicorn, "run") as run:
+        serve.main(["--workers", "2", "--port", "9000"])
+        # Workers see the worker count given on the command line.
+        assert os.environ["COSHIP_WORKERS"] == "2"
+
+    (app,), kwargs = run.call_args
+    assert app == "coship_mcp.server:create_app"
+    assert kwargs["workers"] == 2
+    assert "preload" not in kwargs
+
+
+def test_several_workers_share_a_metrics_dir(serve, tmp_path):
+    with patch.dict(os.environ), patch.object(serve.uvicorn, "run"):
+        serve.main(["--workers", "2"])
+        created = os.environ["COSHIP_METRICS_DIR"]
+    assert os.path.isdir(created)
+    os.rmdir(created)
+
+    (tmp_path / "123.json").write_text("{}")  # a previous run's worker
+    with patch.dict(os.environ, {"COSHIP_METRICS_DIR": str(tmp_path)}):
+        from coship_mcp import config
+
+        with patch.object(config, "get_settings", return_value=config.Settings()):
+            with patch.object(serve.uvicorn, "run"):
+                serve.main(["--workers", "2"])
+    assert list(tmp_path.iterdir()) == []
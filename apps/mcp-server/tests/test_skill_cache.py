@@ -0,0 +1,119 @@
+"""Tests for the compiled skill content cache and load_skill."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastmcp.server.auth import AccessToken
+
+from coship_mcp.skill_cache import SkillContentCache, split_frontmatter
+
+SKILL_MD = "---\nname: demo\ndescription: Demo skill\n---\n\n# Demo\n\nDo the thing.\n"
+
+
+@pytest.fixture
+def roots(tmp_path: Path) -> list[Path]:
+    free, pro = tmp_path / "free", tmp_path / "pro"
+    (free / "demo").mkdir(parents=True)
+    (free / "demo" / "SKILL.md").write_text(SKILL_MD)
+    (pro / "secret").mkdir(parents=True)
+    (pro / "secret" / "SKILL.md").write_text("# Secret\n")
+    return [free, pro]
+
+
+def test_split_frontmatter():
+    assert split_frontmatter(SKILL_MD) == (
+        "name: demo\ndescription: Demo skill",
+        "# Demo\n\nDo the thing.",
+    )
+    assert split_frontmatter("# No frontmatter\n") == ("", "# No frontmatter\n")
+
+
+def test_compiled_once(roots):
+    cache = SkillContentCache(roots)
+    first = cache.get("demo")
+    with patch.object(Path, "read_bytes") as read_bytes:
+        second = cache.get("demo")
+    read_bytes.assert_not_called()
+    assert second is first
+    assert first.payload == {
+        "status": "ok",
+        "skill": "demo",
+        "instructions": "# Demo\n\nDo the thing.",
+    }
+
+
+def test_recompiled_when_file_changes(roots):
+    cache = SkillContentCache(roots)
+    first = cache.get("demo")
+    path = roots[0] / "demo" / "SKILL.md"
+    path.write_text(SKILL_MD.replace("Do the thing.", "Do the other thing!"))
+    os.utime(path, ns=(first.mtime_ns + 1_000_000, first.mtime_ns + 1_000_000))
+
+    assert "other thing" in cache.get("demo").instructions
+
+
+def test_touch_without_change_keeps_parsed_content(roots):
+    cache = SkillContentCache(roots)
+    first = cache.get("demo")
+    path = roots[0] / "demo" / "SKILL.md"
+    os.utime(path, ns=(first.mtime_ns + 1_000_000, first.mtime_ns + 1_000_000))
+
+    second = cache.get("demo")
+    assert second.mtime_ns != first.mtime_ns
+    assert second.payload is first.payload
+
+
+def test_without_validation_file_is_not_stat_ed(roots):
+    cache = SkillContentCache(roots, validate=False)
+    cache.get("demo")
+    with patch("coship_mcp.skill_cache.os.stat") as stat:
+        cache.get("demo")
+    stat.assert_not_called()
+
+
+@pytest.mark.parametrize("name", ["missing", "../free/demo", ".hidden", ""])
+def test_unknown_or_path_like_names_are_rejected(roots, name):
+    with pytest.raises(FileNotFoundError):
+        SkillContentCache(roots).get(name)
+
+
+@pytest.mark.asyncio
+async def test_load_skill_tool(mcp_app):
+    import coship_mcp.server as server_mod
+
+    token = AccessToken(token="t", client_id="c", scopes=[], claims={"sub": "u1"})
+    result = await server_mod.load_skill("matching", token=token)
+    assert result["status"] == "ok"
+    assert not result["instructions"].startswith("---")
+    assert result["instructions"].startswith("# Co-founder Setup")
+
+    missing = await server_mod.load_skill("nope", token=token)
+    assert missing["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_load_skill_gates_pro_skills(mcp_app):
+    import coship_mcp.server as server_mod
+    from coship_mcp.skills_registry import reload_skill_index
+
+    reload_skill_index([
+        {"id": "matching", "name": "M", "tier": "pro", "description": "", "status": "available"},
+    ])
+    try:
+        free = AccessToken(token="free-t", client_id="c", scopes=[], claims={"sub": "u1"})
+        result = await server_mod.load_skill("matching", token=free)
+        assert result["status"] == "upgrade_required"
+
+        pro = AccessToken(
+            token="pro-t",
+            client_id="c",
+            scopes=[],
+            claims={"sub": "u1", "app_metadata": {"subscription_tier": "pro"}},
+        )
+        assert (await server_mod.load_skill("matching", token=pro))["status"] == "ok"
+    finally:
+        reload_skill_index()
@@ -0,0 +1,140 @@
+"""Tests for the precomputed skill index."""
+
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from coship_mcp.skills_registry import (
+    SKILLS_REGISTRY,
+    SkillIndex,
+    get_skill_index,
+    reload_skill_index,
+)
+from tests.conftest import TEST_API_SECRET, TEST_SERVER_BASE_URL
+
+REGISTRY = [
+    {"id": "a", "name": "A", "tier": "free", "description": "a", "status": "available",
+     "triggers": ["do a"]},
+    {"id": "b", "name": "B", "tier": "pro", "description": "b", "status": "available"},
+    {"id": "c", "name": "C", "tier": "pro", "description": "c", "status": "coming_soon"},
+]
+
+
+def test_index_lookups():
+    index = SkillIndex.build(REGISTRY)
+    assert index.get("c")["name"] == "C"
+    assert index.get("missing") is None
+    assert [s["id"] for s in index.available] == ["a", "b"]
+    assert index.pro_skill_ids == {"b"}
+
+
+@pytest.mark.parametrize(
+    ("tier", "accessible"), [("free", [True, False]), ("pro", [True, True])]
+)
+def test_list_skills_response_per_tier(tier, accessible):
+    response = SkillIndex.build(REGISTRY).list_skills_response(tier)
+    assert response["user_tier"] == tier
+    assert [s["accessible"] for s in response["skills"]] == accessible
+    assert response["skills"][0]["triggers"] == ["do a"]
+    assert response["skills"][1].get("upgrade_required") is (None if tier == "pro" else True)
+
+
+def test_responses_are_copies():
+    index = SkillIndex.build(REGISTRY)
+    etag = index.registry_etag
+    response = index.list_skills_response("pro")
+    response["skills"][0]["triggers"].append("changed")
+    response["skills"].clear()
+    catalog = index.context_catalog("free")
+    catalog[0]["name"] = "changed"
+    assert "triggers" not in catalog[0]
+
+    assert index.list_skills_response("pro")["skills"][0]["triggers"] == ["do a"]
+    assert index.context_catalog("free")[0]["name"] == "A"
+    assert index.registry_etag == etag
+
+
+def test_registry_entries_are_read_only():
+    index = SkillIndex.build(REGISTRY)
+    with pytest.raises(TypeError):
+        index.get("a")["name"] = "changed"
+    with pytest.raises(AttributeError):
+        index.available[0]["triggers"].append("changed")
+    assert json.loads(index.registry_json) == REGISTRY
+
+
+def test_unknown_tier_is_treated_as_free():
+    index = SkillIndex.build(REGISTRY)
+    response = index.list_skills_response("enterprise")
+    assert response["user_tier"] == "enterprise"
+    assert response["skills"] == index.list_skills_response("free")["skills"]
+    assert index.context_catalog("enterprise") == index.context_catalog("free")
+
+
+def test_reload_swaps_index():
+    original = get_skill_index()
+    try:
+        reloaded = reload_skill_index(REGISTRY)
+        assert get_skill_index() is reloaded
+        assert reloaded.pro_skill_ids == {"b"}
+    finally:
+        reload_skill_index()
+    assert get_skill_index() is not original
+    assert [s["id"] for s in get_skill_index().registry] == [s["id"] for s in SKILLS_REGISTRY]
+
+
+def test_registry_body_and_etag_follow_reloads():
+    original = get_skill_index()
+    try:
+        reloaded = reload_skill_index(REGISTRY)
+        assert json.loads(reloaded.registry_json) == REGISTRY
+        assert reloaded.registry_etag != original.registry_etag
+    finally:
+        reload_skill_index()
+    assert get_skill_index().registry_etag == original.registry_etag
+
+
+@pytest.mark.asyncio
+async def test_api_skills_revalidates_with_etag(mcp_app):
+    auth = {"Authorization": f"Bearer {TEST_API_SECRET}"}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=mcp_app), base_url=TEST_SERVER_BASE_URL
+    ) as http:
+        assert (await http.get("/api/skills")).status_code == 401
+        wrong = await http.get("/api/skills", headers={"Authorization": "Bearer nope"})
+        assert wrong.status_code == 401
+
+        first = await http.get("/api/skills", headers=auth)
+        assert first.status_code == 200
+        assert first.json() == SKILLS_REGISTRY
+        assert "max-age=" in first.headers["cache-control"]
+        etag = first.headers["etag"]
+
+        cached = await http.get("/api/skills", headers={**auth, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+        try:
+            reload_skill_index(REGISTRY)
+            changed = await http.get("/api/skills", headers={**auth, "If-None-Match": etag})
+        finally:
+            reload_skill_index()
+    assert changed.status_code == 200
+    assert changed.json() == REGISTRY
+
+
+@pytest.mark.asyncio
+async def test_list_skills_tool_serializes_catalog(mcp_app):
+    from fastmcp import Client
+
+    import coship_mcp.server as server_mod
+
+    async with Client(server_mod.mcp) as client:
+        result = await client.call_tool("list_skills")
+
+    assert result.structured_content["user_tier"] == "free"
+    assert [s["skill_name"] for s in result.structured_content["skills"]] == ["matching"]
@@ -0,0 +1,135 @@
+"""Tests for production (snapshot) vs development (hot reload) skills mode."""
+
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from tests.conftest import TEST_API_SECRET, TEST_SERVER_BASE_URL
+
+
+def _write_skill(root: Path, name: str) -> None:
+    (root / name).mkdir(parents=True)
+    (root / name / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: {name} skill\n---\n\n# {name}\n"
+    )
+
+
+@pytest.fixture
+def skills_dir(tmp_path: Path) -> Path:
+    for i in range(8):
+        _write_skill(tmp_path / "free", f"skill-{i}")
+    (tmp_path / "pro").mkdir()
+    return tmp_path
+
+
+def _load_server(skills_dir: Path, dev_mode: bool):
+    """Build the server for a skills dir; returns the server module and its app."""
+    env = {"COSHIP_SKILLS_DIR": str(skills_dir), "COSHIP_DEV_MODE": str(dev_mode).lower()}
+    with patch.dict(os.environ, env):
+        import coship_mcp.server as server_mod
+        from coship_mcp.config import Settings
+
+        return server_mod, server_mod.create_app(Settings())
+
+
+async def _resource_uris(server_mod) -> set[str]:
+    async with Client(server_mod.mcp) as client:
+        return {str(r.uri) for r in await client.list_resources()}
+
+
+@pytest.mark.asyncio
+async def test_production_mode_snapshots_skills(_env_vars, skills_dir):
+    server_mod, app = _load_server(skills_dir, dev_mode=False)
+    assert "skill://skill-0/SKILL.md" in await _resource_uris(server_mod)
+
+    _write_skill(skills_dir / "free", "late")
+    assert "skill://late/SKILL.md" not in await _resource_uris(server_mod)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url=TEST_SERVER_BASE_URL,
+    ) as http:
+        denied = await http.post("/api/skills/reload")
+        assert denied.status_code == 401
+        resp = await http.post(
+            "/api/skills/reload",
+            headers={"Authorization": f"Bearer {TEST_API_SECRET}"},
+        )
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "ok", "skills": 9}
+    assert "skill://late/SKILL.md" in await _resource_uris(server_mod)
+
+
+@pytest.mark.asyncio
+async def test_reload_endpoint_is_refused_with_several_workers(_env_vars, skills_dir):
+    with patch.dict(os.environ, {"COSHIP_WORKERS": "4"}):
+        server_mod, app = _load_server(skills_dir, dev_mode=False)
+    _write_skill(skills_dir / "free", "late")
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url=TEST_SERVER_BASE_URL,
+    ) as http:
+        resp = await http.post(
+            "/api/skills/reload",
+            headers={"Authorization": f"Bearer {TEST_API_SECRET}"},
+        )
+    assert resp.status_code == 409
+    assert "SIGHUP" in resp.json()["error"]
+    assert "skill://late/SKILL.md" not in await _resource_uris(server_mod)
+
+
+@pytest.mark.asyncio
+async def test_dev_mode_hot_reloads(_env_vars, skills_dir):
+    server_mod, _ = _load_server(skills_dir, dev_mode=True)
+    await _resource_uris(server_mod)
+    _write_skill(skills_dir / "free", "late")
+    assert "skill://late/SKILL.md" in await _resource_uris(server_mod)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_resources_list_and_read(_env_vars, skills_dir, capsys):
+    """Compare resources/list and resources/read latency in both modes.
+
+    The timing is reported, not asserted (it depends on the machine); the
+    assertion is the structural difference: production never rescans.
+    """
+    rounds = 50
+    report = {}
+    for mode, dev_mode in (("reload", True), ("snapshot", False)):
+        server_mod, _ = _load_server(skills_dir, dev_mode=dev_mode)
+        provider = server_mod.skills_provider
+        with patch.object(
+            provider, "_discover_skills", wraps=provider._discover_skills
+        ) as discover:
+            async with Client(server_mod.mcp) as client:
+                for op in ("list", "read"):
+                    samples = []
+                    for _ in range(rounds):
+                        started = time.perf_counter()
+                        if op == "list":
+                            await client.list_resources()
+                        else:
+                            await client.read_resource("skill://skill-3/SKILL.md")
+                        samples.append(time.perf_counter() - started)
+                    report[mode, op] = statistics.median(samples) * 1e3
+        report[mode, "rescans"] = discover.call_count
+
+    with capsys.disabled():
+        print()
+        for op in ("list", "read"):
+            print(
+                f"resources/{op}: reload {report['reload', op]:.3f} ms, "
+                f"snapshot {report['snapshot', op]:.3f} ms (median of {rounds})"
+            )
+
+    assert report["snapshot", "rescans"] == 0
+    assert report["reload", "rescans"] >= 2 * rounds
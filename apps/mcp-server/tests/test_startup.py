@@ -0,0 +1,100 @@
+"""Startup cost: nothing heavy at import, warm-up before traffic, time budget."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastmcp import Client
+
+from tests.conftest import (
+    TEST_API_SECRET,
+    TEST_COCKPIT_URL,
+    TEST_SERVER_BASE_URL,
+    TEST_SUPABASE_ANON_KEY,
+    TEST_SUPABASE_URL,
+)
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+
+# Cold interpreter: import the server module and build the app. Most of this
+# is importing FastMCP itself; override for slow CI machines.
+STARTUP_BUDGET_SECONDS = float(os.environ.get("COSHIP_STARTUP_BUDGET_SECONDS", "5.0"))
+
+# Loaded lazily by build_server / warm_up, never by importing the server.
+LAZY_MODULES = ("postgrest", "diskcache", "key_value.aio.stores.disk")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import coship_mcp.server as server
+imported = time.perf_counter()
+from coship_mcp.config import get_settings
+result = {
+    "import_seconds": imported - started,
+    "settings_loaded": get_settings.cache_info().currsize,
+    "lazy_loaded": [m for m in %r if m in sys.modules],
+}
+if "--build" in sys.argv:
+    server.create_app()
+    result["total_seconds"] = time.perf_counter() - started
+print(json.dumps(result))
+""" % (LAZY_MODULES,)
+
+
+def _run_probe(tmp_path: Path, env: dict[str, str], *args: str) -> dict:
+    clean_env = {k: v for k, v in os.environ.items() if not k.startswith("COSHIP_")}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, *args],
+        # Run outside the app root so no .env file is picked up.
+        cwd=tmp_path,
+        env={**clean_env, "PYTHONPATH": str(APP_ROOT / "src"), **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_builds_nothing(tmp_path):
+    # No COSHIP_* environment at all: importing must not read settings.
+    result = _run_probe(tmp_path, {})
+    assert result["settings_loaded"] == 0
+    assert result["lazy_loaded"] == []
+
+
+def test_cold_import_and_factory_within_budget(tmp_path):
+    env = {
+        "COSHIP_SUPABASE_URL": TEST_SUPABASE_URL,
+        "COSHIP_SUPABASE_ANON_KEY": TEST_SUPABASE_ANON_KEY,
+        "COSHIP_SERVER_BASE_URL": TEST_SERVER_BASE_URL,
+        "COSHIP_COCKPIT_URL": TEST_COCKPIT_URL,
+        "COSHIP_API_SECRET": TEST_API_SECRET,
+        "COSHIP_OAUTH_STORAGE": "memory",
+        "COSHIP_SKILLS_DIR": str(APP_ROOT / "skills"),
+    }
+    result = _run_probe(tmp_path, env, "--build")
+    print(
+        f"\ncold import {result['import_seconds']:.3f}s, "
+        f"import + create_app {result['total_seconds']:.3f}s "
+        f"(budget {STARTUP_BUDGET_SECONDS:.1f}s)"
+    )
+    assert result["total_seconds"] < STARTUP_BUDGET_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_warm_up_runs_before_traffic(mcp_app, fake_postgrest):
+    import coship_mcp.server as server_mod
+
+    fake_postgrest.respond("GET", "/auth/v1/.well-known/jwks.json", {"keys": []})
+    components = server_mod.get_components()
+    assert components.skill_cache._skills == {}
+
+    async with Client(components.mcp):
+        assert "matching" in components.skill_cache._skills
+        assert "postgrest" in sys.modules
+        assert any(r.url.path.endswith("/jwks.json") for r in fake_postgrest.requests)
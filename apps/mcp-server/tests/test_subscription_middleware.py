@@ -0,0 +1,93 @@
+"""Tests for SubscriptionTierMiddleware resource gating and filtering."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from fastmcp import Client
+from fastmcp.server.auth import AccessToken
+from fastmcp.server.middleware import Middleware
+
+PRO_REGISTRY = [
+    {"id": "matching", "name": "M", "tier": "pro", "description": "", "status": "available"},
+]
+
+
+def _token(value: str, tier: str | None = None) -> AccessToken:
+    claims = {"sub": "u1"}
+    if tier:
+        claims["app_metadata"] = {"subscription_tier": tier}
+    return AccessToken(token=value, client_id="c", scopes=[], claims=claims)
+
+
+@pytest.fixture
+def pro_matching(mcp_app):
+    """Mark the on-disk ``matching`` skill as a pro skill."""
+    from coship_mcp.skills_registry import reload_skill_index
+
+    reload_skill_index(PRO_REGISTRY)
+    yield
+    reload_skill_index()
+
+
+def test_only_resource_hooks_are_overridden():
+    from coship_mcp.middleware import SubscriptionTierMiddleware
+
+    assert SubscriptionTierMiddleware.on_request is Middleware.on_request
+    assert SubscriptionTierMiddleware.on_message is Middleware.on_message
+    assert SubscriptionTierMiddleware.on_call_tool is Middleware.on_call_tool
+
+
+def test_get_user_tier(settings):
+    from coship_mcp.middleware import get_user_tier
+
+    assert get_user_tier(_token("pro-token", "pro")) == "pro"
+    assert get_user_tier(_token("no-tier-token")) == "free"
+    assert get_user_tier(None) == "free"
+
+
+def test_pro_uris_are_precomputed():
+    from coship_mcp.skills_registry import SkillIndex
+
+    index = SkillIndex.build(PRO_REGISTRY)
+    assert index.pro_resource_uris == {"skill://matching/SKILL.md", "skill://matching/_manifest"}
+
+
+@pytest.mark.asyncio
+async def test_free_users_do_not_see_pro_resources(pro_matching):
+    import coship_mcp.server as server_mod
+
+    async with Client(server_mod.mcp) as client:
+        uris = [str(r.uri) for r in await client.list_resources()]
+        templates = [t.uriTemplate for t in await client.list_resource_templates()]
+        with pytest.raises(Exception, match="requires a Pro subscription"):
+            await client.read_resource("skill://matching/SKILL.md")
+
+    assert not [u for u in uris if u.startswith("skill://matching/")]
+    assert not [t for t in templates if t.startswith("skill://matching/")]
+
+
+@pytest.mark.asyncio
+async def test_pro_users_see_and_read_pro_resources(pro_matching):
+    import coship_mcp.server as server_mod
+
+    pro = _token("pro-resources-token", "pro")
+    with patch("coship_mcp.middleware.subscription.get_access_token", return_value=pro):
+        async with Client(server_mod.mcp) as client:
+            uris = [str(r.uri) for r in await client.list_resources()]
+            contents = await client.read_resource("skill://matching/SKILL.md")
+
+    assert "skill://matching/SKILL.md" in uris
+    assert contents
+
+
+@pytest.mark.asyncio
+async def test_free_skills_are_listed_for_everyone(mcp_app):
+    import coship_mcp.server as server_mod
+
+    async with Client(server_mod.mcp) as client:
+        uris = [str(r.uri) for r in await client.list_resources()]
+        await client.read_resource("skill://matching/SKILL.md")
+
+    assert "skill://matching/SKILL.md" in uris
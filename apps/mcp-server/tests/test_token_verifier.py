@@ -0,0 +1,220 @@
+"""Tests for the verified-JWT cache."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import patch
+
+import pytest
+from fastmcp.server.auth.providers.jwt import RSAKeyPair
+
+ISSUER = "https://test-project.supabase.co/auth/v1"
+
+
+@pytest.fixture(scope="module")
+def key_pair() -> RSAKeyPair:
+    return RSAKeyPair.generate()
+
+
+@pytest.fixture(autouse=True)
+def _settings(settings):
+    """token_verifier pulls in the pooled HTTP client, which needs Settings."""
+
+
+def _verifier(key_pair: RSAKeyPair, **kwargs):
+    from coship_mcp.token_verifier import CachingJWTVerifier
+
+    return CachingJWTVerifier(
+        public_key=key_pair.public_key, issuer=ISSUER, algorithm="RS256", **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeat_token_skips_verification(key_pair):
+    verifier = _verifier(key_pair)
+    token = key_pair.create_token(subject="u1", issuer=ISSUER)
+
+    with patch.object(verifier.jwt, "decode", wraps=verifier.jwt.decode) as decode:
+        first = await verifier.verify_token(token)
+        second = await verifier.verify_token(token)
+
+    assert first is not None and first.claims["sub"] == "u1"
+    assert second is first
+    assert decode.call_count == 1
+    info = verifier.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_tier_is_resolved_once_and_expires_with_the_token(key_pair):
+    from coship_mcp.middleware import get_user_tier
+
+    verifier = _verifier(key_pair, cache_max_age=60)
+    token = key_pair.create_token(
+        subject="u1", issuer=ISSUER,
+        additional_claims={"app_metadata": {"subscription_tier": "pro"}},
+    )
+
+    first = await verifier.verify_token(token)
+    assert first.subscription_tier == "pro"
+    assert "subscription_tier" not in first.claims  # kept beside the signed claims
+    first.claims["app_metadata"] = {}  # the cached tier no longer reads app_metadata
+    assert get_user_tier(await verifier.verify_token(token)) == "pro"
+
+    with patch("coship_mcp.token_verifier.time.time", return_value=time.time() + 120):
+        expired = await verifier.verify_token(token)
+    assert expired is not first
+    assert get_user_tier(expired) == "pro"
+
+
+@pytest.mark.asyncio
+async def test_tier_is_never_read_from_token_claims(key_pair):
+    from coship_mcp.middleware import get_user_tier
+
+    verifier = _verifier(key_pair)
+    token = key_pair.create_token(
+        subject="u1", issuer=ISSUER,
+        additional_claims={"coship_subscription_tier": "pro", "subscription_tier": "pro"},
+    )
+    assert get_user_tier(await verifier.verify_token(token)) == "free"
+
+
+@pytest.mark.asyncio
+async def test_invalid_tokens_are_not_cached(key_pair):
+    verifier = _verifier(key_pair)
+    bad = key_pair.create_token(subject="u1", issuer="https://evil.example.com")
+
+    assert await verifier.verify_token(bad) is None
+    assert await verifier.verify_token(bad) is None
+    assert verifier.cache_info().misses == 2
+    assert verifier.cache_info().currsize == 0
+
+
+@pytest.mark.asyncio
+async def test_entry_expires_at_max_age(key_pair):
+    verifier = _verifier(key_pair, cache_max_age=60)
+    token = key_pair.create_token(subject="u1", issuer=ISSUER, expires_in_seconds=3600)
+    await verifier.verify_token(token)
+
+    with patch("coship_mcp.token_verifier.time.time", return_value=time.time() + 61):
+        assert verifier._lookup(verifier._key(token)) is None
+    assert verifier.cache_info().currsize == 0
+
+
+@pytest.mark.asyncio
+async def test_entry_expires_at_token_exp(key_pair):
+    verifier = _verifier(key_pair, cache_max_age=3600)
+    token = key_pair.create_token(subject="u1", issuer=ISSUER, expires_in_seconds=30)
+    await verifier.verify_token(token)
+
+    with patch("coship_mcp.token_verifier.time.time", return_value=time.time() + 31):
+        assert verifier._lookup(verifier._key(token)) is None
+
+
+@pytest.mark.asyncio
+async def test_lru_bound(key_pair):
+    verifier = _verifier(key_pair, cache_maxsize=2)
+    tokens = [key_pair.create_token(subject=f"u{i}", issuer=ISSUER) for i in range(3)]
+    for token in tokens:
+        await verifier.verify_token(token)
+
+    assert verifier.cache_info().currsize == 2
+    assert verifier._lookup(verifier._key(tokens[0])) is None
+    assert verifier._lookup(verifier._key(tokens[2])) is not None
+
+
+# ---------------------------------------------------------------------------
+# JWKS prefetch / refresh
+# ---------------------------------------------------------------------------
+
+JWKS_PATH = "/auth/v1/.well-known/jwks.json"
+
+
+@pytest.fixture(scope="module")
+def es256_key():
+    from authlib.jose import JsonWebKey
+
+    return JsonWebKey.generate_key("EC", "P-256", is_private=True, options={"kid": "k1"})
+
+
+def _es256_token(key, subject: str = "u1") -> str:
+    from authlib.jose import JsonWebToken
+
+    now = int(time.time())
+    payload = {"sub": subject, "iss": ISSUER, "iat": now, "exp": now + 3600}
+    return JsonWebToken(["ES256"]).encode({"alg": "ES256"}, payload, key).decode()
+
+
+@pytest.fixture
+def jwks_verifier(fake_postgrest, es256_key):
+    from coship_mcp.token_verifier import CachingJWTVerifier
+
+    fake_postgrest.respond(
+        "GET", JWKS_PATH, {"keys": [es256_key.as_dict(is_private=False)]}
+    )
+    return CachingJWTVerifier(
+        jwks_uri=f"https://test-project.supabase.co{JWKS_PATH}",
+        issuer=ISSUER,
+        algorithm="ES256",
+        cache_maxsize=0,
+    )
+
+
+def _jwks_fetches(fake_postgrest) -> int:
+    return sum(r.url.path == JWKS_PATH for r in fake_postgrest.requests)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_keeps_jwks_off_request_path(jwks_verifier, fake_postgrest, es256_key):
+    await jwks_verifier.start_jwks_refresh()
+    try:
+        assert _jwks_fetches(fake_postgrest) == 1
+        for _ in range(3):
+            assert await jwks_verifier.verify_token(_es256_token(es256_key)) is not None
+        assert _jwks_fetches(fake_postgrest) == 1
+    finally:
+        await jwks_verifier.stop_jwks_refresh()
+
+
+@pytest.mark.asyncio
+async def test_cold_kid_miss_is_single_flighted(jwks_verifier, fake_postgrest, es256_key):
+    import asyncio
+
+    fake_postgrest.latency = 0.05
+    results = await asyncio.gather(
+        *(jwks_verifier.verify_token(_es256_token(es256_key)) for _ in range(10))
+    )
+
+    assert all(r is not None for r in results)
+    assert _jwks_fetches(fake_postgrest) == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refetch_is_rate_limited(jwks_verifier, fake_postgrest):
+    from authlib.jose import JsonWebKey
+
+    rotated = JsonWebKey.generate_key("EC", "P-256", is_private=True, options={"kid": "k2"})
+    await jwks_verifier.refresh_jwks()
+
+    assert await jwks_verifier.verify_token(_es256_token(rotated)) is None
+    assert await jwks_verifier.verify_token(_es256_token(rotated)) is None
+    assert _jwks_fetches(fake_postgrest) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_keys_are_served_while_revalidating(
+    jwks_verifier, fake_postgrest, es256_key
+):
+    import asyncio
+
+    await jwks_verifier.refresh_jwks()
+    jwks_verifier._jwks_fetched_at -= jwks_verifier.jwks_refresh_interval + 1
+    fake_postgrest.latency = 0.05
+
+    started = time.perf_counter()
+    assert await jwks_verifier.verify_token(_es256_token(es256_key)) is not None
+    assert time.perf_counter() - started < fake_postgrest.latency
+
+    await asyncio.shield(jwks_verifier._jwks_inflight)
+    assert _jwks_fetches(fake_postgrest) == 2
+    assert jwks_verifier._jwks_age() < 1
@@ -0,0 +1,178 @@
+"""Tests for the annotation-driven tool result cache."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.server.auth import AccessToken
+from mcp.types import ToolAnnotations
+
+from coship_mcp.middleware import ToolResultCacheMiddleware
+
+READ = ToolAnnotations(readOnlyHint=True, idempotentHint=True)
+
+
+def _token(sub: str, tier: str = "free") -> AccessToken:
+    return AccessToken(
+        token=f"{sub}-{tier}",
+        client_id="c",
+        scopes=[],
+        claims={"sub": sub, "app_metadata": {"subscription_tier": tier}},
+    )
+
+
+class Backend:
+    """Counts calls so tests can tell cache hits from misses."""
+
+    def __init__(self):
+        self.reads = 0
+        self.release_read: asyncio.Event | None = None
+
+    def server(self, cache: ToolResultCacheMiddleware) -> FastMCP:
+        mcp = FastMCP("test")
+        mcp.add_middleware(cache)
+
+        @mcp.tool(annotations=READ)
+        async def get_context(project_id: str) -> dict:
+            self.reads += 1
+            if self.release_read is not None:
+                await self.release_read.wait()
+            return {"status": "ok", "project_id": project_id, "read": self.reads}
+
+        @mcp.tool(annotations=READ)
+        def failing() -> dict:
+            self.reads += 1
+            return {"status": "error", "message": "boom"}
+
+        @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+        def not_idempotent() -> dict:
+            self.reads += 1
+            return {"status": "ok"}
+
+        @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=True))
+        def save(project_id: str) -> dict:
+            return {"status": "ok", "saved": True}
+
+        return mcp
+
+
+@pytest.fixture
+def backend() -> Backend:
+    return Backend()
+
+
+@pytest.fixture
+def as_user():
+    """Set the access token the middleware sees: ``as_user("u1")``."""
+    current: list[AccessToken | None] = [None]
+
+    def set_user(sub: str | None, tier: str = "free") -> None:
+        current[0] = _token(sub, tier) if sub else None
+
+    with patch(
+        "coship_mcp.middleware.tool_cache.get_access_token", side_effect=lambda: current[0]
+    ):
+        yield set_user
+
+
+async def _read(client: Client, project_id: str = "p1") -> int:
+    result = await client.call_tool("get_context", {"project_id": project_id})
+    return result.structured_content["read"]
+
+
+@pytest.mark.asyncio
+async def test_read_only_results_are_cached_per_user_and_arguments(backend, as_user):
+    cache = ToolResultCacheMiddleware()
+    async with Client(backend.server(cache)) as client:
+        as_user("u1")
+        assert await _read(client) == 1
+        assert await _read(client) == 1
+        assert await _read(client, "p2") == 2
+
+        as_user("u2")
+        assert await _read(client) == 3
+
+        as_user("u1", tier="pro")  # tier is part of the key
+        assert await _read(client) == 4
+
+    assert backend.reads == 4
+    assert len(cache) == 4
+
+
+@pytest.mark.asyncio
+async def test_write_invalidates_only_the_callers_entries(backend, as_user):
+    cache = ToolResultCacheMiddleware()
+    async with Client(backend.server(cache)) as client:
+        as_user("u1")
+        await _read(client)
+        as_user("u2")
+        await _read(client)
+
+        as_user("u1")
+        await client.call_tool("save", {"project_id": "p1"})
+        assert await _read(client) == 3
+
+        as_user("u2")
+        assert await _read(client) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_in_flight_during_a_write_is_not_stored(backend, as_user):
+    cache = ToolResultCacheMiddleware()
+    backend.release_read = asyncio.Event()
+    async with Client(backend.server(cache)) as client:
+        as_user("u1")
+        slow_read = asyncio.create_task(_read(client))
+        while backend.reads == 0:
+            await asyncio.sleep(0)
+        await client.call_tool("save", {"project_id": "p1"})
+        backend.release_read.set()
+        assert await slow_read == 1
+
+        assert len(cache) == 0
+        assert await _read(client) == 2
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_calls(backend, as_user):
+    cache = ToolResultCacheMiddleware(ttls={"get_context": 0})
+    async with Client(backend.server(cache)) as client:
+        as_user(None)  # unauthenticated
+        await client.call_tool("failing")
+        as_user("u1")
+        await client.call_tool("failing")  # error result
+        await client.call_tool("failing")
+        await client.call_tool("not_idempotent")
+        await client.call_tool("not_idempotent")
+        await _read(client)  # TTL override 0
+        await _read(client)
+
+    assert backend.reads == 7
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_are_bounded(backend, as_user):
+    cache = ToolResultCacheMiddleware(default_ttl=60, maxsize=2)
+    async with Client(backend.server(cache)) as client:
+        as_user("u1")
+        for project_id in ("p1", "p2", "p3"):
+            await _read(client, project_id)
+        assert len(cache) == 2
+        assert await _read(client, "p1") == 4  # least recently used, evicted
+
+        with patch("coship_mcp.middleware.tool_cache.time.monotonic", return_value=1e12):
+            assert await _read(client, "p1") == 5
+
+
+@pytest.mark.asyncio
+async def test_skills_reload_clears_the_cache(mcp_app):
+    import coship_mcp.server as server_mod
+
+    cache = server_mod.get_components().tool_cache
+    cache._store(("u1", "free", "list_skills", "{}"), float("inf"), object())
+    server_mod.reload_skills()
+    assert len(cache) == 0
@@ -0,0 +1,11 @@
+-- Index for listing a user's active projects, newest first
+-- list_user_projects filters on (user_id, status) and pages by
+-- (created_at, id) descending; this index serves both the filter and the
+-- order, so each page is a bounded index range scan instead of a sort.
+
+CREATE INDEX IF NOT EXISTS idx_projects_user_status_created
+  ON projects (user_id, status, created_at DESC, id DESC);
+
+-- Lookups by user_id alone are covered by the leading column of this index
+-- (and of idx_projects_user_slug), so the single-column index is redundant.
+DROP INDEX IF EXISTS idx_projects_user_id;